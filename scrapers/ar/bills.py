@@ -1,3 +1,4 @@
+import io
 import re
 import csv
 import datetime
@@ -5,7 +6,6 @@ import pytz
 import os
 import ssl
 import ftplib
-import tempfile
 
 
 from openstates.scrape import Scraper, Bill, VoteEvent
@@ -13,9 +13,11 @@ from openstates.exceptions import EmptyScrape
 
 import lxml.html
 
+from utils.cache import cache_dir, read_json, write_json
 from .common import get_slug_for_session, get_biennium_year
 
 TIMEZONE = pytz.timezone("US/Central")
+FTP_HOST = "secureftp.arkleg.state.ar.us"
 _AR_ORGANIZATION_ENTITY_NAME_KEYWORDS = [
     "Committee",
     "House Management",
@@ -69,10 +71,15 @@ class ARBillScraper(Scraper):
 
         leg_chambers = [chamber] if chamber else ["upper", "lower"]
 
-        for leg_chamber in leg_chambers:
-            self.scrape_bill(leg_chamber, session)
+        self._ftp = None
+        self._ftp_rows = {}
+        try:
+            for leg_chamber in leg_chambers:
+                self.scrape_bill(leg_chamber, session)
 
-        self.scrape_actions()
+            self.scrape_actions()
+        finally:
+            self.close_ftp()
 
         if not self.bills:
             raise EmptyScrape
@@ -83,7 +90,7 @@ class ARBillScraper(Scraper):
     def scrape_bill(self, chamber, session):
         url = "LegislativeMeasures.txt"
 
-        page = csv.reader(self.get_utf_16_ftp_content(url).splitlines(), delimiter="|")
+        page = self.get_ftp_rows(url)
 
         for row in page:
             bill_chamber = {"H": "lower", "S": "upper"}[row[0]]
@@ -141,7 +148,7 @@ class ARBillScraper(Scraper):
 
     def scrape_actions(self):
         url = "ChamberActions.txt"
-        page = csv.reader(self.get_utf_16_ftp_content(url).splitlines(), delimiter="|")
+        page = self.get_ftp_rows(url)
 
         for row in page:
             bill_id = "%s%s %s" % (row[1], row[2], row[3])
@@ -494,24 +501,72 @@ class ARBillScraper(Scraper):
 
         return chamber
 
-    # the data is utf-16, with null bytes for empty cells.
-    def decode_ar_utf16(self, data) -> str:
-        data = data.decode("utf-16", errors="ignore")
-        data = data.replace("\x00", "")
-        return data
+    def ftp(self):
+        """The FTPS connection, opened on first use and kept for the rest of
+        the scrape.
+        """
+        if self._ftp is None:
+            ftp_client = ImplicitFTP_TLS()
+            ftp_client.connect(host=FTP_HOST, port=990)
+            ftp_client.login(user=self.ftp_user, passwd=self.ftp_pass)
+            ftp_client.prot_p()
+            ftp_client.cwd("SessionInformation")
+            self._ftp = ftp_client
+        return self._ftp
+
+    def close_ftp(self):
+        if self._ftp is not None:
+            try:
+                self._ftp.quit()
+            except (ftplib.Error, OSError, EOFError):
+                self._ftp.close()
+            self._ftp = None
+
+    def get_ftp_rows(self, filename):
+        """Returns the rows of a pipe-delimited file in SessionInformation,
+        downloading it at most once per scrape.
+        """
+        if filename not in self._ftp_rows:
+            try:
+                rows = self.read_ftp_rows(filename)
+            except (ftplib.error_temp, OSError, EOFError) as e:
+                # the server drops connections that sit idle while the
+                # bill pages are scraped
+                self.info(f"FTP connection lost ({e}), reconnecting")
+                self.close_ftp()
+                rows = self.read_ftp_rows(filename)
+            self._ftp_rows[filename] = rows
+        return self._ftp_rows[filename]
+
+    def read_ftp_rows(self, filename):
+        """Reads a pipe-delimited file off the FTP server, or from the copy
+        kept from the last run if its modification time hasn't changed.
+        """
+        ftp_client = self.ftp()
+        path = os.path.join(cache_dir("ar", "ftp"), filename + ".json")
+        try:
+            modified = ftp_client.sendcmd("MDTM " + filename)[4:].strip()
+        except ftplib.error_perm:
+            modified = None
+        cached = read_json(path)
+        if modified and cached and cached["modified"] == modified:
+            self.info(f"{filename} unchanged since the last scrape")
+            return cached["rows"]
 
-    def get_utf_16_ftp_content(self, filename):
         self.info(f"GET from ftp: {filename}")
-        ftp_client = ImplicitFTP_TLS()
-        ftp_client.connect(host="secureftp.arkleg.state.ar.us", port=990)
-        ftp_client.login(user=self.ftp_user, passwd=self.ftp_pass)
-        ftp_client.prot_p()
-        ftp_client.cwd("SessionInformation")
-        raw = tempfile.NamedTemporaryFile()
-
-        with open(raw.name, "wb") as f:
-            ftp_client.retrbinary("RETR " + filename, raw.write)
-
-        with open(raw.name, "rb") as f:
-            text = self.decode_ar_utf16(f.read())
-            return text
+        ftp_client.voidcmd("TYPE I")
+        with ftp_client.transfercmd("RETR " + filename) as conn:
+            # the data is utf-16, with null bytes for empty cells; decode
+            # it as it arrives and hand csv one line at a time
+            with io.TextIOWrapper(
+                conn.makefile("rb"), encoding="utf-16", errors="ignore", newline=""
+            ) as text:
+                lines = (line.replace("\x00", "") for line in text)
+                rows = list(csv.reader(lines, delimiter="|"))
+            if isinstance(conn, ssl.SSLSocket):
+                conn.unwrap()
+        ftp_client.voidresp()
+
+        if modified:
+            write_json(path, {"modified": modified, "rows": rows})
+        return rows
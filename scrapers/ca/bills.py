@@ -4,12 +4,19 @@ import pytz
 import operator
 import itertools
 import datetime
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from lxml import etree, html
 from utils import LXMLMixin
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, selectinload
 from sqlalchemy import create_engine
 from openstates.scrape import Scraper, Bill, VoteEvent
-from .models import CABill
+from .models import (
+    CABill,
+    CABillAnalysis,
+    CABillVersion,
+    CAVoteSummary,
+)
 from .actions import CACategorizer
 
 SPONSOR_TYPES = {
@@ -22,6 +29,37 @@ MYSQL_HOST = os.environ.get("MYSQL_HOST", "localhost")
 MYSQL_USER = os.environ.get("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD", "")
 
+# number of bills (with all of their related rows) loaded per query batch
+BILL_PAGE_SIZE = int(os.environ.get("CA_BILL_PAGE_SIZE", "200"))
+
+
+ParsedVersion = namedtuple("ParsedVersion", ["title", "short_title", "digest"])
+
+_title_xpath = etree.XPath("string(//*[local-name() = 'Title'])")
+_short_title_xpath = etree.XPath("string(//*[local-name() = 'Subject'])")
+
+
+def parse_version_xml(bill_xml, digest=False):
+    """
+    Parse a bill version's xml into its title, short title and (if asked
+    for) digest text. This is a plain function so that it can be run in
+    worker processes.
+    """
+    doc = etree.fromstring(bill_xml.encode("utf-8"), etree.XMLParser(recover=True))
+    title = (_title_xpath(doc) or "").strip()
+    short_title = (_short_title_xpath(doc) or "").strip()
+
+    chunks = []
+    if digest:
+        els = doc.xpath("//caml:DigestText/xhtml:p", namespaces=doc.nsmap)
+        for el in els:
+            t = etree_text_content(el)
+            t = re.sub(r"\s+", " ", t)
+            t = re.sub(r"\)(\S)", lambda m: ") %s" % m.group(1), t)
+            chunks.append(t)
+
+    return ParsedVersion(title, short_title, "\n\n".join(chunks))
+
 
 def clean_title(s):
     # replace smart quote characters
@@ -220,6 +258,7 @@ class CABillScraper(Scraper, LXMLMixin):
         self.engine = create_engine(conn_str)
         self.Session = sessionmaker(bind=self.engine)
         self.session = self.Session()
+        self.xml_pool = None
 
     def committee_code_to_name(
         self, code, committee_code_to_name=get_committee_code_data()
@@ -244,7 +283,69 @@ class CABillScraper(Scraper, LXMLMixin):
                 raise KeyError
             return committee_abbr_to_name[other_chamber][slugify(abbr)]
 
-    def scrape(self, chamber=None, session=None):
+    def parse_versions(self, bills, digest):
+        """
+        Parse the xml of every version of `bills`, in worker processes if
+        the scrape was started with xml_workers. Returns a dict of
+        bill_version_id -> ParsedVersion; the digest is only extracted for
+        each bill's last version, the one the summary is taken from.
+        """
+        ids, xmls, digests = [], [], []
+        for bill in bills:
+            for version in bill.versions:
+                if version.bill_xml:
+                    ids.append(version.bill_version_id)
+                    xmls.append(version.bill_xml)
+                    digests.append(digest and version is bill.versions[-1])
+
+        if self.xml_pool:
+            parsed = self.xml_pool.map(parse_version_xml, xmls, digests, chunksize=8)
+        else:
+            parsed = map(parse_version_xml, xmls, digests)
+        return dict(zip(ids, parsed))
+
+    def iter_bills(self, session, type_abbr, digest, page_size=BILL_PAGE_SIZE):
+        """
+        Yield (bill, parsed versions) for the bills of one measure type in a
+        session, a page at a time, with every relationship the scraper
+        touches loaded up front.
+
+        Each page costs one query per relationship (selectin loading) rather
+        than several queries per bill, and the session is cleared between
+        pages so memory doesn't grow with the number of bills.
+        """
+        query = (
+            self.session.query(CABill)
+            .filter_by(session_year=session)
+            .filter_by(measure_type=type_abbr)
+            .options(
+                selectinload(CABill.versions).selectinload(CABillVersion.authors),
+                selectinload(CABill.actions),
+                selectinload(CABill.votes).selectinload(CAVoteSummary.motion),
+                selectinload(CABill.votes).selectinload(CAVoteSummary.location),
+                selectinload(CABill.votes).selectinload(CAVoteSummary.votes),
+                # source_doc holds the analysis document itself, which we
+                # never use
+                selectinload(CABill.analyses).defer(CABillAnalysis.source_doc),
+            )
+            .order_by(CABill.bill_id)
+        )
+
+        last_bill_id = None
+        while True:
+            page = query
+            if last_bill_id is not None:
+                page = page.filter(CABill.bill_id > last_bill_id)
+            bills = page.limit(page_size).all()
+            if not bills:
+                break
+            last_bill_id = bills[-1].bill_id
+            parsed = self.parse_versions(bills, digest)
+            for bill in bills:
+                yield bill, parsed
+            self.session.expunge_all()
+
+    def scrape(self, chamber=None, session=None, xml_workers=0):
         if session is None:
             session = self.jurisdiction.legislative_sessions[-1]["identifier"]
             self.info("no session specified, using %s", session)
@@ -267,9 +368,16 @@ class CABillScraper(Scraper, LXMLMixin):
             },
         }
 
-        for chamber in chambers:
-            for abbr, type_ in bill_types[chamber].items():
-                yield from self.scrape_bill_type(chamber, session, type_, abbr)
+        # bill version xml can optionally be parsed in a pool of processes
+        xml_workers = int(xml_workers)
+        self.xml_pool = ProcessPoolExecutor(xml_workers) if xml_workers else None
+        try:
+            for chamber in chambers:
+                for abbr, type_ in bill_types[chamber].items():
+                    yield from self.scrape_bill_type(chamber, session, type_, abbr)
+        finally:
+            if self.xml_pool:
+                self.xml_pool.shutdown()
 
     def scrape_bill_type(
         self,
@@ -279,16 +387,12 @@ class CABillScraper(Scraper, LXMLMixin):
         type_abbr,
         committee_abbr_regex=get_committee_name_regex(),
     ):
-        bills = (
-            self.session.query(CABill)
-            .filter_by(session_year=session)
-            .filter_by(measure_type=type_abbr)
-        )
-
         archive_year = int(session[0:4])
         not_archive_year = archive_year >= 2009
 
-        for bill in bills:
+        bills = self.iter_bills(session, type_abbr, digest=not_archive_year)
+
+        for bill, parsed_versions in bills:
             bill_session = session
             if bill.session_num != "0":
                 bill_session += " Special Session %s" % bill.session_num
@@ -322,20 +426,13 @@ class CABillScraper(Scraper, LXMLMixin):
             # Get digest test (aka "summary") from latest version.
             if bill.versions and not_archive_year:
                 version = bill.versions[-1]
-                nsmap = version.xml.nsmap
-                xpath = "//caml:DigestText/xhtml:p"
-                els = version.xml.xpath(xpath, namespaces=nsmap)
-                chunks = []
-                for el in els:
-                    t = etree_text_content(el)
-                    t = re.sub(r"\s+", " ", t)
-                    t = re.sub(r"\)(\S)", lambda m: ") %s" % m.group(1), t)
-                    chunks.append(t)
-                summary = "\n\n".join(chunks)
+                if version.bill_version_id in parsed_versions:
+                    summary = parsed_versions[version.bill_version_id].digest
 
             for version in bill.versions:
                 if not version.bill_xml:
                     continue
+                parsed = parsed_versions[version.bill_version_id]
 
                 version_date = self._tz.localize(version.bill_version_action_date)
 
@@ -362,16 +459,16 @@ class CABillScraper(Scraper, LXMLMixin):
                 # CA is inconsistent in that some bills have a short title
                 # that is longer, more descriptive than title.
                 if bill.measure_type in ("AB", "SB"):
-                    impact_clause = clean_title(version.title)
-                    title = clean_title(version.short_title)
+                    impact_clause = clean_title(parsed.title)
+                    title = clean_title(parsed.short_title)
                 else:
                     impact_clause = None
-                    if len(version.title) < len(
-                        version.short_title
-                    ) and not version.title.lower().startswith("an act"):
-                        title = clean_title(version.short_title)
+                    if len(parsed.title) < len(
+                        parsed.short_title
+                    ) and not parsed.title.lower().startswith("an act"):
+                        title = clean_title(parsed.short_title)
                     else:
-                        title = clean_title(version.title)
+                        title = clean_title(parsed.title)
 
                 if title:
                     all_titles.add(title)
@@ -744,8 +841,9 @@ class CABillScraper(Scraper, LXMLMixin):
                 )
 
             yield fsbill
-            self.session.expire_all()
 
 
 def etree_text_content(el):
-    return html.fromstring(etree.tostring(el)).text_content()
+    # serialize straight to text rather than round-tripping through the
+    # html parser; like before, this includes the element's tail
+    return etree.tostring(el, method="text", encoding="unicode")
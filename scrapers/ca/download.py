@@ -5,6 +5,11 @@ The workflow is:
  - Drop & recreate the local capublic database.
  - Inspect the site with regex and determine which files have been updated, if any.
  - For each such file, unzip it & call import.
+
+With --incremental, an existing capublic database is kept and only the
+daily archives published since the last applied one are loaded on top of
+it, replacing rows by primary key. Applied archives are recorded in the
+capublic.applied_archive table, so a drop resets the state with the data.
 """
 import os
 import re
@@ -14,7 +19,8 @@ import subprocess
 import logging
 import lxml.html
 import argparse
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from os.path import join, split
 from functools import partial
 from collections import namedtuple
@@ -27,6 +33,14 @@ MYSQL_HOST = os.environ.get("MYSQL_HOST", "localhost")
 MYSQL_USER = os.environ.get("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD", "")
 
+# bill_version_tbl rows are sent to mysql in batches of this many rows, or
+# fewer if the inlined xml would push a batch past BILL_VERSION_BATCH_BYTES
+# (keep this comfortably below the server's max_allowed_packet).
+BILL_VERSION_BATCH_SIZE = int(os.environ.get("BILL_VERSION_BATCH_SIZE", "500"))
+BILL_VERSION_BATCH_BYTES = int(
+    os.environ.get("BILL_VERSION_BATCH_BYTES", str(32 * 1024 * 1024))
+)
+
 BASE_URL = "https://downloads.leginfo.legislature.ca.gov/"
 
 
@@ -61,7 +75,7 @@ def db_drop():
         connection = MySQLdb.connect(
             host=MYSQL_HOST, user=MYSQL_USER, passwd=MYSQL_PASSWORD, db="capublic"
         )
-    except MySQLdb._exceptions.OperationalError:
+    except MySQLdb.OperationalError:
         # The database doesn't exist.
         logger.info("...no such database. Bailing.")
         return
@@ -75,6 +89,64 @@ def db_drop():
     logger.info("...done.")
 
 
+def db_exists():
+    """Return whether a capublic database with its tables is present."""
+    try:
+        connection = MySQLdb.connect(
+            host=MYSQL_HOST, user=MYSQL_USER, passwd=MYSQL_PASSWORD, db="capublic"
+        )
+    except MySQLdb.OperationalError:
+        return False
+
+    cursor = connection.cursor()
+    cursor.execute("SHOW TABLES LIKE 'bill_tbl'")
+    exists = cursor.fetchone() is not None
+    cursor.close()
+    connection.close()
+    return exists
+
+
+def _archive_connection():
+    connection = MySQLdb.connect(
+        host=MYSQL_HOST, user=MYSQL_USER, passwd=MYSQL_PASSWORD, db="capublic"
+    )
+    connection.autocommit(True)
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS capublic.applied_archive (
+            FILENAME VARCHAR(100) NOT NULL PRIMARY KEY,
+            ARCHIVE_DATE DATETIME NOT NULL,
+            APPLIED_AT DATETIME NOT NULL
+        )
+        """
+    )
+    cursor.close()
+    return connection
+
+
+def get_applied_archives():
+    """Return a dict of archive filename -> date of the applied version."""
+    connection = _archive_connection()
+    cursor = connection.cursor()
+    cursor.execute("SELECT FILENAME, ARCHIVE_DATE FROM capublic.applied_archive")
+    applied = dict(cursor.fetchall())
+    cursor.close()
+    connection.close()
+    return applied
+
+
+def record_applied_archive(filename, date):
+    connection = _archive_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        "REPLACE INTO capublic.applied_archive VALUES (%s, %s, %s)",
+        [filename, date, datetime.now()],
+    )
+    cursor.close()
+    connection.close()
+
+
 # ---------------------------------------------------------------------------
 # Functions for updating the data.
 DatRow = namedtuple(
@@ -122,12 +194,34 @@ def encode_or_none(value):
     return value.encode() if value else None
 
 
-def load_bill_versions(connection):
+def iter_bill_versions(filename="BILL_VERSION_TBL.dat"):
     """
-    Given a data folder, read its BILL_VERSION_TBL.dat file in python,
-    construct individual REPLACE statements and execute them one at
-    a time. This method is slower that letting mysql do the import,
-    but doesn't fail mysteriously.
+    Yield the parameter list for each row of a BILL_VERSION_TBL.dat file,
+    with the referenced xml file read and cleaned into the bill_xml column.
+    """
+    with open(filename) as f:
+        for row in f:
+            # The files are supposedly already in utf-8, but with
+            # copious bogus characters.
+            row = clean_text(row)
+            row = dat_row_2_tuple(row)
+            with open(row.bill_xml) as xml_file:
+                text = clean_text(xml_file.read())
+            row = row._replace(bill_xml=text)
+            yield [encode_or_none(column) for column in row]
+
+
+def load_bill_versions(
+    connection,
+    batch_size=BILL_VERSION_BATCH_SIZE,
+    batch_bytes=BILL_VERSION_BATCH_BYTES,
+):
+    """
+    Given a data folder, read its BILL_VERSION_TBL.dat file in python
+    and send the rows to mysql as batched REPLACE statements. This is
+    slower than letting mysql do the import, but doesn't fail
+    mysteriously; batching keeps it to a few round trips per thousand
+    rows instead of one per row.
     """
 
     sql = """
@@ -156,22 +250,55 @@ def load_bill_versions(connection):
     sql = sql % ", ".join(["%s"] * 18)
 
     cursor = connection.cursor()
-    with open("BILL_VERSION_TBL.dat") as f:
-        for row in f:
-            # The files are supposedly already in utf-8, but with
-            # copious bogus characters.
-            row = clean_text(row)
-            row = dat_row_2_tuple(row)
-            with open(row.bill_xml) as f:
-                text = f.read()
-                text = clean_text(text)
-                row = row._replace(bill_xml=text)
-                cursor.execute(sql, [encode_or_none(column) for column in row])
+    start = time.time()
+    loaded = 0
+    batch = []
+    size = 0
+
+    def flush():
+        nonlocal loaded, batch, size
+        if not batch:
+            return
+        # MySQLdb rewrites executemany() of a single VALUES clause into
+        # one multi-row statement.
+        cursor.executemany(sql, batch)
+        loaded += len(batch)
+        elapsed = time.time() - start
+        logger.info(
+            "bill_version_tbl: %d rows loaded (%.0f rows/s)"
+            % (loaded, loaded / elapsed if elapsed else 0)
+        )
+        batch = []
+        size = 0
+
+    for values in iter_bill_versions():
+        row_size = sum(len(v) for v in values if v)
+        if batch and size + row_size > batch_bytes:
+            flush()
+        batch.append(values)
+        size += row_size
+        if len(batch) >= batch_size:
+            flush()
+    flush()
 
     cursor.close()
 
 
-def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
+def upsert_script(script):
+    """
+    Make the LOAD DATA statements in a pubinfo_load script replace existing
+    rows (matched on the table's primary key) instead of failing on or
+    skipping them, so a daily delta can be applied on top of loaded data.
+    """
+    return re.sub(
+        r"(?:\b(?:REPLACE|IGNORE)\s+)?\bINTO\s+TABLE\b",
+        "REPLACE INTO TABLE",
+        script,
+        flags=re.IGNORECASE,
+    )
+
+
+def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql"), upsert=False):
     """
     Import into mysql any .dat files located in `folder`.
 
@@ -182,6 +309,9 @@ def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
     This function doesn't bother to delete the imported data files
     afterwards; they'll be overwritten within a week, and leaving them
     around makes testing easier (they're huge).
+
+    If `upsert` is set, rows already in the database are replaced by the
+    ones in the .dat files rather than kept.
     """
 
     logger.info("Loading data from %s..." % folder)
@@ -207,11 +337,13 @@ def load(folder, sql_name=partial(re.compile(r"\.dat$").sub, ".sql")):
 
             # Swap out windows paths.
             script = f.read().replace(r"c:\\pubinfo\\", folder)
+        if upsert:
+            script = upsert_script(script)
 
         _, sql_filename = split(sql_filename)
         logger.info("loading " + sql_filename)
         if sql_filename == "bill_version_tbl.sql":
-            logger.info("inserting xml files (slow)")
+            logger.info("inserting xml files")
             load_bill_versions(connection)
         else:
             cursor = connection.cursor()
@@ -307,15 +439,77 @@ def get_data(contents, year):
     for file in files_to_get:
         dirname = get_zip(file)
         load(dirname)
+        if file in contents:
+            record_applied_archive(file, contents[file])
+
+
+def get_daily_deltas(contents, applied):
+    """
+    Return the daily archive filenames published after the newest archive
+    in `applied`, oldest first.
+    """
+    last_applied = max(applied.values(), default=None)
+    deltas = [
+        (date, filename)
+        for filename, date in contents.items()
+        if filename.startswith("pubinfo_daily")
+        and (last_applied is None or date > last_applied)
+    ]
+    return [filename for date, filename in sorted(deltas)]
+
+
+def apply_deltas(contents):
+    """
+    Load the daily archives that haven't been applied yet on top of the
+    existing database. Returns False if there is no record of a previous
+    load to build on, or if some of the dailies since are no longer on the
+    server.
+    """
+    applied = get_applied_archives()
+    if not applied:
+        return False
+
+    # the server only keeps the last week or so of dailies: if the day
+    # after the last one we applied is gone, the database can't be
+    # brought up to date from them
+    last_applied = max(applied.values())
+    dailies = [
+        date
+        for filename, date in contents.items()
+        if filename.startswith("pubinfo_daily")
+    ]
+    if dailies and min(dailies).date() > last_applied.date() + timedelta(days=1):
+        logger.warning(
+            "oldest daily archive (%s) is more than a day after the last one applied "
+            "(%s), falling back to a full load" % (min(dailies), last_applied)
+        )
+        return False
+
+    deltas = get_daily_deltas(contents, applied)
+    if not deltas:
+        logger.info("capublic is up to date, nothing to apply")
+    for filename in deltas:
+        logger.info("applying %s (%s)" % (filename, contents[filename]))
+        dirname = get_zip(filename)
+        load(dirname, upsert=True)
+        record_applied_archive(filename, contents[filename])
+    return True
 
 
 if __name__ == "__main__":
     my_parser = argparse.ArgumentParser()
     my_parser.add_argument("--year", action="store", type=int)
+    my_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="apply new daily archives to the existing database instead of rebuilding it",
+    )
     args = my_parser.parse_args()
     year = args.year
 
-    db_drop()
-    db_create()
     contents = get_contents()
-    get_data(contents, year)
+    incremental = args.incremental and not year and db_exists()
+    if not (incremental and apply_deltas(contents)):
+        db_drop()
+        db_create()
+        get_data(contents, year)
@@ -1,27 +1,118 @@
+import os
 import re
+import json
+import hashlib
 import datetime
 import string
+import functools
 import urllib3
-from ftplib import FTP
-
-from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from ftplib import FTP, error_perm
 
 import fitz
 
 from openstates.scrape import Scraper, VoteEvent as Vote
+from utils.cache import cache_dir, read_json, write_json
+from utils.concurrency import prefetch
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+bill_re = re.compile(r"R\d+(?P<prefix>[A-Z]+)0+(?P<number>\d+)")
+voters_re = re.compile(r"(?P<type>Y|N|X|A)(\s+\d+)?\s+(?P<name>[^\n]+)")
+yes_re = re.compile(r"Those voting Yea[\s\.]+(?P<count>\d+)")
+no_re = re.compile(r"Those voting Nay[\s\.]+(?P<count>\d+)")
+other_re = re.compile(r"Those absent and not voting[\s\.]+(?P<count>\d+)")
+need_re = re.compile(r"Necessary for (?P<classification>.*?)[\s\.]+(?P<count>\d+)")
+date_re = re.compile(r".*Taken\s+on\s+(\d+/\s?\d+)")
+
+
+def read_vote(data, url, session):
+    """Reads a roll call PDF into a dict that can be kept as json. A
+    module-level function so that it can run in another process.
+    """
+    doc = fitz.open("pdf", data)
+    pdf_text = doc[0].get_text()
+
+    bill_data = bill_re.search(url).groupdict()
+
+    date = date_re.search(pdf_text).group(1)
+    date = date.replace(" ", "")
+    date = datetime.datetime.strptime(date + " " + session, "%m/%d %Y").date()
+
+    return {
+        "bill_id": bill_data["prefix"] + bill_data["number"],
+        "date": date.isoformat(),
+        "yes": int(yes_re.search(pdf_text).groupdict()["count"]),
+        "no": int(no_re.search(pdf_text).groupdict()["count"]),
+        "absent": int(other_re.search(pdf_text).groupdict()["count"]),
+        "need": int(need_re.search(pdf_text).groupdict()["count"]),
+        "voters": [
+            (t.group("type"), t.group("name")) for t in voters_re.finditer(pdf_text)
+        ],
+    }
+
+
+def read_downloaded_vote(file, session):
+    """read_vote for the (url, chamber, size, modified, data) of a
+    downloaded file, which prefetch passes whole.
+    """
+    url, _, _, _, data = file
+    return read_vote(data, url, session)
+
+
+def list_files(ftp):
+    """Returns {name: (size, modified)} for the files in the current
+    directory of an FTP connection; either is None if the server won't
+    say.
+    """
+    try:
+        return {
+            name: (facts.get("size"), facts.get("modify"))
+            for name, facts in ftp.mlsd(facts=["type", "size", "modify"])
+            if facts.get("type", "file") == "file"
+        }
+    except error_perm:
+        # no MLSD: ask for each file's size and time
+        ftp.voidcmd("TYPE I")
+        files = {}
+        for name in ftp.nlst():
+            try:
+                modified = ftp.sendcmd("MDTM " + name)[4:].strip()
+            except error_perm:
+                modified = None
+            try:
+                size = ftp.size(name)
+            except error_perm:
+                size = None
+            files[name] = (None if size is None else str(size), modified)
+        return files
+
 
 class CTVoteScraper(Scraper):
-    def scrape(self, chamber=None, session=None):
+    # workers: processes reading vote PDFs while the next ones download;
+    # 0 reads them in this process
+    def scrape(self, chamber=None, session=None, workers=4):
         chambers = [chamber] if chamber is not None else ["upper", "lower"]
-        yield from self.scrape_votes(session, chambers)
+
+        self.workers = int(workers)
+        if self.workers < 1:
+            self._pool = None
+            yield from self.scrape_votes(session, chambers)
+            return
+
+        with ProcessPoolExecutor(self.workers) as pool:
+            self._pool = pool
+            yield from self.scrape_votes(session, chambers)
 
     def scrape_votes(self, session, chambers):
+        """Yields the votes in the session's FTP folders. Each vote is kept in
+        a manifest with the size and modification time of its file, and only
+        files that are new or changed since the last run are downloaded and
+        read.
+        """
         chamber_map = {"lower": "h", "upper": "s"}
 
-        pdf_urls = []
+        files = {}
 
         ftp_host = "ftp.cga.ct.gov"
         ftp = FTP(ftp_host)
@@ -30,76 +121,97 @@ class CTVoteScraper(Scraper):
         for chamber in chambers:
             ftp_uri = f"/{session}/vote/{chamber_map[chamber]}/pdf/"
             ftp.cwd(ftp_uri)
-            files = ftp.nlst()
-            pdf_urls += [
-                (f"https://www.cga.ct.gov{ftp_uri}{file_name}", session, chamber)
-                for file_name in files
-            ]
+            for file_name, stat in list_files(ftp).items():
+                files[f"https://www.cga.ct.gov{ftp_uri}{file_name}"] = (chamber, stat)
 
         ftp.close()
 
-        for pdf_url, session, chamber in pdf_urls:
-            yield from self.parse_vote(pdf_url, session, chamber)
+        path = os.path.join(cache_dir("ct"), f"votes-{session}.json")
+        manifest = read_json(path, {})
+        # files that are gone from the server drop out of the manifest
+        current = {}
+        new_files = []
+        for pdf_url, (chamber, (size, modified)) in files.items():
+            entry = manifest.get(pdf_url)
+            # without both we can't tell, so the file is read again
+            if (
+                entry
+                and None not in (size, modified)
+                and [entry["size"], entry["modified"]] == [size, modified]
+            ):
+                current[pdf_url] = entry
+            else:
+                new_files.append((pdf_url, chamber, size, modified))
+        self.info(f"{len(new_files)} new or changed vote files of {len(files)}")
 
-    def parse_vote(self, url, session, vote_chamber):
         try:
-            response = self.get(url, verify=False)
-        except Exception as e:
-            self.error(f"Failed request in {url} - {e}")
-            return
-
-        pdf_content = BytesIO(response.content)
-        doc = fitz.open("pdf", pdf_content)
-
-        pdf_text = doc[0].get_text()
-
-        bill_re = re.compile(r"R\d+(?P<prefix>[A-Z]+)0+(?P<number>\d+)")
-        bill_data = bill_re.search(url).groupdict()
-        bill_id = bill_data["prefix"] + bill_data["number"]
-
-        voters_re = re.compile(r"(?P<type>Y|N|X|A)(\s+\d+)?\s+(?P<name>[^\n]+)")
-        voters = [t.groupdict() for t in voters_re.finditer(pdf_text)]
-
-        yes_re = re.compile(r"Those voting Yea[\s\.]+(?P<count>\d+)")
-        yes_count = int(yes_re.search(pdf_text).groupdict()["count"])
-
-        no_re = re.compile(r"Those voting Nay[\s\.]+(?P<count>\d+)")
-        no_count = int(no_re.search(pdf_text).groupdict()["count"])
-
-        other_re = re.compile(r"Those absent and not voting[\s\.]+(?P<count>\d+)")
-        other_count = int(other_re.search(pdf_text).groupdict()["count"])
-
-        need_re = re.compile(
-            r"Necessary for (?P<classification>.*?)[\s\.]+(?P<count>\d+)"
-        )
-        needs = need_re.search(pdf_text).groupdict()
-        need_count = int(needs["count"])
-
-        date_re = re.compile(r".*Taken\s+on\s+(\d+/\s?\d+)")
-        date = date_re.search(pdf_text).group(1)
-        date = date.replace(" ", "")
-        date = datetime.datetime.strptime(date + " " + session, "%m/%d %Y").date()
+            for pdf_url, entry in current.items():
+                yield self.vote_event(entry["vote"], pdf_url, session, entry["chamber"])
+
+            for pdf_url, chamber, size, modified, read in self.read_votes(
+                session, new_files
+            ):
+                data = read.result()
+                digest = hashlib.sha256(
+                    json.dumps(data, sort_keys=True).encode("utf-8")
+                ).hexdigest()
+                if pdf_url in manifest and manifest[pdf_url]["sha256"] == digest:
+                    self.info(f"{pdf_url} changed, but its vote didn't")
+                current[pdf_url] = {
+                    "chamber": chamber,
+                    "size": size,
+                    "modified": modified,
+                    "sha256": digest,
+                    "vote": data,
+                }
+                yield self.vote_event(data, pdf_url, session, chamber)
+        finally:
+            write_json(path, current)
+
+    def read_votes(self, session, files):
+        """Yields (url, chamber, size, modified, future of read_vote) for each
+        vote PDF that could be downloaded, in order. Up to `self.workers`
+        PDFs are read in other processes while the next ones download.
+        """
+
+        def downloaded():
+            for url, chamber, size, modified in files:
+                try:
+                    response = self.get(url, verify=False)
+                except Exception as e:
+                    self.error(f"Failed request in {url} - {e}")
+                    continue
+                yield url, chamber, size, modified, response.content
+
+        read_file = functools.partial(read_downloaded_vote, session=session)
+        for (url, chamber, size, modified, _), read in prefetch(
+            downloaded(), read_file, self.workers, self._pool
+        ):
+            yield url, chamber, size, modified, read
+
+    def vote_event(self, data, url, session, vote_chamber):
+        bill_id = data["bill_id"]
+        date = datetime.date.fromisoformat(data["date"])
         motion_text = "Senate Roll Call Vote" if "SV" in url else "House Roll Call Vote"
 
         vote = Vote(
             chamber=vote_chamber,
             start_date=date,
             motion_text=motion_text,
-            result="pass" if yes_count > need_count else "fail",
+            result="pass" if data["yes"] > data["need"] else "fail",
             classification="passage",
             bill=bill_id,
             bill_chamber="upper" if bill_id[0] == "S" else "lower",
             legislative_session=session,
         )
-        vote.set_count("yes", yes_count)
-        vote.set_count("no", no_count)
-        vote.set_count("absent", other_count)
+        vote.set_count("yes", data["yes"])
+        vote.set_count("no", data["no"])
+        vote.set_count("absent", data["absent"])
         vote.add_source(url)
         vote.dedupe_key = url
 
-        for voter in voters:
-            name = string.capwords(voter["name"])
-            v_type = voter["type"]
+        for v_type, name in data["voters"]:
+            name = string.capwords(name)
             if v_type == "Y":
                 vote.yes(name)
             elif v_type == "N":
@@ -107,4 +219,4 @@ class CTVoteScraper(Scraper):
             else:
                 vote.vote("absent", name)
 
-        yield vote
+        return vote
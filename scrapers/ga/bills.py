@@ -1,8 +1,11 @@
+import os
 import re
+import time
 from collections import defaultdict
 
 from openstates.scrape import Scraper, Bill, VoteEvent
 
+from utils.cache import cache_dir, read_json, write_json
 from .util import get_client, get_url, backoff, SESSION_SITE_IDS
 
 #         Methods (7):
@@ -24,29 +27,50 @@ from .util import get_client, get_url, backoff, SESSION_SITE_IDS
 #            GetTitles()
 
 
-member_cache = {}
 SOURCE_URL = "https://www.legis.ga.gov/legislation/{bid}"
 
+# members' names are asked for again once they're this old, in case of a
+# correction or a name change
+MEMBER_NAMES_DAYS = 30
+
 vote_name_pattern = re.compile(r"(.*), (\d+(?:ST|ND|RD|TH))", re.IGNORECASE)
 
 
 class GABillScraper(Scraper):
-    lservice = get_client("Legislation").service
-    vservice = get_client("Votes").service
-    mservice = get_client("Members").service
     lsource = get_url("Legislation")
     msource = get_url("Members")
     vsource = get_url("Votes")
 
-    def get_member(self, member_id):
-        if member_id in member_cache:
-            return member_cache[member_id]
-
-        mem = backoff(self.mservice.GetMember, member_id)
-        member_cache[member_id] = mem
-        return mem
+    def get_member_name(self, member_id):
+        """Returns the Name fields (First, Last, ...) of a member, which
+        are kept on disk for MEMBER_NAMES_DAYS.
+        """
+        # json object keys are strings
+        key = str(member_id)
+        if key not in self.member_names:
+            mem = backoff(self.mservice.GetMember, member_id)
+            self.member_names[key] = {"fetched": time.time(), "name": dict(mem["Name"])}
+        return self.member_names[key]["name"]
 
     def scrape(self, session=None, chamber=None):
+        self.lservice = get_client("Legislation").service
+        self.vservice = get_client("Votes").service
+        self.mservice = get_client("Members").service
+
+        members_path = os.path.join(cache_dir("ga"), "member_names.json")
+        oldest = time.time() - MEMBER_NAMES_DAYS * 24 * 60 * 60
+        self.member_names = {
+            key: entry
+            for key, entry in read_json(members_path, {}).items()
+            # entries without a time are from before they expired
+            if entry.get("fetched", 0) > oldest
+        }
+        try:
+            yield from self.scrape_session(session)
+        finally:
+            write_json(members_path, self.member_names)
+
+    def scrape_session(self, session):
         bill_type_map = {
             "B": "bill",
             "R": "resolution",
@@ -280,13 +304,13 @@ class GABillScraper(Scraper):
             # 4976 is Sheila McNeill
             # whose profile is currently causing 500 errors
             sponsors = [
-                (x["Type"], self.get_member(x["MemberId"]))
+                (x["Type"], self.get_member_name(x["MemberId"]))
                 for x in sponsors
                 if x["MemberId"] != 4976
             ]
 
             for typ, sponsor in sponsors:
-                name = "{First} {Last}".format(**dict(sponsor["Name"]))
+                name = "{First} {Last}".format(**sponsor)
                 bill.add_sponsorship(
                     name,
                     entity_type="person",
@@ -1,4 +1,5 @@
 from suds.client import Client
+from suds.cache import ObjectCache
 import logging
 import socket
 import urllib.error
@@ -7,6 +8,9 @@ import suds
 import requests
 from hashlib import sha512
 
+from utils.cache import cache_dir
+from utils.ratelimit import TokenBucket
+
 
 logging.getLogger("suds").setLevel(logging.WARNING)
 log = logging.getLogger("openstates")
@@ -14,10 +18,26 @@ log = logging.getLogger("openstates")
 
 url = "http://webservices.legis.ga.gov/GGAServices/%s/Service.svc?wsdl"
 
+# parsed WSDLs are kept on disk for this long
+WSDL_CACHE_DAYS = 7
+
+# Seems like their server can't handle the load, so calls are limited to
+# one a second, without bursts
+bucket = TokenBucket(rate=1, capacity=1)
+
+_clients = {}
+
 
 def get_client(service):
-    client = backoff(Client, get_url(service), autoblend=True)
-    return client
+    """Returns the client for a service, creating it (from the WSDL cached
+    on disk, if it's there) the first time it's asked for.
+    """
+    if service not in _clients:
+        cache = ObjectCache(cache_dir("ga", "wsdl"), days=WSDL_CACHE_DAYS)
+        _clients[service] = backoff(
+            Client, get_url(service), autoblend=True, cache=cache
+        )
+    return _clients[service]
 
 
 def get_url(service):
@@ -28,7 +48,7 @@ def backoff(function, *args, **kwargs):
     retries = 5
 
     def _():
-        time.sleep(1)  # Seems like their server can't handle the load.
+        bucket.acquire()
         return function(*args, **kwargs)
 
     for attempt in range(retries):
@@ -2,14 +2,13 @@ import dateutil
 import lxml.html
 import pytz
 import re
-import tempfile
 
 from openstates.scrape import Scraper, Bill
-from openstates.utils import convert_pdf
 from scrapelib import HTTPError
+from utils.pdf import PDFMixin
 
 
-class GUBillScraper(Scraper):
+class GUBillScraper(Scraper, PDFMixin):
     _tz = pytz.timezone("Pacific/Guam")
     # non-greedy match on bills in the "list" page
     bill_match_re = re.compile("(<p>.*?<br>)", re.DOTALL)
@@ -26,15 +25,12 @@ class GUBillScraper(Scraper):
 
     def _download_pdf(self, url: str):
         try:
-            res = self.get(url)
+            text = self.fetch_pdf_text(url, type="xml")
         except HTTPError:
             # This vote document wasn't found.
             msg = "No document found at url %r" % url
             self.logger.warning(msg)
             return
-        fd = tempfile.NamedTemporaryFile()
-        fd.write(res.content)
-        text = convert_pdf(fd.name, type="xml")
         data = lxml.html.fromstring(text).xpath("//text")
         # filter out empty and obvious text we don't need
         return "\n".join(
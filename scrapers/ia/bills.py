@@ -2,22 +2,37 @@ import re
 import datetime
 import lxml.html
 import requests
-import time
 from openstates.scrape import Scraper, Bill
+from utils.ratelimit import RequestBudget
 from .actions import Categorizer
 
 _IA_ORGANIZATION_ENTITY_NAME_KEYWORDS = ["COMMITTEE", "RULES AND ADMINISTRATION"]
 
+# IA cuts us off after 15-17 minutes of scraping; 600 requests (about 10
+# minutes' worth) followed by 7 minutes without any gets us the whole site
+IA_REQUEST_BUDGET = 600
+IA_COOLDOWN = 420
+# requests fetch_bill makes
+REQUESTS_PER_BILL = 3
+
 
 class IABillScraper(Scraper):
     categorizer = Categorizer()
 
-    def scrape(self, session=None, chamber=None, prefiles=None):
+    # budget, cooldown: requests made before the site needs a rest, and
+    # the seconds it needs after the last of them
+    def scrape(
+        self,
+        session=None,
+        chamber=None,
+        prefiles=None,
+        budget=IA_REQUEST_BUDGET,
+        cooldown=IA_COOLDOWN,
+    ):
 
         self.retry_attempts = 10
         self.retry_wait_seconds = 30
-        req_session = requests.Session()
-        req_session.headers.update({"X-Requested-With": "XMLHttpRequest"})
+        self.budget = RequestBudget(int(budget), int(cooldown))
         # openstates/issues#252 - IA continues to prefile after session starts
         # so we'll continue scraping both
         yield from self.scrape_prefiles(session)
@@ -26,15 +41,39 @@ class IABillScraper(Scraper):
             return
 
         session_id = self.get_session_id(session)
+        fetched = []
+        for chamber, bill_id, url, title, sponsors in self.list_bills(
+            session, session_id
+        ):
+            pages = self.fetch_bill(session_id, bill_id, url)
+            if pages:
+                fetched.append((pages, chamber, bill_id, title, sponsors))
+            if self.budget.remaining < REQUESTS_PER_BILL:
+                # parse what we have while the site cools down, then wait
+                # out whatever is left of the cooldown
+                yield from self.parse_fetched(session, session_id, fetched)
+                fetched = []
+                self.budget.wait()
+        yield from self.parse_fetched(session, session_id, fetched)
+
+    def fetch(self, url, req_session=None, **kwargs):
+        """GETs `url`, through `req_session` if given, counting it against
+        the request budget.
+        """
+        self.budget.spend()
+        if req_session is None:
+            return self.get(url, **kwargs)
+        return req_session.get(url, **kwargs)
+
+    def list_bills(self, session, session_id):
+        """Yields (chamber, bill_id, url, title, sponsors) for each bill;
+        title and sponsors are None for bills only found in the Bill Book.
+        """
+        req_session = requests.Session()
+        req_session.headers.update({"X-Requested-With": "XMLHttpRequest"})
         url = f"https://www.legis.iowa.gov/legislation/findLegislation/allbills?ga={session_id}"
-        page = lxml.html.fromstring(req_session.get(url).text)
-        start_time = time.time()
+        page = lxml.html.fromstring(self.fetch(url, req_session).text)
         for option in page.xpath("//*[@id='sortableTable']/tbody/tr"):
-            # Adding in timer here to track how long we are scraping, IA cuts us off at 15-17 mins
-            # If we scrape for 10 mins and then sleep 7 minutes we can scrape the whole site.
-            if (time.time() - start_time) >= 600:
-                time.sleep(420)
-                start_time = time.time()
             bill_id = option.xpath("td[2]/a/text()")[0]
             title = option.xpath("td[3]/text()")[0].split("(")[0]
             chamber = "lower" if bill_id[0] == "H" else "upper"
@@ -42,16 +81,14 @@ class IABillScraper(Scraper):
 
             bill_url = f"https://www.legis.iowa.gov/legislation/BillBook?ga={session_id}&ba={bill_id.replace(' ', '')}"
 
-            yield self.scrape_bill(
-                chamber, session, session_id, bill_id, bill_url, title, sponsors
-            )
+            yield chamber, bill_id, bill_url, title, sponsors
 
         # scrapes dropdown options on 'Bill Book' page
         #  to get bill types not found on 'All Bills' page
         bill_book_url = (
             f"https://www.legis.iowa.gov/legislation/BillBook?ga={session_id}"
         )
-        bill_book_page = lxml.html.fromstring(self.get(bill_book_url).text)
+        bill_book_page = lxml.html.fromstring(self.fetch(bill_book_url).text)
 
         other_bill_ids = []
         other_bill_prefixes = {"upper": ["SSB"], "lower": ["HSB"]}
@@ -66,9 +103,6 @@ class IABillScraper(Scraper):
                 other_bill_ids += values
 
         for bill_id in other_bill_ids:
-            if (time.time() - start_time) >= 600:
-                time.sleep(420)
-                start_time = time.time()
             bill_url = (
                 "https://www.legis.iowa.gov/"
                 f"legislation/BillBook?ga={session_id}&ba={bill_id}"
@@ -76,7 +110,13 @@ class IABillScraper(Scraper):
             chamber = "lower" if bill_id[0] == "H" else "upper"
 
             # title and sponsors for these will be found during detail page scraping
-            yield self.scrape_bill(chamber, session, session_id, bill_id, bill_url)
+            yield chamber, bill_id, bill_url, None, None
+
+    def parse_fetched(self, session, session_id, fetched):
+        for pages, chamber, bill_id, title, sponsors in fetched:
+            yield from self.scrape_bill(
+                pages, chamber, session, session_id, bill_id, title, sponsors
+            )
 
     # IA does prefiles on a separate page, with no bill numbers,
     # after introduction they'll link bill numbers to the prefile doc id
@@ -84,7 +124,7 @@ class IABillScraper(Scraper):
         prefile_url = (
             "https://www.legis.iowa.gov/legislation/billTracking/prefiledBills"
         )
-        page = lxml.html.fromstring(self.get(prefile_url).content)
+        page = lxml.html.fromstring(self.fetch(prefile_url).content)
         page.make_links_absolute(prefile_url)
 
         for row in page.xpath('//table[contains(@class, "sortable")]/tr[td]'):
@@ -123,34 +163,15 @@ class IABillScraper(Scraper):
         doc_id = re.findall(r"\((\d{4}\w{2})\)", title)
         return doc_id[0]
 
-    def scrape_subjects(self, bill, bill_number, session, req):
-
-        req.headers.update({"X-Requested-With": "XMLHttpRequest"})
-
-        session_id = self.get_session_id(session)
-        bill_id = bill_number.replace(" ", "+")
-        subject_url = (
-            "https://www.legis.iowa.gov/legislation/BillBook?ga={}"
-            "&billName={}&billVersion=i&action=getTaggedTopics&bl=false".format(
-                session_id, bill_id
-            )
-        )
-
-        html = req.get(subject_url, cookies=req.cookies).text
-        page = lxml.html.fromstring(html)
-
-        subjects = page.xpath('//div[@class="taggedTopics"]/a/text()')
-        for subject in subjects:
-            bill.add_subject(subject.strip())
-
-    def scrape_bill(
-        self, chamber, session, session_id, bill_id, url, title=None, sponsors=None
-    ):
+    def fetch_bill(self, session_id, bill_id, url):
+        """Gets the pages scrape_bill reads for a bill: the Bill Book
+        sidebar, the bill history and the tagged topics. Returns None if the
+        bill can't be scraped.
+        """
         req_session = requests.Session()
         req_session.headers.update({"X-Requested-With": "XMLHttpRequest"})
         try:
-            sidebar = lxml.html.fromstring(self.get(url, cookies=self.cookies).text)
-            sidebar.make_links_absolute("https://www.legis.iowa.gov")
+            sidebar = self.fetch(url, cookies=self.cookies).text
         except requests.exceptions.ConnectionError:
             self.warning("Connection closed without response, skipping")
             return
@@ -159,12 +180,36 @@ class IABillScraper(Scraper):
             f"https://www.legis.iowa.gov/legislation/billTracking/"
             f"billHistory?billName={bill_id}&ga={session_id}"
         )
-        req = req_session.get(hist_url)
+        req = self.fetch(hist_url, req_session)
         if req.status_code == 500:
             self.warning("500 error on {}, skipping".format(hist_url))
             return
+        if "No history is recorded at this time." in req.text:
+            return
+
+        subject_url = (
+            "https://www.legis.iowa.gov/legislation/BillBook?ga={}"
+            "&billName={}&billVersion=i&action=getTaggedTopics&bl=false".format(
+                session_id, bill_id.replace(" ", "+")
+            )
+        )
+        subjects = self.fetch(subject_url, req_session, cookies=req_session.cookies)
+
+        return {
+            "sidebar": sidebar,
+            "hist_url": hist_url,
+            "history": req.text,
+            "subjects": subjects.text,
+        }
+
+    def scrape_bill(
+        self, pages, chamber, session, session_id, bill_id, title=None, sponsors=None
+    ):
+        sidebar = lxml.html.fromstring(pages["sidebar"])
+        sidebar.make_links_absolute("https://www.legis.iowa.gov")
 
-        page = lxml.html.fromstring(req.text)
+        hist_url = pages["hist_url"]
+        page = lxml.html.fromstring(pages["history"])
         page.make_links_absolute("https://www.legis.iowa.gov")
 
         # bills that had neither title nor sponsors passed in
@@ -355,7 +400,10 @@ class IABillScraper(Scraper):
                     description=action, date=date, chamber=actor, classification=atype
                 )
 
-        self.scrape_subjects(bill, bill_id, session, req_session)
+        page = lxml.html.fromstring(pages["subjects"])
+        subjects = page.xpath('//div[@class="taggedTopics"]/a/text()')
+        for subject in subjects:
+            bill.add_subject(subject.strip())
 
         yield bill
 
@@ -4,9 +4,9 @@ import re
 import collections
 import lxml.etree
 
-from openstates.utils import convert_pdf
 from openstates.scrape import Scraper, VoteEvent
 from openstates.exceptions import EmptyScrape
+from utils.pdf import PDFMixin
 
 
 SITE_IDS = {
@@ -20,7 +20,7 @@ SITE_IDS = {
 }
 
 
-class IAVoteScraper(Scraper):
+class IAVoteScraper(Scraper, PDFMixin):
     def scrape(self, chamber=None, session=None):
         event_count = 0
         if chamber:
@@ -83,9 +83,7 @@ class IAVoteScraper(Scraper):
 
     def scrape_journal(self, url, chamber, session, date):
 
-        filename, response = self.urlretrieve(url)
-        self.logger.info(f"Saved journal to {filename}")
-        all_text = convert_pdf(filename, type="text")
+        all_text = self.fetch_pdf_text(url, type="text")
 
         lines = all_text.split(b"\n")
         lines = [line.decode("utf-8") for line in lines]
@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*-
 import re
-import os
 import datetime
 import pytz
 import scrapelib
 import lxml.html
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
+from utils.pdf import PDFMixin
 
 
 central = pytz.timezone("US/Central")
@@ -278,7 +277,8 @@ def chamber_slug(chamber):
     return "S"
 
 
-class IlBillScraper(Scraper):
+class IlBillScraper(Scraper, PDFMixin):
+    pdf_text_backend = "pymupdf"
     LEGISLATION_URL = "https://ilga.gov/legislation/grplist.asp"
     localize = pytz.timezone("America/Chicago").localize
 
@@ -693,12 +693,7 @@ class IlBillScraper(Scraper):
     def fetch_pdf_lines(self, href):
         # download the file
         try:
-            fname, resp = self.urlretrieve(href)
-            pdflines = [
-                line.decode("utf-8") for line in convert_pdf(fname, "text").splitlines()
-            ]
-            os.remove(fname)
-            return pdflines
+            return super().fetch_pdf_lines(href, "text")
         except scrapelib.HTTPError as e:
             assert "404" in e.args[0], "File not found: {}".format(e)
             self.warning("404 error for vote; skipping vote")
@@ -440,3 +440,5 @@ class INBillScraper(Scraper):
             )
 
             yield bill
+
+        client.log_stats()
@@ -1,13 +1,12 @@
 import dateutil
 import re
 import scrapelib
-import os
 from collections import defaultdict
 from pytz import timezone
 from datetime import datetime
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
 from utils import LXMLMixin
+from utils.pdf import PDFMixin
 from utils.media import get_media_type
 
 import pytz
@@ -27,7 +26,7 @@ def session_url(session):
     return "https://apps.legislature.ky.gov/record/%s/" % session[2:]
 
 
-class KYBillScraper(Scraper, LXMLMixin):
+class KYBillScraper(Scraper, LXMLMixin, PDFMixin):
     _TZ = timezone("America/Kentucky/Louisville")
     _subjects = defaultdict(list)
     _is_post_2016 = False
@@ -285,15 +284,12 @@ class KYBillScraper(Scraper, LXMLMixin):
     def scrape_votes(self, vote_url, bill, chamber):
 
         try:
-            filename, response = self.urlretrieve(vote_url)
+            text = self.fetch_pdf_text(vote_url, "text")
         except scrapelib.HTTPError:
             self.logger.warning("PDF not posted or available")
             return
         # Grabs text from pdf
-        pdflines = [
-            line.decode("utf-8") for line in convert_pdf(filename, "text").splitlines()
-        ]
-        os.remove(filename)
+        pdflines = [line.decode("utf-8") for line in text.splitlines()]
 
         vote_date = 0
         voters = defaultdict(list)
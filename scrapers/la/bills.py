@@ -1,19 +1,17 @@
 import datetime as dt
 import lxml.html
-import tempfile
-import os
 import re
 from collections import defaultdict
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
 from openstates.exceptions import EmptyScrape
 from utils import LXMLMixin
+from utils.pdf import PDFMixin
 
 # from . import actions
 from .actions import Categorizer
 
 
-class LABillScraper(Scraper, LXMLMixin):
+class LABillScraper(Scraper, LXMLMixin, PDFMixin):
     categorizer = Categorizer()
 
     _chambers = {"S": "upper", "H": "lower", "J": "legislature"}
@@ -52,8 +50,8 @@ class LABillScraper(Scraper, LXMLMixin):
 
     _start_year = ""
 
-    def pdf_to_lxml(self, filename, type="html"):
-        text = convert_pdf(filename, type)
+    def pdf_to_lxml(self, url, type="html"):
+        text = self.fetch_pdf_text(url, type)
         return lxml.html.fromstring(text)
 
     def _get_bill_abbreviations(self, session_id):
@@ -195,12 +193,7 @@ class LABillScraper(Scraper, LXMLMixin):
         else:
             type = []
 
-        (fd, temp_path) = tempfile.mkstemp()
-        self.urlretrieve(url, temp_path)
-
-        html = self.pdf_to_lxml(temp_path)
-        os.close(fd)
-        os.remove(temp_path)
+        html = self.pdf_to_lxml(url)
 
         vote_type = None
         body = html.xpath("string(/html/body)")
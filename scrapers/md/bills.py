@@ -4,7 +4,7 @@ import pytz
 
 import lxml.html
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
+from utils.pdf import PDFMixin
 
 # http://mgaleg.maryland.gov/mgawebsite/Legislation/Details/hb0060?ys=2019RS&search=True
 # # passed all
@@ -54,7 +54,7 @@ def _classify_action(action):
     return (None, ctty)
 
 
-class MDBillScraper(Scraper):
+class MDBillScraper(Scraper, PDFMixin):
     _TZ = pytz.timezone("US/Eastern")
     BASE_URL = "http://mgaleg.maryland.gov/mgawebsite/"
     CHAMBERS = {"upper": "senate", "lower": "house"}
@@ -101,9 +101,7 @@ class MDBillScraper(Scraper):
 
     def parse_vote_pdf(self, vote_url, bill):
 
-        filename, response = self.urlretrieve(vote_url)
-
-        text = convert_pdf(filename, type="text").decode()
+        text = self.fetch_pdf_text(vote_url, type="text").decode()
         lines = text.splitlines()
 
         if "Senate" in vote_url:
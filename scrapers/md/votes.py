@@ -2,12 +2,12 @@ import re
 import datetime
 from collections import defaultdict
 from utils import LXMLMixin
+from utils.pdf import PDFMixin
 from utils.votes import check_counts
 from openstates.scrape import Scraper, VoteEvent
-from openstates.utils import convert_pdf
 
 
-class MDVoteScraper(Scraper, LXMLMixin):
+class MDVoteScraper(Scraper, LXMLMixin, PDFMixin):
     def scrape(self, chamber=None, session=None):
         chambers = [chamber] if chamber is not None else ["upper", "lower"]
         for chamber in chambers:
@@ -33,8 +33,7 @@ class MDVoteScraper(Scraper, LXMLMixin):
                     seen_urls.add(vote_url)
 
     def scrape_vote(self, url, session):
-        fname, _ = self.urlretrieve(url)
-        text = convert_pdf(fname, type="text").decode()
+        text = self.fetch_pdf_text(url, type="text").decode()
         lines = text.splitlines()
 
         chamber = "upper" if "senate" in url else "lower"
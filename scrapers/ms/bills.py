@@ -1,9 +1,8 @@
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
 from datetime import datetime
+from utils.pdf import PDFMixin
 from .utils import append_parens
 import lxml.etree
-import os
 import re
 import pytz
 import scrapelib
@@ -21,7 +20,8 @@ def _combine_lines(lines):
     return newlines
 
 
-class MSBillScraper(Scraper):
+class MSBillScraper(Scraper, PDFMixin):
+    pdf_text_backend = "pymupdf"
     _tz = pytz.timezone("CST6CDT")
     _action_types = (
         ("Died in Committee", "committee-failure"),
@@ -374,14 +374,11 @@ class MSBillScraper(Scraper):
 
     def scrape_votes(self, url, motion, date, chamber, bill):
         try:
-            vote_pdf, resp = self.urlretrieve(url)
+            pdf_lines = self.fetch_pdf_lines(url, "text")
         except scrapelib.HTTPError:
             self.warning("Can't find vote file {}, skipping".format(url))
             return
 
-        text = convert_pdf(vote_pdf, "text")
-        os.remove(vote_pdf)
-
         # this way we get a key error on a missing vote type
         motion, passed = self._vote_mapping[motion]
 
@@ -405,7 +402,7 @@ class MSBillScraper(Scraper):
         )
 
         # split lines on newline, recombine lines that don't end in punctuation
-        lines = _combine_lines(text.decode().split("\n"))
+        lines = _combine_lines(pdf_lines)
 
         for line in lines:
 
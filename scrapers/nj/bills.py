@@ -11,11 +11,15 @@ from datetime import datetime
 import scrapelib
 from openstates.scrape import Scraper, Bill, VoteEvent
 
-from .utils import MDBMixin
+from .utils import MDBMixin, BillTableIndex, bill_id_for
 
 TIMEZONE = pytz.timezone("US/Eastern")
 
 
+def bill_chamber(bill_id):
+    return "lower" if bill_id[0] == "A" else "upper"
+
+
 class NJBillScraper(Scraper, MDBMixin):
     _bill_types = {
         "": "bill",
@@ -265,54 +269,63 @@ class NJBillScraper(Scraper, MDBMixin):
         yield from self.scrape_bills(session, year_abr)
 
     def scrape_bills(self, session, year_abr):
-        # Main Bill information
-        main_bill_csv = self.to_csv("MAINBILL.TXT")
-
-        # keep a dictionary of bills (mapping bill_id to Bill obj)
-        bill_dict = {}
-
-        for rec in main_bill_csv:
-            bill_type = rec["BillType"].strip()
-            bill_number = int(rec["BillNumber"])
-            bill_id = bill_type + str(bill_number)
-            title = rec["Synopsis"]
-            if bill_type[0] == "A":
-                chamber = "lower"
-            else:
-                chamber = "upper"
+        # Sponsors, documents, actions and subjects are grouped by bill
+        # first, so that each bill can be built (and saved) on its own
+        index = BillTableIndex()
+        try:
+            for table in ("BILLSPON.TXT", "BILLWP.TXT", "BILLHIST.TXT", "BILLSUBJ.TXT"):
+                index.add(table, self.to_csv(table))
+            index.finish()
+
+            # Main Bill information; bills with a blank title are skipped
+            bill_ids = set()
+            for rec in self.to_csv("MAINBILL.TXT"):
+                if rec["Synopsis"]:
+                    bill_ids.add(bill_id_for(rec))
+
+            for table, bill_id in index.unknown(bill_ids):
+                self.warning(
+                    "unknown bill %s in %s database"
+                    % (bill_id, self._index_names[table])
+                )
 
-            # some bills have a blank title.. just skip it
-            if not title:
-                continue
+            yield from self.scrape_votes(session, year_abr, bill_ids)
 
-            bill = Bill(
-                bill_id,
-                title=title,
-                chamber=chamber,
+            for rec in self.to_csv("MAINBILL.TXT"):
+                if rec["Synopsis"]:
+                    yield self.build_bill(session, year_abr, rec, index)
+        finally:
+            index.close()
+
+    _index_names = {
+        "BILLSPON.TXT": "sponsor",
+        "BILLWP.TXT": "document",
+        "BILLHIST.TXT": "action",
+        "BILLSUBJ.TXT": "subject",
+    }
+
+    def build_bill(self, session, year_abr, rec, index):
+        bill_type = rec["BillType"].strip()
+        bill_id = bill_id_for(rec)
+        title = rec["Synopsis"]
+
+        bill = Bill(
+            bill_id,
+            title=title,
+            chamber=bill_chamber(bill_id),
+            legislative_session=session,
+            classification=self._bill_types[bill_type[1:]],
+        )
+        if rec["IdenticalBillNumber"].strip():
+            bill.add_related_bill(
+                rec["IdenticalBillNumber"].split()[0],
                 legislative_session=session,
-                classification=self._bill_types[bill_type[1:]],
+                relation_type="companion",
             )
-            if rec["IdenticalBillNumber"].strip():
-                bill.add_related_bill(
-                    rec["IdenticalBillNumber"].split()[0],
-                    legislative_session=session,
-                    relation_type="companion",
-                )
-
-            # TODO: last session info is in there too
-            bill_dict[bill_id] = bill
+        # TODO: last session info is in there too
 
         # Sponsors
-        bill_sponsors_csv = self.to_csv("BILLSPON.TXT")
-
-        for rec in bill_sponsors_csv:
-            bill_type = rec["BillType"].strip()
-            bill_number = int(rec["BillNumber"])
-            bill_id = bill_type + str(bill_number)
-            if bill_id not in bill_dict:
-                self.warning("unknown bill %s in sponsor database" % bill_id)
-                continue
-            bill = bill_dict[bill_id]
+        for rec in index.rows("BILLSPON.TXT", bill_id):
             name = rec["Sponsor"]
             sponsor_type = rec["Type"]
             if sponsor_type == "P":
@@ -327,16 +340,7 @@ class NJBillScraper(Scraper, MDBMixin):
             )
 
         # Documents
-        bill_document_csv = self.to_csv("BILLWP.TXT")
-
-        for rec in bill_document_csv:
-            bill_type = rec["BillType"].strip()
-            bill_number = int(rec["BillNumber"])
-            bill_id = bill_type + str(bill_number)
-            if bill_id not in bill_dict:
-                self.warning("unknown bill %s in document database" % bill_id)
-                continue
-            bill = bill_dict[bill_id]
+        for rec in index.rows("BILLWP.TXT", bill_id):
             document = rec["Document"]
             document = document.split("\\")
             document = document[-2] + "/" + document[-1]
@@ -378,7 +382,39 @@ class NJBillScraper(Scraper, MDBMixin):
             else:
                 bill.add_document_link(doc_name, htm_url)
 
-        # Votes
+        # Actions
+        actor_map = {"A": "lower", "G": "executive", "S": "upper"}
+
+        for rec in index.rows("BILLHIST.TXT", bill_id):
+            action = rec["Action"]
+            date = rec["DateAction"]
+            date = dateutil.parser.parse(date)
+            actor = actor_map[rec["House"]]
+            comment = rec["Comment"]
+            action, atype = self.categorize_action(action, bill_id)
+            if comment:
+                action += " " + comment
+            bill.add_action(
+                action,
+                date=TIMEZONE.localize(date),
+                classification=atype,
+                chamber=actor,
+            )
+
+            source_url = (
+                f"https://www.njleg.state.nj.us/bill-search/{year_abr}/{bill_id}"
+            )
+            bill.add_source(source_url)
+
+        # Subjects
+        for rec in index.rows("BILLSUBJ.TXT", bill_id):
+            bill.subject.append(rec["SubjectKey"])
+
+        # add sources
+        bill.add_source("https://pub.njleg.state.nj.us/leg-databases/")
+        return bill
+
+    def scrape_votes(self, session, year_abr, bill_ids):
         next_year = int(year_abr) + 1
         vote_info_list = [
             "A%s" % year_abr,
@@ -444,6 +480,10 @@ class NJBillScraper(Scraper, MDBMixin):
                         committee = rec["Committee_House"]
                         vote_parts = (bill_id, chamber, action, committee)
 
+                    if bill_id not in bill_ids:
+                        self.warning("unknown bill %s in vote database" % bill_id)
+                        continue
+
                     date = datetime.strptime(date, "%m/%d/%Y")
                     vote_id = "_".join(vote_parts).replace(" ", "_")
 
@@ -454,7 +494,9 @@ class NJBillScraper(Scraper, MDBMixin):
                             motion_text=action,
                             classification="passage",
                             result=None,
-                            bill=bill_dict[bill_id],
+                            legislative_session=session,
+                            bill=bill_id,
+                            bill_chamber=bill_chamber(bill_id),
                         )
                         votes[vote_id].dedupe_key = vote_id
                     if leg_vote == "Y":
@@ -491,54 +533,3 @@ class NJBillScraper(Scraper, MDBMixin):
 
                 vote.add_source("https://www.njleg.state.nj.us/downloads.asp")
                 yield vote
-
-        # Actions
-        bill_action_csv = self.to_csv("BILLHIST.TXT")
-        actor_map = {"A": "lower", "G": "executive", "S": "upper"}
-
-        for rec in bill_action_csv:
-            bill_type = rec["BillType"].strip()
-            bill_number = int(rec["BillNumber"])
-            bill_id = bill_type + str(bill_number)
-            if bill_id not in bill_dict:
-                self.warning("unknown bill %s in action database" % bill_id)
-                continue
-            bill = bill_dict[bill_id]
-            action = rec["Action"]
-            date = rec["DateAction"]
-            date = dateutil.parser.parse(date)
-            actor = actor_map[rec["House"]]
-            comment = rec["Comment"]
-            action, atype = self.categorize_action(action, bill_id)
-            if comment:
-                action += " " + comment
-            bill.add_action(
-                action,
-                date=TIMEZONE.localize(date),
-                classification=atype,
-                chamber=actor,
-            )
-
-            source_url = (
-                f"https://www.njleg.state.nj.us/bill-search/{year_abr}/{bill_id}"
-            )
-            bill.add_source(source_url)
-
-        # Subjects
-        subject_csv = self.to_csv("BILLSUBJ.TXT")
-        for rec in subject_csv:
-            bill_id = rec["BillType"].strip() + str(int(rec["BillNumber"]))
-            if bill_id not in bill_dict:
-                self.warning("unknown bill %s in subject database" % bill_id)
-                continue
-            bill = bill_dict.get(bill_id)
-            if bill:
-                bill.subject.append(rec["SubjectKey"])
-            else:
-                self.warning("invalid bill id in BillSubj: %s" % bill_id)
-
-        # save all bills at the end
-        for bill in bill_dict.values():
-            # add sources
-            bill.add_source("https://pub.njleg.state.nj.us/leg-databases/")
-            yield bill
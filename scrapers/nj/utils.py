@@ -1,7 +1,12 @@
 import io
+import os
 import re
 import csv
+import json
+import shutil
+import sqlite3
 import zipfile
+import tempfile
 
 
 def clean_committee_name(comm_name):
@@ -30,6 +35,70 @@ class MDBMixin(object):
         self.zipfile = zipfile.ZipFile(fname)
 
     def to_csv(self, table):
-        buf = io.StringIO(self.zipfile.read(table).decode("cp1252"))
+        # decode the zip member as it is read instead of all at once
+        buf = io.TextIOWrapper(self.zipfile.open(table), encoding="cp1252", newline="")
         csvfile = csv.DictReader(buf)
         return csvfile
+
+
+def bill_id_for(rec):
+    return rec["BillType"].strip() + str(int(rec["BillNumber"]))
+
+
+class BillTableIndex(object):
+    """Rows of the per-bill tables of the legislative database (sponsors,
+    documents, history...), kept in a temporary sqlite database and
+    grouped by bill id, so a bill can be assembled from all of its rows
+    without every table (or every bill) being held in memory.
+    """
+
+    def __init__(self):
+        self._dir = tempfile.mkdtemp(prefix="nj-db-")
+        self.db = sqlite3.connect(os.path.join(self._dir, "bills.sqlite3"))
+        self.db.execute(
+            "CREATE TABLE rows (tbl TEXT, bill_id TEXT, seq INTEGER, data TEXT)"
+        )
+
+    def close(self):
+        self.db.close()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def add(self, table, rows):
+        """Stores every row of `rows` (dicts with BillType and BillNumber)
+        under `table`, preserving their order.
+        """
+        self.db.executemany(
+            "INSERT INTO rows VALUES (?, ?, ?, ?)",
+            (
+                (table, bill_id_for(rec), seq, json.dumps(rec))
+                for seq, rec in enumerate(rows)
+            ),
+        )
+        self.db.commit()
+
+    def finish(self):
+        """Call once all tables have been added, before querying."""
+        self.db.execute("CREATE INDEX rows_bill ON rows (bill_id, tbl, seq)")
+        self.db.commit()
+
+    def rows(self, table, bill_id):
+        """Returns the rows of `table` for one bill, in their original order."""
+        cursor = self.db.execute(
+            "SELECT data FROM rows WHERE bill_id = ? AND tbl = ? ORDER BY seq",
+            (bill_id, table),
+        )
+        return [json.loads(data) for (data,) in cursor]
+
+    def unknown(self, bill_ids):
+        """Yields (table, bill_id) for every row whose bill isn't in
+        `bill_ids`, in table order.
+        """
+        self.db.execute("CREATE TEMP TABLE known (bill_id TEXT PRIMARY KEY)")
+        self.db.executemany(
+            "INSERT OR IGNORE INTO known VALUES (?)", ((b,) for b in bill_ids)
+        )
+        yield from self.db.execute(
+            "SELECT tbl, bill_id FROM rows WHERE bill_id NOT IN "
+            "(SELECT bill_id FROM known) ORDER BY rowid"
+        )
+        self.db.execute("DROP TABLE known")
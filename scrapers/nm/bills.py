@@ -1,15 +1,10 @@
-import os
 import re
-import csv
-import zipfile
-import subprocess
 from datetime import datetime
 
-import lxml.html
-import lxml.etree
-
 from openstates.scrape import Scraper, Bill
 
+from .cache import folder_listing, leginfo_store
+
 
 def session_slug(session):
     if session == "2022S3":
@@ -27,48 +22,19 @@ def session_slug(session):
 
 class NMBillScraper(Scraper):
     def _init_mdb(self, session):
-        ftp_base = "ftp://www.nmlegis.gov/other/"
-        fname = "LegInfo{}".format(session[2:]).replace("S", "s")
-        fname_re = (
-            r"(\d{{2}}-\d{{2}}-\d{{2}}  \d{{2}}:\d{{2}}(?:A|P)M) .* "
-            "({fname}.*zip)".format(fname=fname)
-        )
+        # all of the data is in this Access DB, which is only downloaded and
+        # unpacked when it has changed
+        if getattr(self, "mdb", None) is None:
+            self.mdb = leginfo_store(self, session)
 
-        # use listing to get latest modified LegInfo zip
-        listing = self.get(ftp_base).text
-        matches = re.findall(fname_re, listing)
-        matches = sorted(
-            [
-                (datetime.strptime(date, "%m-%d-%y  %H:%M%p"), filename)
-                for date, filename in matches
-            ]
-        )
-        if not matches:
-            raise ValueError("{} contains no matching files.".format(ftp_base))
-
-        remote_file = ftp_base + matches[-1][1]
-
-        # all of the data is in this Access DB, download & retrieve it
-        # for specials, zip file is 21S2 but included mbd is 21s2
-        mdbfile = "{}.accdb".format(fname)
-
-        # if a new mdbfile or it has changed
-        if getattr(self, "mdbfile", None) != mdbfile:
-            self.mdbfile = mdbfile
-            fname, resp = self.urlretrieve(remote_file)
-            zf = zipfile.ZipFile(fname)
-            zf.extract(self.mdbfile)
-            os.remove(fname)
-
-    def access_to_csv(self, table):
-        """using mdbtools, read access tables as CSV"""
-        commands = ["mdb-export", self.mdbfile, table]
+    def access_to_csv(self, table, bill_prefix=None):
+        """using mdbtools, read access tables as CSV
+
+        Each table is exported once per scrape into a local store; rows can
+        be limited to those whose BillID starts with `bill_prefix`.
+        """
         try:
-            pipe = subprocess.Popen(
-                commands, stdout=subprocess.PIPE, close_fds=True
-            ).stdout
-            csvfile = csv.DictReader([line.decode("utf8") for line in pipe.readlines()])
-            return csvfile
+            yield from self.mdb.rows(table, bill_prefix)
         except OSError:
             self.warning("Failed to read mdb file. Have you installed " "'mdbtools' ?")
             raise
@@ -76,8 +42,13 @@ class NMBillScraper(Scraper):
     def scrape(self, chamber=None, session=None):
         chambers = [chamber] if chamber else ["upper", "lower"]
 
-        for chamber in chambers:
-            yield from self.scrape_chamber(chamber, session)
+        try:
+            for chamber in chambers:
+                yield from self.scrape_chamber(chamber, session)
+        finally:
+            if getattr(self, "mdb", None):
+                self.mdb.close()
+                self.mdb = None
 
     def scrape_chamber(self, chamber, session):
         chamber_letter = "S" if chamber == "upper" else "H"
@@ -117,11 +88,7 @@ class NMBillScraper(Scraper):
 
         # get all bills into this dict, fill in action/docs before saving
         bills = {}
-        for data in [
-            row
-            for row in self.access_to_csv("Legislation")
-            if row["BillID"].startswith(chamber_letter)
-        ]:
+        for data in self.access_to_csv("Legislation", chamber_letter):
             # use their BillID for the key but build our own for storage
             bill_key = data["BillID"].replace(" ", "")
 
@@ -200,10 +167,7 @@ class NMBillScraper(Scraper):
         # go through all of the links on these pages and add them to the
         # appropriate bills
         def check_docs(url, doc_type):
-            html = self.get(url).text
-            doc = lxml.html.fromstring(html)
-
-            for fname in doc.xpath("//a/text()"):
+            for fname in folder_listing(self, url):
                 # split filename into bill_id format
                 match = re.match(r"([A-Z]+)0*(\d{1,4})", fname)
                 if match:
@@ -423,11 +387,7 @@ class NMBillScraper(Scraper):
         # these actions need a committee name spliced in
         actions_with_committee = ("SENT", "7650", "7654")
 
-        for action in [
-            row
-            for row in self.access_to_csv("Actions")
-            if row["BillID"].startswith(chamber_letter)
-        ]:
+        for action in self.access_to_csv("Actions", chamber_letter):
             bill_key = action["BillID"].replace(" ", "")
 
             if bill_key not in bills:
@@ -497,12 +457,8 @@ class NMBillScraper(Scraper):
 
         self.info("Getting doc at {}".format(doc_path))
 
-        html = self.get(doc_path).text
-
-        doc = lxml.html.fromstring(html)
-
         # all links but first one
-        for fname in doc.xpath("//a/text()")[1:]:
+        for fname in folder_listing(self, doc_path)[1:]:
             # if a COPY continue
             if re.search("- COPY", fname):
                 continue
@@ -0,0 +1,127 @@
+"""
+Data the NM scrapers keep between runs and share with each other: the
+LegInfo Access database (along with the tables already exported from it)
+and the listings of the document folders on nmlegis.gov.
+"""
+import os
+import re
+import hashlib
+import zipfile
+import tempfile
+from datetime import datetime
+
+import lxml.html
+
+from utils.cache import cache_dir, cache_key, conditional_get, read_json, write_json
+from .mdb import MDBStore
+
+LEGINFO_FTP = "ftp://www.nmlegis.gov/other/"
+
+
+def latest_leginfo(scraper, session):
+    """Returns the url and the listed modification time of the newest
+    LegInfo zip for a session on the FTP site.
+    """
+    fname = "LegInfo{}".format(session[2:]).replace("S", "s")
+    fname_re = (
+        r"(\d{{2}}-\d{{2}}-\d{{2}}  \d{{2}}:\d{{2}}(?:A|P)M) .* "
+        "({fname}.*zip)".format(fname=fname)
+    )
+
+    # use listing to get latest modified LegInfo zip
+    listing = scraper.get(LEGINFO_FTP).text
+    matches = re.findall(fname_re, listing)
+    matches = sorted(
+        [
+            (datetime.strptime(date, "%m-%d-%y  %H:%M%p"), filename)
+            for date, filename in matches
+        ]
+    )
+    if not matches:
+        raise ValueError("{} contains no matching files.".format(LEGINFO_FTP))
+
+    modified, filename = matches[-1]
+    return LEGINFO_FTP + filename, modified.isoformat()
+
+
+def _unzip_leginfo(scraper, url, member, directory):
+    """Downloads a LegInfo zip and unpacks its database into `directory`,
+    named by the hash of its contents, which is returned.
+    """
+    fname, resp = scraper.urlretrieve(url)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as dst, zipfile.ZipFile(fname) as zf:
+            with zf.open(member) as src:
+                for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                    dst.write(chunk)
+        digest = digest.hexdigest()
+        os.replace(tmp, os.path.join(directory, digest + ".accdb"))
+    except BaseException:
+        os.remove(tmp)
+        raise
+    finally:
+        os.remove(fname)
+    return digest
+
+
+def leginfo_store(scraper, session):
+    """Returns an MDBStore for a session's LegInfo database.
+
+    The zip is only downloaded and unpacked when the FTP listing shows a
+    newer one than last time. Databases are kept by the hash of their
+    contents, and so are the tables exported from them, so a zip that was
+    uploaded again without changes doesn't get its tables exported again
+    either.
+    """
+    url, modified = latest_leginfo(scraper, session)
+    directory = cache_dir("nm", "leginfo")
+    state_path = os.path.join(directory, "{}.json".format(session))
+    state = read_json(state_path, {})
+
+    def path(digest, ext):
+        return os.path.join(directory, digest + ext)
+
+    digest = state.get("digest")
+    if (
+        digest is None
+        or (state.get("url"), state.get("modified")) != (url, modified)
+        or not os.path.exists(path(digest, ".accdb"))
+    ):
+        # for specials, zip file is 21S2 but included mbd is 21s2
+        member = "LegInfo{}.accdb".format(session[2:]).replace("S", "s")
+        scraper.info("downloading {}".format(url))
+        digest = _unzip_leginfo(scraper, url, member, directory)
+
+        old = state.get("digest")
+        if old and old != digest:
+            for ext in (".accdb", ".sqlite3"):
+                if os.path.exists(path(old, ext)):
+                    os.remove(path(old, ext))
+        write_json(state_path, {"url": url, "modified": modified, "digest": digest})
+
+    return MDBStore(path(digest, ".accdb"), path(digest, ".sqlite3"))
+
+
+def _parse_listing(response):
+    doc = lxml.html.fromstring(response.text)
+    return [str(text) for text in doc.xpath("//a/text()")]
+
+
+def folder_listing(scraper, url):
+    """Returns the text of the links in a document folder's listing (the
+    first link goes to the parent folder).
+
+    Each folder is fetched once per scraper, however many chambers look at
+    it. Between runs the listings are kept along with the ETag/Last-Modified
+    they were served with, so the listing of an unchanged folder isn't
+    downloaded or parsed again.
+    """
+    # kept on the scraper, so it goes away along with its scrape
+    listings = vars(scraper).setdefault("_folder_listings", {})
+    if url not in listings:
+        path = os.path.join(cache_dir("nm", "listings"), cache_key(url) + ".json")
+        listings[url], _ = conditional_get(scraper.get, url, path, _parse_listing)
+    return listings[url]
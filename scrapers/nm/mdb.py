@@ -0,0 +1,119 @@
+import io
+import os
+import csv
+import json
+import shutil
+import sqlite3
+import tempfile
+import subprocess
+
+
+def iter_access_table(mdbfile, table):
+    """Streams the rows of an Access table as dicts, using mdbtools'
+    mdb-export, without holding the whole export in memory.
+    """
+    proc = subprocess.Popen(
+        ["mdb-export", mdbfile, table], stdout=subprocess.PIPE, close_fds=True
+    )
+    try:
+        # newline="" lets the csv module handle newlines inside quoted fields
+        stream = io.TextIOWrapper(proc.stdout, encoding="utf8", newline="")
+        yield from csv.DictReader(stream)
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, ["mdb-export", table])
+
+
+class MDBStore(object):
+    """Access tables exported once into a local sqlite database, indexed by
+    BillID, so they can be queried repeatedly (e.g. once per chamber)
+    without running mdb-export again or keeping them in memory.
+
+    The database is temporary unless a `path` is given, in which case it is
+    kept, and tables exported by one store are there for the next store
+    opened on the same path.
+    """
+
+    def __init__(self, mdbfile, path=None):
+        self.mdbfile = mdbfile
+        self._dir = None
+        if path is None:
+            self._dir = tempfile.mkdtemp(prefix="nm-mdb-")
+            path = os.path.join(self._dir, "tables.sqlite3")
+        # exporting a table holds the lock, so give other processes time
+        self.db = sqlite3.connect(path, timeout=600, isolation_level=None)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS mdb_tables (name TEXT PRIMARY KEY, columns TEXT)"
+        )
+        self.tables = {}
+
+    def close(self):
+        self.db.close()
+        if self._dir:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+    def _load(self, table):
+        # another store on this database may have exported the table already
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                "SELECT columns FROM mdb_tables WHERE name = ?", [table]
+            ).fetchone()
+            if row:
+                self.tables[table] = json.loads(row[0])
+            else:
+                self._export(table)
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def _export(self, table):
+        rows = iter_access_table(self.mdbfile, table)
+        first = next(rows, None)
+        columns = list(first.keys()) if first else []
+        self.tables[table] = columns
+        self.db.execute(
+            "INSERT INTO mdb_tables VALUES (?, ?)", [table, json.dumps(columns)]
+        )
+        if not columns:
+            return
+
+        quoted = ", ".join('"{}"'.format(c.replace('"', '""')) for c in columns)
+        self.db.execute('CREATE TABLE "{}" ({})'.format(table, quoted))
+        insert = 'INSERT INTO "{}" VALUES ({})'.format(
+            table, ", ".join("?" * len(columns))
+        )
+
+        def values():
+            yield [first[c] for c in columns]
+            for row in rows:
+                yield [row[c] for c in columns]
+
+        self.db.executemany(insert, values())
+        if "BillID" in columns:
+            self.db.execute(
+                'CREATE INDEX "{0}_BillID" ON "{0}" ("BillID")'.format(table)
+            )
+
+    def rows(self, table, bill_prefix=None):
+        """Yields the rows of `table` as dicts, in their original order,
+        optionally only those whose BillID starts with `bill_prefix`.
+        """
+        if table not in self.tables:
+            self._load(table)
+        columns = self.tables[table]
+        if not columns:
+            return
+
+        sql = 'SELECT * FROM "{}"'.format(table)
+        params = []
+        if bill_prefix is not None:
+            # GLOB, unlike LIKE, is case sensitive
+            sql += ' WHERE "BillID" GLOB ?'
+            params.append(bill_prefix + "*")
+        sql += " ORDER BY rowid"
+        for values in self.db.execute(sql, params):
+            yield dict(zip(columns, values))
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from openstates import settings
+
+from nm import cache, mdb
+from utils.tests import fakes
+
+LISTING = (
+    "01-02-25  09:30AM       1000 LegInfo25.zip\r\n"
+    "01-03-25  10:15AM       1000 LegInfo25.zip\r\n"
+)
+
+
+class FakeScraper(fakes.FakeScraper):
+    def __init__(self, directory, database=b"accdb contents"):
+        super().__init__({cache.LEGINFO_FTP: fakes.FakeResponse(text=LISTING)})
+        self.directory = directory
+        self.database = database
+        self.downloads = 0
+
+    def urlretrieve(self, url):
+        self.downloads += 1
+        fname = os.path.join(self.directory, "download.zip")
+        with zipfile.ZipFile(fname, "w") as zf:
+            zf.writestr("LegInfo25.accdb", self.database)
+        return fname, None
+
+
+def fake_table(mdbfile, table):
+    fake_table.exports.append(table)
+    yield {"BillID": "SB  1", "Title": "one"}
+    yield {"BillID": "HB  2", "Title": "two"}
+
+
+class TestNMCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        for patcher in (
+            mock.patch.object(settings, "CACHE_DIR", self.dir),
+            mock.patch.object(mdb, "iter_access_table", fake_table),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        fake_table.exports = []
+
+    def test_leginfo_downloaded_and_exported_once(self):
+        scraper = FakeScraper(self.dir)
+        store = cache.leginfo_store(scraper, "2025")
+        self.assertEqual([r["Title"] for r in store.rows("Legislation", "S")], ["one"])
+        store.close()
+
+        # another scraper, the same upstream zip
+        scraper = FakeScraper(self.dir)
+        store = cache.leginfo_store(scraper, "2025")
+        self.assertEqual(
+            [r["Title"] for r in store.rows("Legislation")], ["one", "two"]
+        )
+        store.close()
+        self.assertEqual(scraper.downloads, 0)
+        self.assertEqual(fake_table.exports, ["Legislation"])
+
+    def test_changed_leginfo_replaces_old(self):
+        cache.leginfo_store(FakeScraper(self.dir), "2025").close()
+        directory = os.path.join(self.dir, "nm", "leginfo")
+        with mock.patch.object(cache, "latest_leginfo") as latest:
+            latest.return_value = (cache.LEGINFO_FTP + "LegInfo25.zip", "later")
+            scraper = FakeScraper(self.dir, b"new contents")
+            cache.leginfo_store(scraper, "2025").close()
+        self.assertEqual(scraper.downloads, 1)
+        self.assertEqual(
+            len([f for f in os.listdir(directory) if f.endswith(".accdb")]), 1
+        )
+
+    def test_folder_listing(self):
+        url = "http://www.nmlegis.gov/Sessions/25%20Regular/votes/"
+        page = '<a href="..">[To Parent Directory]</a><a href="x">SB0001SVOTE.PDF</a>'
+        scraper = FakeScraper(self.dir)
+        scraper.responses[url] = fakes.FakeResponse(text=page, headers={"etag": "abc"})
+        links = ["[To Parent Directory]", "SB0001SVOTE.PDF"]
+        self.assertEqual(cache.folder_listing(scraper, url), links)
+        # once per scraper
+        self.assertEqual(cache.folder_listing(scraper, url), links)
+        self.assertEqual(len(scraper.requests), 1)
+
+        # next scrape: conditional request
+        scraper = FakeScraper(self.dir)
+        scraper.responses[url] = fakes.FakeResponse(status_code=304)
+        self.assertEqual(cache.folder_listing(scraper, url), links)
+        self.assertEqual(scraper.requests[-1][1], {"If-None-Match": "abc"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import unittest
+
+import fitz
+
+from nm.votes import NMVoteScraper, read_vote_columns, vote_types
+
+here = os.path.dirname(__file__)
+
+# point this at a directory of saved roll call PDFs to check against more
+# of them
+TEST_DATA = os.path.join(here, "testData")
+FIXTURES = os.environ.get("NM_VOTE_FIXTURES", TEST_DATA)
+
+# the totals printed on the fixture PDFs; 2025_vote_house.pdf is a short,
+# made up House roll call in the current layout, with a PNV column
+KNOWN_TOTALS = {
+    "2017_vote_house.pdf": {"yes": 37, "no": 32, "excused": 1, "absent": 0},
+    "2025_vote_house.pdf": {"yes": 6, "no": 2, "other": 1, "excused": 1, "absent": 0},
+    "2017_vote_senate.pdf": {"yes": 39, "no": 2, "absent": 1, "excused": 0},
+}
+
+
+def load_fixtures():
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith(".pdf"):
+            with open(os.path.join(FIXTURES, name), "rb") as f:
+                yield name, f.read()
+
+
+def read_vote_table(data):
+    """The find_tables/DataFrame implementation the scraper falls back on."""
+    scraper = NMVoteScraper.__new__(NMVoteScraper)
+    page = fitz.open("pdf", data)[0]
+    df = page.find_tables().tables[0].to_pandas()
+    return scraper.extract_votes(vote_types, page.get_text(), df)
+
+
+# House roll calls from before the PNV column, which the table path can't read
+NO_PNV = {"2017_vote_house.pdf"}
+
+
+class TestVoteColumns(unittest.TestCase):
+    def test_known_totals(self):
+        for name, data in load_fixtures():
+            if name not in KNOWN_TOTALS:
+                continue
+            totals, record = read_vote_columns(data)
+            for vote_type, count in KNOWN_TOTALS[name].items():
+                self.assertEqual(totals[vote_type], count, name)
+                self.assertEqual(len(record[vote_type]), count, name)
+
+        _, record = read_vote_columns(dict(load_fixtures())["2017_vote_senate.pdf"])
+        self.assertEqual(record["no"], ["BRANDT", "WOODS"])
+        self.assertEqual(record["absent"], ["MOORES"])
+        self.assertEqual(record["date"].strftime("%Y-%m-%d"), "2017-01-18")
+
+        _, record = read_vote_columns(dict(load_fixtures())["2025_vote_house.pdf"])
+        self.assertEqual(record["other"], ["Block"])
+        self.assertEqual(record["excused"], ["Chandler"])
+
+    def test_matches_table(self):
+        checked = set()
+        for name, data in load_fixtures():
+            if name in NO_PNV:
+                continue
+            totals, record = read_vote_columns(data)
+            expected_totals, expected = read_vote_table(data)
+
+            self.assertEqual(record["date"], expected["date"], name)
+            for vote_type in vote_types:
+                self.assertEqual(record[vote_type], expected[vote_type], name)
+                self.assertEqual(
+                    totals[vote_type], int(expected_totals[vote_type]), name
+                )
+            checked.add(name)
+        self.assertTrue(checked)
+        if FIXTURES == TEST_DATA:
+            # a roll call from each chamber
+            self.assertIn("2017_vote_senate.pdf", checked)
+            self.assertIn("2025_vote_house.pdf", checked)
+
+
+if __name__ == "__main__":
+    unittest.main()
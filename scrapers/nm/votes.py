@@ -1,13 +1,17 @@
 import re
 from datetime import datetime
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 
 import fitz
 import scrapelib
-from lxml import html
 
 from openstates.scrape import Scraper, VoteEvent
 
+from utils.concurrency import prefetch
+
+from .cache import folder_listing
+
 # Senate vote header
 s_vote_header = re.compile(r"(YES)|(NO)|(ABS)|(EXC)|(REC)")
 # House vote header
@@ -16,13 +20,156 @@ h_vote_header = re.compile(r"(YEA(?!S))|(NAY(?!S))|(EXCUSED(?!:))|(ABSENT(?!:))"
 # Date regex for senate and house parser
 date_regex = re.compile(r"([0-1][0-9]/[0-3][0-9]/\d+)")
 
+# column headers of the vote tables, by the vote type they're for
+# HVOTE : REPRESENTATIVE YEA NAY PNV EXCUSED ABSENT
+# SVOTE : YES NO ABS EXC REC
+vote_columns = {
+    "YEA": "yes",
+    "YES": "yes",
+    "NAY": "no",
+    "NO": "no",
+    "ABSENT": "absent",
+    "ABS": "absent",
+    "EXCUSED": "excused",
+    "EXC": "excused",
+    "PNV": "other",
+    "REC": "other",
+}
+# totals above the House tables, e.g. "YEAS: 37"
+house_totals = {
+    "YEAS:": "yes",
+    "NAYS:": "no",
+    "ABSENT:": "absent",
+    "EXCUSED:": "excused",
+    "PNV:": "other",
+}
+vote_types = ["yes", "no", "absent", "excused", "other"]
+
+
+def _rows(words):
+    """Groups words (as returned by PyMuPDF) into lines by their vertical
+    centre, top to bottom, each sorted left to right.
+    """
+    rows = []
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        middle = (word[1] + word[3]) / 2
+        if rows and middle - rows[-1][0] <= (word[3] - word[1]) / 2:
+            rows[-1][1].append(word)
+        else:
+            rows.append((middle, [word]))
+    return [sorted(row, key=lambda w: w[0]) for _, row in rows]
+
+
+def read_vote_columns(data):
+    """Reads a roll call PDF's vote tables straight from the positions of
+    its words, without table detection: each X (or, on the Senate's TOTAL
+    row, each number) belongs to the vote column whose header it sits
+    under, and each name to the half of the page it's in.
+
+    Returns (total_votes, vote_record) like NMVoteScraper.extract_votes;
+    raises ValueError if the page doesn't look like a roll call.
+    """
+    with fitz.open("pdf", data) as doc:
+        words = [w for w in doc[0].get_text("words") if w[4].strip()]
+    rows = _rows(words)
+
+    text = " ".join(w[4] for w in words)
+    date = date_regex.search(text)
+    if date is None:
+        raise ValueError("no date found")
+    date_string = date.group()
+    if len(date_string) == 8:
+        vote_record = {"date": datetime.strptime(date_string, "%m/%d/%y")}
+    elif len(date_string) == 10:
+        vote_record = {"date": datetime.strptime(date_string, "%m/%d/%Y")}
+    else:
+        raise ValueError(f"Wrong date string in {date_string}")
+
+    for header_index, row in enumerate(rows):
+        header = [w for w in row if w[4] in vote_columns]
+        if len(header) >= 4:
+            break
+    else:
+        raise ValueError("no vote table found")
+
+    # the page has two tables side by side: a table's names are between
+    # the previous table's last vote column and its own first one
+    starts = [i for i, w in enumerate(header) if w[4] == header[0][4]]
+    name_bounds = [(header[i - 1][2] if i else 0, header[i][0]) for i in starts]
+    columns = [
+        (
+            (w[0] + w[2]) / 2,
+            vote_columns[w[4]],
+            len([start for start in starts if start <= i]) - 1,
+        )
+        for i, w in enumerate(header)
+    ]
+
+    totals = {}
+    for row in rows[:header_index]:
+        for label, number in zip(row, row[1:]):
+            if label[4] in house_totals and number[4].isdigit():
+                totals[house_totals[label[4]]] = int(number[4])
+
+    # voters by table, then vote type
+    voters = [{vote_type: [] for vote_type in vote_types} for _ in name_bounds]
+    for row in rows[header_index + 1 :]:
+        names = [[] for _ in name_bounds]
+        marks = []
+        for w in row:
+            for table, (left, right) in enumerate(name_bounds):
+                if left <= w[0] < right:
+                    names[table].append(w[4])
+                    break
+            else:
+                # the vote column it's under
+                middle = (w[0] + w[2]) / 2
+                _, vote_type, table = min(columns, key=lambda c: abs(c[0] - middle))
+                marks.append((table, vote_type, w[4]))
+        names = [" ".join(name) for name in names]
+
+        for table, vote_type, mark in marks:
+            if names[table] == "TOTAL =>":
+                if mark.isdigit():
+                    totals[vote_type] = int(mark)
+            elif names[table] and mark == "X":
+                voters[table][vote_type].append(names[table])
+    for vote_type in vote_types:
+        vote_record[vote_type] = [name for table in voters for name in table[vote_type]]
+
+    present = {vote_type for _, vote_type, _ in columns}
+    for vote_type in vote_types:
+        if vote_type not in totals:
+            if vote_type in present:
+                raise ValueError("no total for {}".format(vote_type))
+            totals[vote_type] = 0
+    return totals, vote_record
+
+
+def read_document_columns(document):
+    """read_vote_columns for the (url, bill_id, data) of a downloaded
+    document, which prefetch passes whole.
+    """
+    return read_vote_columns(document[2])
+
 
 class NMVoteScraper(Scraper):
-    def scrape(self, chamber=None, session=None):
+    # workers: processes reading vote PDFs while the next ones download;
+    # 0 reads them in this process
+    def scrape(self, chamber=None, session=None, workers=4):
         chambers = [chamber] if chamber else ["upper", "lower"]
 
-        for chamber in chambers:
-            yield from self.scrape_vote(chamber, session)
+        self.workers = int(workers)
+        if self.workers < 1:
+            self._pool = None
+            for chamber in chambers:
+                yield from self.scrape_vote(chamber, session)
+            return
+
+        with ProcessPoolExecutor(self.workers) as pool:
+            self._pool = pool
+            for chamber in chambers:
+                yield from self.scrape_vote(chamber, session)
 
     def scrape_vote(self, chamber, session):
         """most document types (+ Votes) are in this common directory go
@@ -32,11 +179,9 @@ class NMVoteScraper(Scraper):
         doc_path = "https://www.nmlegis.gov/Sessions/{}/votes/".format(session_path)
 
         self.info("Getting doc at {}".format(doc_path))
-        content = self.get(doc_path).text
-        tree = html.fromstring(content)
-
+        documents = []
         # all links but first one
-        for fname in tree.xpath("//a/text()")[1:]:
+        for fname in folder_listing(self, doc_path)[1:]:
             # If filename includes COPY or # or not PDF, skips them
             if "COPY" in fname or "#" in fname or "PDF" not in fname:
                 continue
@@ -58,30 +203,55 @@ class NMVoteScraper(Scraper):
             if ("SVOTE" in suffix and chamber == "upper") or (
                 "HVOTE" in suffix and chamber == "lower"
             ):
-                sv_doc = self.scrape_document(doc_path + fname)
-                if not sv_doc:
-                    continue
-
+                documents.append((doc_path + fname, bill_id))
+
+        for url, bill_id, data, read in self.read_documents(documents):
+            motion_text = "senate passage" if chamber == "upper" else "house passage"
+            try:
+                total_votes, vote_record = read.result()
+            except Exception as e:
+                # a table we can't read from word positions, a PDF the
+                # reader chokes on or a worker process that died: fall back
+                # to finding the table the slow way, for this PDF only
+                self.warning("Reading table from {} ({!r})".format(url, e))
                 vote = self.parse_vote(
-                    sv_doc, doc_path + fname, session, bill_id, chamber
+                    fitz.open("pdf", BytesIO(data)), url, session, bill_id, chamber
                 )
-                if not vote:
-                    self.warning(
-                        "Bad parse on the {} vote for {}".format(chamber, bill_id)
-                    )
-                else:
-                    yield vote
+            else:
+                vote = self.build_vote(
+                    session, bill_id, url, vote_record, chamber, motion_text
+                )
+                self.validate_vote(vote_types, total_votes, vote_record)
+
+            if not vote:
+                self.warning("Bad parse on the {} vote for {}".format(chamber, bill_id))
+            else:
+                yield vote
 
     def scrape_document(self, filelocation):
-        """Downloads PDF file content and converts into PyMuPDF object."""
+        """Downloads a PDF's contents."""
         try:
-            response = self.get(url=filelocation)
-            doc = fitz.open("pdf", BytesIO(response.content))
+            return self.get(url=filelocation).content
         except scrapelib.HTTPError:
             self.warning("Request failed: {}".format(filelocation))
-            return
 
-        return doc
+    def read_documents(self, documents):
+        """Yields (url, bill_id, data, future of read_vote_columns(data)) for
+        each vote PDF that could be downloaded, in order. Up to
+        `self.workers` PDFs are read in other processes while the next
+        ones download.
+        """
+
+        def downloaded():
+            for url, bill_id in documents:
+                data = self.scrape_document(url)
+                if data:
+                    yield url, bill_id, data
+
+        for (url, bill_id, data), read in prefetch(
+            downloaded(), read_document_columns, self.workers, self._pool
+        ):
+            yield url, bill_id, data, read
 
     def parse_vote(self, doc, url, session, bill_id, chamber):
         headers = ["yes", "no", "absent", "excused", "other"]
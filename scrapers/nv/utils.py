@@ -1,7 +1,8 @@
 import re
-import tempfile
 import subprocess
 
+from utils.pdf import convert_pdf_data
+
 
 def convert_pdf(filename, type="xml"):
     commands = {
@@ -24,10 +25,7 @@ def convert_pdf(filename, type="xml"):
 
 
 def pdfdata_to_text(data):
-    with tempfile.NamedTemporaryFile(delete=True) as tmpf:
-        tmpf.write(data)
-        tmpf.flush()
-        return convert_pdf(tmpf.name, "text")
+    return convert_pdf_data(data, "text")
 
 
 def text_after_line_numbers(lines):
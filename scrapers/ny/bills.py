@@ -1,16 +1,85 @@
+import os
 import re
 import datetime
+import hashlib
+import itertools
 import lxml.html
 import pytz
-from collections import defaultdict
 
 from openstates.scrape import Scraper, Bill, VoteEvent
 
+from utils.cache import cache_dir, cache_key, read_json, write_json
+from utils.concurrency import prefetch
 from .apiclient import OpenLegislationAPIClient
 from .actions import Categorizer
 
 eastern = pytz.timezone("US/Eastern")
 
+# window=auto starts this long before the last successful sync, for bills
+# updated while that sync was querying the API
+SYNC_OVERLAP = datetime.timedelta(minutes=10)
+
+assembly_vote_types = {
+    "Yes": "yes",
+    "No": "no",
+    "ER": "excused",
+    "AB": "absent",
+    "NV": "not voting",
+    "EL": "other",
+}
+
+
+def parse_assembly_votes(data, url):
+    """Reads the floor votes on an Assembly bill page into a list of dicts
+    (date, motion, yes and no counts, each member's vote and the vote's
+    dedupe key) that can be kept as json.
+    """
+    doc = lxml.html.fromstring(data)
+    doc.make_links_absolute(url)
+    if "Votes:" not in doc.text_content():
+        return []
+
+    votes = []
+    vote_motions = []
+    additional_votes_on_motion = 2
+    for table in doc.xpath("//table"):
+        date = table.xpath('caption/span[contains(., "DATE:")]')
+        date = next(date[0].itersiblings()).text
+        date = datetime.datetime.strptime(date, "%m/%d/%Y")
+        date = eastern.localize(date)
+        date = date.isoformat()
+
+        spanText = table.xpath("caption/span/text()")
+        motion = spanText[2].strip() + spanText[3].strip()
+        if motion in vote_motions:
+            motion = motion + f" - Vote {additional_votes_on_motion}"
+            additional_votes_on_motion += 1
+        else:
+            vote_motions.append(motion)
+
+        counts = table.xpath("caption/span/span")[0].text.split(":")[1].split("/")
+        yes_count, no_count = map(int, counts)
+
+        votes.append(
+            {
+                "date": date,
+                "motion": motion,
+                "yes": yes_count,
+                "no": no_count,
+                "votes": [
+                    (
+                        div.xpath('string(div[@class="vote"])')
+                        .replace("‡", "")
+                        .strip(),
+                        div.xpath('string(div[@class="name"])').strip(),
+                    )
+                    for div in table.xpath('//div[@class="vote-name"]')
+                ],
+                "dedupe_key": url + motion + spanText[1],
+            }
+        )
+    return votes
+
 
 class NYBillScraper(Scraper):
     categorizer = Categorizer()
@@ -67,6 +136,20 @@ class NYBillScraper(Scraper):
             "http://www.nysenate.gov/legislation/bills/{bill_session}/" "{bill_id}"
         ).format(bill_session=bill["session"], bill_id=bill_id)
 
+        assembly_url = self._assembly_url(bill)
+
+        return (
+            senate_url,
+            assembly_url,
+            bill_chamber,
+            bill_type,
+            bill_id,
+            title,
+            (prefix, number, active_version),
+        )
+
+    def _assembly_url(self, bill):
+        bill_id = bill["basePrintNo"]
         # assembly_url = (
         #     "http://assembly.state.ny.us/leg/?default_fld=&bn={bill_id}"
         #     "&Summary=Y&Actions=Y&Text=Y"
@@ -82,20 +165,10 @@ class NYBillScraper(Scraper):
             assembly_bill_id = assembly_bill_id[0] + "0" + assembly_bill_id[-4:]
         else:
             assembly_bill_id = bill_id
-        assembly_url = (
+        return (
             "https://nyassembly.gov/leg/?default_fld=&leg_video=&bn={bill_id}&term={term}"
         ).format(bill_id=assembly_bill_id, term=bill["session"])
 
-        return (
-            senate_url,
-            assembly_url,
-            bill_chamber,
-            bill_type,
-            bill_id,
-            title,
-            (prefix, number, active_version),
-        )
-
     def _parse_senate_votes(self, vote_data, bill, url):
         vote_datetime = datetime.datetime.strptime(vote_data["voteDate"], "%Y-%m-%d")
         if vote_data["voteType"] == "FLOOR":
@@ -176,9 +249,11 @@ class NYBillScraper(Scraper):
 
         return vote
 
-    def _generate_bills(self, session, window=None):
+    def _generate_bills(self, session, since=None, until=None):
+        """Yields every bill of the session in full or, given `since`, the
+        summaries of the bills updated between `since` and `until`.
+        """
         self.logger.info("Generating bills.")
-        bills = defaultdict(list)
 
         delimiter = "-"
         (start_year, delimiter, end_year) = session.partition(delimiter)
@@ -195,18 +270,13 @@ class NYBillScraper(Scraper):
 
             # Response should be a dict of the JSON data returned from
             # the Open Legislation API.
-            if window:
-                to_datetime = datetime.datetime.now()
-                from_datetime = datetime.datetime.now() - self.parse_relative_time(
-                    window
-                )
-
+            if since:
                 # note for debugging:
                 # set detail=True to see what changed on the bill
                 response = self.api_client.get(
                     "updated_bills",
-                    from_datetime=from_datetime.replace(microsecond=0).isoformat(),
-                    to_datetime=to_datetime.replace(microsecond=0).isoformat(),
+                    from_datetime=since.isoformat(),
+                    to_datetime=until.isoformat(),
                     detail=False,
                     summary=True,
                     limit=limit,
@@ -214,12 +284,12 @@ class NYBillScraper(Scraper):
                     type="updated",
                 )
 
-                self.info(
-                    "{} bills updated since {}".format(
-                        response["total"],
-                        from_datetime.replace(microsecond=0).isoformat(),
+                if page == 1:
+                    self.info(
+                        "{} bills updated since {}".format(
+                            response["total"], since.isoformat()
+                        )
                     )
-                )
             else:
                 response = self.api_client.get(
                     "bills",
@@ -234,25 +304,41 @@ class NYBillScraper(Scraper):
                 or response["offsetStart"] > response["offsetEnd"]
             ):
                 break
-            else:
-                bills = response["result"]["items"]
-
-            for bill in bills:
-                if window:
-                    # https://legislation.nysenate.gov/api/3/bills/2017/S8570
-                    # unfortunately the updated bills since N api doesn't offer
-                    # the full bill info, so get them individually
-                    resp = self.api_client.get(
-                        "bill",
-                        session_year=bill["item"]["session"],
-                        bill_id=bill["item"]["printNo"],
-                        summary=False,
-                        detail=True,
-                    )
-                    bill = resp["result"]
-                yield bill
 
-    def _scrape_bill(self, session, bill_data):
+            for bill in response["result"]["items"]:
+                yield bill["item"] if since else bill
+
+    def fetch_bill(self, bill, summary):
+        """Returns a bill in full (fetching it if `bill` is only the summary
+        updated_bills gives) and its Assembly floor votes.
+        """
+        if summary:
+            # https://legislation.nysenate.gov/api/3/bills/2017/S8570
+            # unfortunately the updated bills since N api doesn't offer
+            # the full bill info, so get them individually
+            resp = self.api_client.get(
+                "bill",
+                session_year=bill["session"],
+                bill_id=bill["printNo"],
+                summary=False,
+                detail=True,
+            )
+            bill = resp["result"]
+        assembly_votes = None
+        if str(bill["session"]) == self.term_start_year and bill["title"].strip():
+            assembly_votes = self.fetch_assembly_votes(self._assembly_url(bill))
+        return bill, assembly_votes
+
+    def prefetch_bills(self, bills, summaries):
+        """Yields the result of fetch_bill for each bill in order, started
+        for up to `self.workers` bills ahead of the one being scraped.
+        """
+        for bill, fetched in prefetch(
+            bills, lambda bill: self.fetch_bill(bill, summaries), self.workers
+        ):
+            yield fetched.result()
+
+    def _scrape_bill(self, session, bill_data, assembly_votes=None):
         details = self._parse_bill_details(bill_data)
 
         if details is None:
@@ -400,7 +486,9 @@ class NYBillScraper(Scraper):
         for vote_data in bill_data["votes"]["items"]:
             yield self._parse_senate_votes(vote_data, bill, api_url)
 
-        yield from self.scrape_assembly_votes(session, bill, assembly_url, bill_id)
+        yield from self.scrape_assembly_votes(
+            session, bill, assembly_url, bill_id, assembly_votes
+        )
 
         # A little strange the way it works out, but the Assembly
         # provides the HTML version documents and the Senate provides
@@ -464,95 +552,70 @@ class NYBillScraper(Scraper):
 
         yield bill
 
-    def scrape_assembly_votes(self, session, bill, assembly_url, bill_id):
-
+    def fetch_assembly_votes(self, assembly_url):
+        """Returns the parsed floor votes of an Assembly bill page. The votes
+        are kept with a hash of the page they came from, and a page that
+        hasn't changed since the last run isn't parsed again.
+        """
         # parse the bill data page, finding the latest html text
         url = assembly_url + "&Floor%26nbspVotes=Y"
 
         data = self.get(url, verify=False).text
-        doc = lxml.html.fromstring(data)
-        doc.make_links_absolute(url)
-
-        if "Votes:" in doc.text_content():
-            vote_motions = []
-            additional_votes_on_motion = 2
-            for table in doc.xpath("//table"):
-
-                date = table.xpath('caption/span[contains(., "DATE:")]')
-                date = next(date[0].itersiblings()).text
-                date = datetime.datetime.strptime(date, "%m/%d/%Y")
-                date = eastern.localize(date)
-                date = date.isoformat()
-
-                spanText = table.xpath("caption/span/text()")
-                motion = spanText[2].strip() + spanText[3].strip()
-                if motion in vote_motions:
-                    motion = motion + f" - Vote {additional_votes_on_motion}"
-                    additional_votes_on_motion += 1
-                else:
-                    vote_motions.append(motion)
-
-                votes = (
-                    table.xpath("caption/span/span")[0].text.split(":")[1].split("/")
-                )
-                yes_count, no_count = map(int, votes)
-                passed = yes_count > no_count
-                vote = VoteEvent(
-                    chamber="lower",
-                    start_date=date,
-                    motion_text=motion,
-                    bill=bill,
-                    result="pass" if passed else "fail",
-                    classification="passage",
-                )
+        digest = hashlib.sha256(data.encode("utf-8")).hexdigest()
+        path = os.path.join(cache_dir("ny", "assembly_votes"), cache_key(url) + ".json")
+        cached = read_json(path)
+        if cached and cached["sha256"] == digest:
+            return cached["votes"]
+
+        votes = parse_assembly_votes(data, url)
+        write_json(path, {"url": url, "sha256": digest, "votes": votes})
+        return votes
+
+    def scrape_assembly_votes(
+        self, session, bill, assembly_url, bill_id, assembly_votes=None
+    ):
+        if assembly_votes is None:
+            assembly_votes = self.fetch_assembly_votes(assembly_url)
+        url = assembly_url + "&Floor%26nbspVotes=Y"
 
-                vote.set_count("yes", yes_count)
-                vote.set_count("no", no_count)
-                absent_count = 0
-                excused_count = 0
-                nv_count = 0
-                other_count = 0
+        for data in assembly_votes:
+            passed = data["yes"] > data["no"]
+            vote = VoteEvent(
+                chamber="lower",
+                start_date=data["date"],
+                motion_text=data["motion"],
+                bill=bill,
+                result="pass" if passed else "fail",
+                classification="passage",
+            )
 
-                votes = [
-                    (
-                        div.xpath('string(div[@class="vote"])')
-                        .replace("‡", "")
-                        .strip(),
-                        div.xpath('string(div[@class="name"])').strip(),
-                    )
-                    for div in table.xpath('//div[@class="vote-name"]')
-                ]
-
-                vote_dictionary = {
-                    "Yes": "yes",
-                    "No": "no",
-                    "ER": "excused",
-                    "AB": "absent",
-                    "NV": "not voting",
-                    "EL": "other",
-                }
-
-                for vote_pair in votes:
-                    vote_val, name = vote_pair
-                    vote.vote(vote_dictionary[vote_val], name)
-                    if vote_val == "AB":
-                        absent_count += 1
-                    elif vote_val == "ER":
-                        excused_count += 1
-                    elif vote_val == "NV":
-                        nv_count += 1
-                    elif vote_val not in ["Yes", "No"]:
-                        other_count += 1
-
-                vote.set_count("absent", absent_count)
-                vote.set_count("excused", excused_count)
-                vote.set_count("not voting", nv_count)
-                vote.set_count("other", other_count)
-                vote.add_source(url)
-
-                vote.dedupe_key = url + motion + spanText[1]
-
-                yield vote
+            vote.set_count("yes", data["yes"])
+            vote.set_count("no", data["no"])
+            absent_count = 0
+            excused_count = 0
+            nv_count = 0
+            other_count = 0
+
+            for vote_val, name in data["votes"]:
+                vote.vote(assembly_vote_types[vote_val], name)
+                if vote_val == "AB":
+                    absent_count += 1
+                elif vote_val == "ER":
+                    excused_count += 1
+                elif vote_val == "NV":
+                    nv_count += 1
+                elif vote_val not in ["Yes", "No"]:
+                    other_count += 1
+
+            vote.set_count("absent", absent_count)
+            vote.set_count("excused", excused_count)
+            vote.set_count("not voting", nv_count)
+            vote.set_count("other", other_count)
+            vote.add_source(url)
+
+            vote.dedupe_key = data["dedupe_key"]
+
+            yield vote
 
     def parse_relative_time(self, time_str):
         regex = re.compile(
@@ -568,19 +631,59 @@ class NYBillScraper(Scraper):
                 time_params[name] = int(param)
         return datetime.timedelta(**time_params)
 
+    def last_sync(self, session):
+        """When the last scrape of every updated bill of the session began,
+        or None.
+        """
+        synced = read_json(os.path.join(cache_dir("ny"), "last_sync.json"), {})
+        if session in synced:
+            return datetime.datetime.fromisoformat(synced[session]) - SYNC_OVERLAP
+
+    def save_last_sync(self, session, started):
+        path = os.path.join(cache_dir("ny"), "last_sync.json")
+        synced = read_json(path, {})
+        synced[session] = started.isoformat()
+        write_json(path, synced)
+
     # This scrape supports both windowed scraping for
     # bills updated since a datetime, and individual bill scraping
     # NEW_YORK_API_KEY=key os-update ny bills --scrape bill_no=S155
     # or
     # NEW_YORK_API_KEY=key os-update ny bills --scrape window=5d1h
-    def scrape(self, session=None, bill_no=None, window=None):
+    # or, for the bills updated since the last scrape that finished:
+    # NEW_YORK_API_KEY=key os-update ny bills --scrape window=auto
+    #
+    # workers: bills whose details and Assembly votes are fetched ahead of
+    # the one being scraped; 0 fetches each in turn
+    def scrape(self, session=None, bill_no=None, window=None, workers=4):
         self.api_client = OpenLegislationAPIClient(self)
         self.term_start_year = session.split("-")[0]
+        self.workers = int(workers)
+
+        # the API takes times without a zone, in New York's
+        until = datetime.datetime.now(eastern).replace(tzinfo=None, microsecond=0)
+        since = None
+        if window == "auto":
+            since = self.last_sync(session)
+            if since is None:
+                self.info(
+                    "No previous scrape of {}, scraping every bill".format(session)
+                )
+        elif window:
+            since = until - self.parse_relative_time(window)
 
-        for bill in self._generate_bills(session, window):
-            if bill_no:
-                if bill["basePrintNo"] == bill_no.upper():
-                    yield from self._scrape_bill(session, bill)
-                    return
-            else:
-                yield from self._scrape_bill(session, bill)
+        bills = self._generate_bills(session, since, until)
+        if bill_no:
+            bills = itertools.islice(
+                (bill for bill in bills if bill["basePrintNo"] == bill_no.upper()), 1
+            )
+
+        try:
+            for bill, assembly_votes in self.prefetch_bills(bills, bool(since)):
+                yield from self._scrape_bill(session, bill, assembly_votes)
+        finally:
+            self.api_client.log_stats()
+
+        # a fixed window may have skipped bills updated before it
+        if not bill_no and window in (None, "auto"):
+            self.save_last_sync(session, until)
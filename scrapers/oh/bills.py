@@ -1,13 +1,41 @@
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from openstates.scrape import Scraper, Bill, VoteEvent
 import scrapelib
 import pytz
 import re
 import dateutil
 
+from utils.concurrency import prefetch, submit
+from utils.ratelimit import Throttle
+
 BAD_BILLS = [("134", "SB 92")]
 
 
+def bill_identifier(bill_name):
+    # S.R.No.1 -> SR1
+    bill_id = bill_name.replace("No.", "").strip()
+    bill_id = bill_id.replace(".", "").replace(" ", "").strip()
+    # put one space back in between type and number
+    return re.sub(r"([a-zA-Z]+)(\d+)", r"\1 \2", bill_id)
+
+
+def bill_url(session, bill_id):
+    return (
+        "https://search-prod.lis.state.oh.us/solarapi/v1/"
+        "general_assembly_{}/{}/{}/".format(
+            session,
+            "bills" if "B" in bill_id else "resolutions",
+            bill_id.lower().replace(" ", ""),
+        )
+    )
+
+
+def document_link(base_url, item):
+    return base_url + item["link"] + "?format=pdf"
+
+
 class OHBillScraper(Scraper):
     _tz = pytz.timezone("US/Eastern")
 
@@ -40,9 +68,19 @@ class OHBillScraper(Scraper):
         "amend_452": "Amended",
     }
 
-    def scrape(self, session=None, chambers=None):
+    # workers: API requests in flight at once (and bills fetched ahead of
+    # the one being scraped); 0 makes every request in turn. Workers only
+    # overlap the latency of requests: they still start no faster than
+    # requests_per_minute allows
+    def scrape(self, session=None, chambers=None, workers=4):
         # Bills endpoint can sometimes take a very long time to load
         self.timeout = 300
+        self.workers = int(workers)
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1))
+        self._throttle = Throttle(self.requests_per_minute)
+        # every request goes through fetch and so _throttle from here on;
+        # scrapelib's own throttle would space them out a second time
+        self.requests_per_minute = 0
         self.headers[
             "User-Agent"
         ] = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.63 Safari/537.36"
@@ -55,332 +93,426 @@ class OHBillScraper(Scraper):
             # an undocumented API
             yield from self.old_scrape(session)
 
+        elif self.workers < 1:
+            self._fetch_pool = self._task_pool = None
+            yield from self.api_scrape(session)
+
         else:
-            chamber_dict = {
-                "Senate": "upper",
-                "House": "lower",
-                "House of Representatives": "lower",
-                "house": "lower",
-                "senate": "upper",
-            }
-
-            # so presumably not everything passes, but we haven't
-            # seen anything not pass yet, so we'll need to wait
-            # till it fails and get the right language in here
-            vote_results = {
-                "approved": True,
-                "passed": True,
-                "adopted": True,
-                "true": True,
-                "false": False,
-                "failed": False,
-                True: True,
-                False: False,
-            }
-
-            action_dict = {
-                "ref_ctte_100": "referral-committee",
-                "intro_100": "introduction",
-                "intro_101": "introduction",
-                "pass_300": "passage",
-                "intro_110": "reading-1",
-                "refer_210": "referral-committee",
-                "crpt_301": None,
-                "crpt_317": None,
-                "concur_606": "passage",
-                "pass_301": "passage",
-                "refer_220": "referral-committee",
-                "intro_102": ["introduction", "passage"],
-                "intro_105": ["introduction", "passage"],
-                "intro_ref_ctte_100": "referral-committee",
-                "refer_209": None,
-                "intro_108": ["introduction", "passage"],
-                "intro_103": ["introduction", "passage"],
-                "msg_reso_503": "passage",
-                "intro_107": ["introduction", "passage"],
-                "imm_consid_360": "passage",
-                "refer_213": None,
-                "adopt_reso_100": "passage",
-                "adopt_reso_110": "passage",
-                "msg_507": "amendment-passage",
-                "confer_713": None,
-                "concur_603": None,
-                "confer_712": None,
-                "msg_506": "amendment-failure",
-                "receive_message_100": "passage",
-                "motion_920": None,
-                "concur_611": None,
-                "confer_735": None,
-                "third_429": None,
-                "final_501": None,
-                "concur_608": None,
-                "infpass_217": "passage",
-            }
-
-            base_url = "https://search-prod.lis.state.oh.us"
-            first_page = base_url
-            first_page += "/solarapi/v1/general_assembly_{session}/".format(
-                session=session
+            # requests are only ever made on the fetch pool; tasks that wait
+            # for requests run on their own pool, so they can't take up the
+            # threads the requests need
+            with ThreadPoolExecutor(self.workers) as fetch_pool, ThreadPoolExecutor(
+                self.workers
+            ) as task_pool:
+                self._fetch_pool = fetch_pool
+                self._task_pool = task_pool
+                yield from self.api_scrape(session)
+
+    def api_scrape(self, session):
+        chamber_dict = {
+            "Senate": "upper",
+            "House": "lower",
+            "House of Representatives": "lower",
+            "house": "lower",
+            "senate": "upper",
+        }
+
+        # so presumably not everything passes, but we haven't
+        # seen anything not pass yet, so we'll need to wait
+        # till it fails and get the right language in here
+        vote_results = {
+            "approved": True,
+            "passed": True,
+            "adopted": True,
+            "true": True,
+            "false": False,
+            "failed": False,
+            True: True,
+            False: False,
+        }
+
+        action_dict = {
+            "ref_ctte_100": "referral-committee",
+            "intro_100": "introduction",
+            "intro_101": "introduction",
+            "pass_300": "passage",
+            "intro_110": "reading-1",
+            "refer_210": "referral-committee",
+            "crpt_301": None,
+            "crpt_317": None,
+            "concur_606": "passage",
+            "pass_301": "passage",
+            "refer_220": "referral-committee",
+            "intro_102": ["introduction", "passage"],
+            "intro_105": ["introduction", "passage"],
+            "intro_ref_ctte_100": "referral-committee",
+            "refer_209": None,
+            "intro_108": ["introduction", "passage"],
+            "intro_103": ["introduction", "passage"],
+            "msg_reso_503": "passage",
+            "intro_107": ["introduction", "passage"],
+            "imm_consid_360": "passage",
+            "refer_213": None,
+            "adopt_reso_100": "passage",
+            "adopt_reso_110": "passage",
+            "msg_507": "amendment-passage",
+            "confer_713": None,
+            "concur_603": None,
+            "confer_712": None,
+            "msg_506": "amendment-failure",
+            "receive_message_100": "passage",
+            "motion_920": None,
+            "concur_611": None,
+            "confer_735": None,
+            "third_429": None,
+            "final_501": None,
+            "concur_608": None,
+            "infpass_217": "passage",
+        }
+
+        base_url = "https://search-prod.lis.state.oh.us"
+        first_page = base_url
+        first_page += "/solarapi/v1/general_assembly_{session}/".format(session=session)
+        # the four collections are paged through at the same time
+        sources = {
+            source_name: self.run_async(
+                self.get_other_data_source, first_page, base_url, source_name
             )
-            legislators = self.get_legislator_ids(first_page)
-            all_amendments = self.get_other_data_source(
-                first_page, base_url, "amendments"
+            for source_name in ("amendments", "fiscals", "synopsiss", "analysiss")
+        }
+        legislators = self.get_legislator_ids(first_page)
+        all_amendments = sources["amendments"].result()
+        all_fiscals = sources["fiscals"].result()
+        all_synopsis = sources["synopsiss"].result()
+        all_analysis = sources["analysiss"].result()
+        documents = [all_amendments, all_fiscals, all_synopsis, all_analysis]
+
+        bills = self.get_total_bills(session)
+        for bill, fetched in self.prefetch_bills(session, bills, base_url, documents):
+            bill_name = bill["name"]
+            bill_number = bill["number"]
+            bill_id = bill_identifier(bill_name)
+
+            chamber = "lower" if "H" in bill_id else "upper"
+            classification = "bill" if "B" in bill_id else "resolution"
+
+            title = bill["shorttitle"] if bill["shorttitle"] else "No title provided"
+            bill = Bill(
+                bill_id,
+                legislative_session=session,
+                chamber=chamber,
+                title=title,
+                classification=classification,
+            )
+            bill.add_source(
+                f"https://www.legislature.ohio.gov/legislation/{session}/{bill_number}"
             )
-            all_fiscals = self.get_other_data_source(first_page, base_url, "fiscals")
-            all_synopsis = self.get_other_data_source(first_page, base_url, "synopsiss")
-            all_analysis = self.get_other_data_source(first_page, base_url, "analysiss")
-
-            bills = self.get_total_bills(session)
-            for bill in bills:
-                bill_name = bill["name"]
-                bill_number = bill["number"]
-
-                # S.R.No.1 -> SR1
-                bill_id = bill_name.replace("No.", "").strip()
-                bill_id = bill_id.replace(".", "").replace(" ", "").strip()
-                # put one space back in between type and number
-                bill_id = re.sub(r"([a-zA-Z]+)(\d+)", r"\1 \2", bill_id)
-
-                chamber = "lower" if "H" in bill_id else "upper"
-                classification = "bill" if "B" in bill_id else "resolution"
-
-                title = (
-                    bill["shorttitle"] if bill["shorttitle"] else "No title provided"
-                )
-                bill = Bill(
-                    bill_id,
-                    legislative_session=session,
-                    chamber=chamber,
-                    title=title,
-                    classification=classification,
-                )
-                bill.add_source(
-                    f"https://www.legislature.ohio.gov/legislation/{session}/{bill_number}"
-                )
 
-                if (session, bill_id) in BAD_BILLS:
-                    self.logger.warning(
-                        f"Skipping details for known bad bill {bill_id}"
-                    )
-                    yield bill
-                    continue
+            if (session, bill_id) in BAD_BILLS:
+                self.logger.warning(f"Skipping details for known bad bill {bill_id}")
+                yield bill
+                continue
 
-                # get bill from API
-                bill_api_url = (
-                    "https://search-prod.lis.state.oh.us/solarapi/v1/"
-                    "general_assembly_{}/{}/{}/".format(
-                        session,
-                        "bills" if "B" in bill_id else "resolutions",
-                        bill_id.lower().replace(" ", ""),
+            # get bill from API
+            bill_api_url = bill_url(session, bill_id)
+            data = fetched["data"]
+            if len(data["items"]) == 0:
+                self.logger.warning(
+                    "Data for bill {bill_id} has empty 'items' array,"
+                    " cannot process related information".format(
+                        bill_id=bill_id.lower().replace(" ", "")
                     )
                 )
-                data = self.get(bill_api_url, verify=False).json()
-                if len(data["items"]) == 0:
-                    self.logger.warning(
-                        "Data for bill {bill_id} has empty 'items' array,"
-                        " cannot process related information".format(
-                            bill_id=bill_id.lower().replace(" ", "")
-                        )
-                    )
-                    yield bill
-                    continue
+                yield bill
+                continue
 
-                # add title if no short title
-                if not bill.title:
-                    bill.title = data["items"][0]["longtitle"]
-                bill.add_title(data["items"][0]["longtitle"], "long title")
-
-                # this stuff is version-specific
-                for version in data["items"]:
-                    version_name = version["version"]
-                    version_link = base_url + version["pdfDownloadLink"]
-                    bill.add_version_link(
-                        version_name, version_link, media_type="application/pdf"
-                    )
+            # add title if no short title
+            if not bill.title:
+                bill.title = data["items"][0]["longtitle"]
+            bill.add_title(data["items"][0]["longtitle"], "long title")
+
+            # this stuff is version-specific
+            for version in data["items"]:
+                version_name = version["version"]
+                version_link = base_url + version["pdfDownloadLink"]
+                bill.add_version_link(
+                    version_name, version_link, media_type="application/pdf"
+                )
 
-                # we'll use the latest bill_version for everything else
-                bill_version = data["items"][0]
-                bill.add_source(bill_api_url)
+            # we'll use the latest bill_version for everything else
+            bill_version = data["items"][0]
+            bill.add_source(bill_api_url)
 
-                # subjects
-                for subj in bill_version["subjectindexes"]:
-                    try:
-                        bill.add_subject(subj["primary"])
-                    except KeyError:
-                        pass
+            # subjects
+            for subj in bill_version["subjectindexes"]:
+                try:
+                    bill.add_subject(subj["primary"])
+                except KeyError:
+                    pass
+                try:
+                    secondary_subj = subj["secondary"]
+                except KeyError:
+                    secondary_subj = ""
+                if secondary_subj:
+                    bill.add_subject(secondary_subj)
+
+            # sponsors
+            sponsors = bill_version["sponsors"]
+            for sponsor in sponsors:
+                sponsor_name = self.get_sponsor_name(sponsor)
+                bill.add_sponsorship(
+                    sponsor_name,
+                    classification="primary",
+                    entity_type="person",
+                    primary=True,
+                )
+
+            cosponsors = bill_version["cosponsors"]
+            for sponsor in cosponsors:
+                sponsor_name = self.get_sponsor_name(sponsor)
+                bill.add_sponsorship(
+                    sponsor_name,
+                    classification="cosponsor",
+                    entity_type="person",
+                    primary=False,
+                )
+
+            try:
+                actions = fetched["action"].result()
+            except scrapelib.HTTPError:
+                pass
+            else:
+                for action_row in reversed(actions["items"]):
+                    actor = chamber_dict[action_row["chamber"]]
+                    action_desc = action_row["description"]
                     try:
-                        secondary_subj = subj["secondary"]
+                        action_type = action_dict[action_row["actioncode"]]
                     except KeyError:
-                        secondary_subj = ""
-                    if secondary_subj:
-                        bill.add_subject(secondary_subj)
-
-                # sponsors
-                sponsors = bill_version["sponsors"]
-                for sponsor in sponsors:
-                    sponsor_name = self.get_sponsor_name(sponsor)
-                    bill.add_sponsorship(
-                        sponsor_name,
-                        classification="primary",
-                        entity_type="person",
-                        primary=True,
-                    )
+                        self.warning(
+                            "Unknown action {desc} with code {code}."
+                            " Add it to the action_dict"
+                            ".".format(desc=action_desc, code=action_row["actioncode"])
+                        )
+                        action_type = None
 
-                cosponsors = bill_version["cosponsors"]
-                for sponsor in cosponsors:
-                    sponsor_name = self.get_sponsor_name(sponsor)
-                    bill.add_sponsorship(
-                        sponsor_name,
-                        classification="cosponsor",
-                        entity_type="person",
-                        primary=False,
-                    )
+                    date = dateutil.parser.parse(action_row["datetime"])
+                    if date.tzinfo is None:
+                        date = self._tz.localize(date)
 
-                try:
-                    action_doc = self.get(
-                        base_url + bill_version["action"][0]["link"],
-                        verify=False,
+                    date = "{:%Y-%m-%d}".format(date)
+
+                    action = bill.add_action(
+                        action_desc, date, chamber=actor, classification=action_type
                     )
-                except scrapelib.HTTPError:
-                    pass
-                else:
-                    actions = action_doc.json()
-                    for action_row in reversed(actions["items"]):
-                        actor = chamber_dict[action_row["chamber"]]
-                        action_desc = action_row["description"]
-                        try:
-                            action_type = action_dict[action_row["actioncode"]]
-                        except KeyError:
-                            self.warning(
-                                "Unknown action {desc} with code {code}."
-                                " Add it to the action_dict"
-                                ".".format(
-                                    desc=action_desc, code=action_row["actioncode"]
-                                )
-                            )
-                            action_type = None
-
-                        date = dateutil.parser.parse(action_row["datetime"])
-                        if date.tzinfo is None:
-                            date = self._tz.localize(date)
-
-                        date = "{:%Y-%m-%d}".format(date)
-
-                        action = bill.add_action(
-                            action_desc, date, chamber=actor, classification=action_type
+                    committee = action_row.get("committee", "")
+                    committee_id = action_row.get("cmte_lpid", "")
+                    if committee_id:
+                        committee = f'{action_row.get("chamber", "")} {committee} Committee'.strip()
+                        action.add_related_entity(
+                            committee,
+                            entity_type="organization",
                         )
-                        committee = action_row.get("committee", "")
-                        committee_id = action_row.get("cmte_lpid", "")
-                        if committee_id:
-                            committee = f'{action_row.get("chamber", "")} {committee} Committee'.strip()
-                            action.add_related_entity(
-                                committee,
-                                entity_type="organization",
-                            )
-
-                # attach documents gathered earlier
-                self.add_document(all_amendments, bill_id, "amendment", bill, base_url)
-                self.add_document(all_fiscals, bill_id, "fiscal", bill, base_url)
-                self.add_document(all_synopsis, bill_id, "synopsis", bill, base_url)
-                self.add_document(all_analysis, bill_id, "analysis", bill, base_url)
-
-                # votes
-                vote_url = base_url + bill_version["votes"][0]["link"]
-                try:
-                    vote_doc = self.get(vote_url)
-                except scrapelib.HTTPError:
-                    self.warning("Vote page not loading; skipping: {}".format(vote_url))
-                    yield bill
-                    continue
-                votes = vote_doc.json()
-                yield from self.process_vote(
-                    votes,
-                    vote_url,
-                    base_url,
-                    bill,
-                    legislators,
-                    chamber_dict,
-                    vote_results,
-                )
 
-                vote_url = base_url
-                vote_url += bill_version["cmtevotes"][0]["link"]
-                try:
-                    vote_doc = self.get(vote_url)
-                except scrapelib.HTTPError:
-                    self.warning("Vote page not loading; skipping: {}".format(vote_url))
-                    yield bill
-                    continue
-                votes = vote_doc.json()
-                yield from self.process_vote(
-                    votes,
-                    vote_url,
-                    base_url,
-                    bill,
-                    legislators,
-                    chamber_dict,
-                    vote_results,
+            # attach documents gathered earlier
+            heads = fetched["heads"]
+            self.add_document(
+                all_amendments, bill_id, "amendment", bill, base_url, heads
+            )
+            self.add_document(all_fiscals, bill_id, "fiscal", bill, base_url, heads)
+            self.add_document(all_synopsis, bill_id, "synopsis", bill, base_url, heads)
+            self.add_document(all_analysis, bill_id, "analysis", bill, base_url, heads)
+
+            # votes
+            vote_url = base_url + bill_version["votes"][0]["link"]
+            try:
+                votes = fetched["votes"].result()
+            except scrapelib.HTTPError:
+                self.warning("Vote page not loading; skipping: {}".format(vote_url))
+                yield bill
+                continue
+            yield from self.process_vote(
+                votes,
+                vote_url,
+                base_url,
+                bill,
+                legislators,
+                chamber_dict,
+                vote_results,
+                fetched["vote_details"],
+            )
+
+            vote_url = base_url
+            vote_url += bill_version["cmtevotes"][0]["link"]
+            try:
+                votes = fetched["cmtevotes"].result()
+            except scrapelib.HTTPError:
+                self.warning("Vote page not loading; skipping: {}".format(vote_url))
+                yield bill
+                continue
+            yield from self.process_vote(
+                votes,
+                vote_url,
+                base_url,
+                bill,
+                legislators,
+                chamber_dict,
+                vote_results,
+                fetched["vote_details"],
+            )
+
+            if data["items"][0]["effective_date"]:
+                effective_date = datetime.datetime.strptime(
+                    data["items"][0]["effective_date"], "%Y-%m-%d"
+                )
+                effective_date = self._tz.localize(effective_date)
+                # the OH website adds an action that isn't in the action list JSON.
+                # It looks like:
+                # Effective 7/6/18
+                effective_date_oh = "{:%-m/%-d/%y}".format(effective_date)
+                effective_action = "Effective {}".format(effective_date_oh)
+                bill.add_action(
+                    effective_action,
+                    effective_date,
+                    chamber="executive",
+                    classification=["became-law"],
                 )
 
-                if data["items"][0]["effective_date"]:
-                    effective_date = datetime.datetime.strptime(
-                        data["items"][0]["effective_date"], "%Y-%m-%d"
+            # we have never seen a veto or a disapprove, but they seem important.
+            # so we'll check and throw an error if we find one
+            # life is fragile. so are our scrapers.
+            if "veto" in bill_version:
+                veto_url = base_url + bill_version["veto"][0]["link"]
+                veto_json = fetched["veto"].result()
+                if len(veto_json["items"]) > 0:
+                    raise AssertionError(
+                        "Whoa, a veto! We've never"
+                        " gotten one before."
+                        " Go write some code to deal"
+                        " with it: {}".format(veto_url)
                     )
-                    effective_date = self._tz.localize(effective_date)
-                    # the OH website adds an action that isn't in the action list JSON.
-                    # It looks like:
-                    # Effective 7/6/18
-                    effective_date_oh = "{:%-m/%-d/%y}".format(effective_date)
-                    effective_action = "Effective {}".format(effective_date_oh)
-                    bill.add_action(
-                        effective_action,
-                        effective_date,
-                        chamber="executive",
-                        classification=["became-law"],
+
+            if "disapprove" in bill_version:
+                disapprove_url = base_url + bill_version["disapprove"][0]["link"]
+                disapprove_json = fetched["disapprove"].result()
+                if len(disapprove_json["items"]) > 0:
+                    raise AssertionError(
+                        "Whoa, a disapprove! We've never"
+                        " gotten one before."
+                        " Go write some code to deal "
+                        "with it: {}".format(disapprove_url)
                     )
 
-                # we have never seen a veto or a disapprove, but they seem important.
-                # so we'll check and throw an error if we find one
-                # life is fragile. so are our scrapers.
-                if "veto" in bill_version:
-                    veto_url = base_url + bill_version["veto"][0]["link"]
-                    veto_json = self.get(veto_url).json()
-                    if len(veto_json["items"]) > 0:
-                        raise AssertionError(
-                            "Whoa, a veto! We've never"
-                            " gotten one before."
-                            " Go write some code to deal"
-                            " with it: {}".format(veto_url)
-                        )
+            yield bill
 
-                if "disapprove" in bill_version:
-                    disapprove_url = base_url + bill_version["disapprove"][0]["link"]
-                    disapprove_json = self.get(disapprove_url).json()
-                    if len(disapprove_json["items"]) > 0:
-                        raise AssertionError(
-                            "Whoa, a disapprove! We've never"
-                            " gotten one before."
-                            " Go write some code to deal "
-                            "with it: {}".format(disapprove_url)
-                        )
+    def fetch(self, method, url, **kwargs):
+        """Makes a request, waiting for one of `self.workers` slots and,
+        since scrapelib's throttle isn't thread safe, for the next request
+        slot allowed by requests_per_minute. However many workers there
+        are, that's the cap: more of them only means more requests waiting
+        on the server at once.
+        """
+        with self._slots:
+            self._throttle.acquire()
+            return self.request(method, url, **kwargs)
 
-                yield bill
+    def fetch_json(self, url, **kwargs):
+        return self.fetch("GET", url, **kwargs).json()
+
+    def prefetch(self, method, url, **kwargs):
+        """Starts a request; returns a future of its response."""
+        return submit(self._fetch_pool, self.fetch, method, url, **kwargs)
+
+    def prefetch_json(self, url, **kwargs):
+        """Starts a GET request; returns a future of its decoded JSON."""
+        return submit(self._fetch_pool, self.fetch_json, url, **kwargs)
+
+    def run_async(self, fn, *args, **kwargs):
+        """Runs a function that makes requests of its own alongside the
+        scrape; returns a future of its result.
+        """
+        return submit(self._task_pool, fn, *args, **kwargs)
 
     def pages(self, base_url, first_page):
-        page = self.get(first_page)
-        page = page.json()
-        yield page
-        while "nextLink" in page:
-            page = self.get(base_url + page["nextLink"])
-            page = page.json()
+        # each page is processed while the next one downloads
+        page = self.fetch_json(first_page)
+        while True:
+            next_page = None
+            if "nextLink" in page:
+                next_page = self.prefetch_json(base_url + page["nextLink"])
             yield page
+            if next_page is None:
+                return
+            page = next_page.result()
+
+    def prefetch_bills(self, session, bills, base_url, documents):
+        """Yields (bill, fetched) for each bill in order, where fetched is the
+        result of fetch_bill, started for up to `self.workers` bills ahead
+        of the one being scraped. Bills we know to be bad get None.
+        """
+
+        def fetch(bill):
+            bill_id = bill_identifier(bill["name"])
+            if (session, bill_id) in BAD_BILLS:
+                return None
+            links = [
+                document_link(base_url, item)
+                for source in documents
+                for item in source.get(bill_id, [])
+            ]
+            return self.fetch_bill(bill_url(session, bill_id), base_url, links)
+
+        for bill, fetched in prefetch(bills, fetch, self.workers, self._task_pool):
+            yield bill, fetched.result()
+
+    def fetch_bill(self, bill_api_url, base_url, document_links):
+        """Gets a bill from the API and starts every request for what it
+        links to: actions, votes (and the details of votes that need them),
+        veto, disapprove and a HEAD of each document. Returns a dict of the
+        bill's data and futures for the rest; a future raises its request's
+        error when the scrape reads it.
+        """
+        data = self.fetch_json(bill_api_url, verify=False)
+        fetched = {
+            "data": data,
+            "heads": {
+                link: self.prefetch("HEAD", link, allow_redirects=False)
+                for link in document_links
+            },
+            "vote_details": {},
+        }
+        if not data["items"]:
+            return fetched
+
+        bill_version = data["items"][0]
+        fetched["action"] = self.prefetch_json(
+            base_url + bill_version["action"][0]["link"], verify=False
+        )
+        for key in ("votes", "cmtevotes", "veto", "disapprove"):
+            if key in bill_version:
+                fetched[key] = self.prefetch_json(
+                    base_url + bill_version[key][0]["link"]
+                )
+
+        # sometimes the actual vote is buried a second layer deep
+        for key in ("votes", "cmtevotes"):
+            try:
+                votes = fetched[key].result()
+            except Exception:
+                # raised again when the scrape gets to these votes
+                continue
+            for v in votes["items"]:
+                if "yeas" not in v:
+                    fetched["vote_details"][v["link"]] = self.prefetch_json(
+                        base_url + v["link"]
+                    )
+        return fetched
 
     def get_total_bills(self, session):
         # The /resolutions endpoint has included duplicate bills in its output, so use a set to filter duplicates
         bill_numbers_seen = set()
         total_bills = []
         bills_url = f"https://search-prod.lis.state.oh.us/solarapi/v1/general_assembly_{session}/bills"
-        bill_data = self.get(bills_url, verify=False).json()
+        bill_data = self.fetch_json(bills_url, verify=False)
         if len(bill_data["items"]) == 0:
             self.logger.warning("No bills")
         for bill in bill_data["items"]:
@@ -393,7 +525,7 @@ class OHBillScraper(Scraper):
                 )
 
         res_url = f"https://search-prod.lis.state.oh.us/solarapi/v1/general_assembly_{session}/resolutions"
-        res_data = self.get(res_url, verify=False).json()
+        res_data = self.fetch_json(res_url, verify=False)
         if len(res_data["items"]) == 0:
             self.logger.warning("No resolutions")
         for bill in res_data["items"]:
@@ -425,7 +557,9 @@ class OHBillScraper(Scraper):
 
         return bill_dict
 
-    def add_document(self, documents, bill_id, type_of_document, bill, base_url):
+    def add_document(
+        self, documents, bill_id, type_of_document, bill, base_url, heads=None
+    ):
         try:
             documents = documents[bill_id]
         except KeyError:
@@ -453,9 +587,12 @@ class OHBillScraper(Scraper):
                 name = item["amendnum"] + " " + item["version"]
             else:
                 name = item["name"] or type_of_document
-            link = base_url + item["link"] + "?format=pdf"
+            link = document_link(base_url, item)
             try:
-                self.head(link)
+                if heads and link in heads:
+                    heads[link].result()
+                else:
+                    self.fetch("HEAD", link, allow_redirects=False)
             except scrapelib.HTTPError:
                 self.logger.warning(
                     "The link to doc {name}"
@@ -481,7 +618,8 @@ class OHBillScraper(Scraper):
         legislators = {}
         for chamber in ["House", "Senate"]:
             url = base_url + "chamber/{chamber}/legislators?per_page=100"
-            doc = self.get(
+            doc = self.fetch(
+                "GET",
                 url.format(chamber=chamber),
                 verify=False,
             )
@@ -495,14 +633,25 @@ class OHBillScraper(Scraper):
         return " ".join([sponsor["firstname"], sponsor["lastname"]])
 
     def process_vote(
-        self, votes, url, base_url, bill, legislators, chamber_dict, vote_results
+        self,
+        votes,
+        url,
+        base_url,
+        bill,
+        legislators,
+        chamber_dict,
+        vote_results,
+        vote_details=None,
     ):
         for v in votes["items"]:
             try:
                 v["yeas"]
             except KeyError:
                 # sometimes the actual vote is buried a second layer deep
-                v = self.get(base_url + v["link"]).json()
+                if vote_details and v["link"] in vote_details:
+                    v = vote_details[v["link"]].result()
+                else:
+                    v = self.fetch_json(base_url + v["link"])
                 try:
                     v["yeas"]
                 except KeyError:
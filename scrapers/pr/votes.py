@@ -3,8 +3,8 @@ from datetime import datetime, time, timezone, timedelta
 import re
 import lxml.etree
 
-from openstates.utils import convert_pdf
 from openstates.scrape import Scraper, VoteEvent
+from utils.pdf import PDFMixin
 
 _measure_classifiers = (
     ("Nombramiento", "NM"),
@@ -24,7 +24,7 @@ _vote_classifiers = (
 )
 
 
-class PRVoteScraper(Scraper):
+class PRVoteScraper(Scraper, PDFMixin):
     def scrape(self, chamber=None, session=None):
         # only senate votes currently scraped
         if chamber and chamber != "upper":
@@ -53,9 +53,7 @@ class PRVoteScraper(Scraper):
             yield self.scrape_journal(url, chamber, session, date)
 
     def scrape_journal(self, url, chamber, session, date):
-        filename = self.urlretrieve(url)[0]
-        self.logger.info("Saved journal to %r", filename)
-        all_text = convert_pdf(filename, type="text")
+        all_text = self.fetch_pdf_text(url, type="text")
 
         lines = all_text.split(b"\n")
         lines = [line.decode("utf-8") for line in lines]
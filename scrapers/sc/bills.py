@@ -1,13 +1,12 @@
 import scrapelib
 
 import datetime
-import os
 import re
 from collections import defaultdict
 from functools import wraps
 
 from openstates.scrape import Scraper, Bill, VoteEvent
-from openstates.utils import convert_pdf
+from utils.pdf import PDFMixin
 import lxml.html
 import urllib
 
@@ -128,13 +127,15 @@ def get_index_url(session, chamber, chamber_letter):
     return index_url
 
 
-class SCBillScraper(Scraper):
+class SCBillScraper(Scraper, PDFMixin):
     """
     Bill scraper that pulls down all legislation on from SC website.
     Used to pull in information regarding Legislation, and basic associated metadata,
     using x-path to find and obtain the information
     """
 
+    pdf_text_backend = "pymupdf"
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.raise_errors = False
@@ -299,15 +300,13 @@ class SCBillScraper(Scraper):
         :param vote:  related voteEvent object
         :param vurl:  pdf source url
         """
-        (path, resp) = self.urlretrieve(vurl)
-        pdflines = convert_pdf(path, "text")
-        os.remove(path)
+        pdflines = self.fetch_pdf_lines(vurl, "text")
 
         current_vfunc = None
         option = None
 
-        for line in pdflines.split(b"\n"):
-            line = line.strip().decode()
+        for line in pdflines:
+            line = line.strip()
 
             # change what is being recorded
             if line.startswith("YEAS") or line.startswith("AYES"):
@@ -1,14 +1,16 @@
+import os
 import datetime
-import ftplib
 import re
-import time
+from collections import defaultdict
 from urllib import parse as urlparse
 import xml.etree.cElementTree as etree
 
 from openstates.scrape import Scraper, Bill
 from openstates.scrape.base import ScrapeError
 from utils import LXMLMixin
+from utils.cache import cache_dir, read_json, write_json
 from .actions import Categorizer
+from .ftp import FTPPool
 
 
 class TXBillScraper(Scraper, LXMLMixin):
@@ -29,77 +31,92 @@ class TXBillScraper(Scraper, LXMLMixin):
 
     def _get_ftp_files(self, dir_):
         """Recursively traverse an FTP directory, returning all files"""
-        for i in range(3):
-            try:
-                ftp = ftplib.FTP(self._FTP_ROOT)
-                break
-            except (EOFError, ftplib.error_temp):
-                time.sleep(2**i)
-        else:
-            raise Exception
-
-        ftp.login()
-        ftp.cwd("/" + dir_)
         self.info("Searching an FTP folder for files ({})".format(dir_))
-
-        lines = []
-        ftp.retrlines("LIST", lines.append)
-        for line in lines:
-            (_date, _time, is_dir, _file_size, name) = re.search(
-                r"""(?x)
-                    ^(\d{2}-\d{2}-\d{2})\s+  # Date in mm-dd-yy
-                    (\d{2}:\d{2}[AP]M)\s+  # Time in hh:mmAM/PM
-                    (<DIR>)?\s+  # Directories will have an indicating flag
-                    (\d+)?\s+  # Files will have their size in bytes
-                    (.+?)\s*$  # Directory or file name is the remaining text
-                    """,
-                line,
-            ).groups()
-            if is_dir:
-                for item in self._get_ftp_files("/".join([dir_, name])):
-                    yield item
-            else:
-                yield "/".join(["ftp://" + self._FTP_ROOT, dir_, name])
+        return self.ftp.walk(dir_)
 
     @staticmethod
     def _get_bill_id_from_file_path(file_path):
         bill_id = file_path.split("/")[-1].split(".")[0]
-        identifier, number = re.search(r"([A-Z]{2}R?)0+(\d+)", bill_id).groups()
+        # witness lists are named like HB00001H, bill histories like HB 1
+        match = re.search(r"([A-Z]{2}R?)\s*0*(\d+)", bill_id)
+        if match is None:
+            return None
+        identifier, number = match.groups()
         # House and Senate Concurrent and Joint Resolutions files do not contain
         # the 'R' for resolution in file names. This is required to match
         # bill ID's later on.
-        if re.match("[HS][CJ]", identifier):
+        if re.match("[HS][CJ]$", identifier):
             identifier += "R"
         return " ".join([identifier, number])
 
-    def scrape(self, session=None, chamber=None):
+    def scrape(self, session=None, chamber=None, incremental=None, ftp_connections=4):
+        """
+        With --scrape incremental=true, only bills whose history or witness
+        lists changed size or modified time since the last run are scraped.
+        """
         chambers = [chamber] if chamber else ["upper", "lower"]
+        # scrape arguments arrive as strings, so "false" and "0" are truthy
+        incremental = str(incremental).lower() in ("1", "true", "yes")
 
         session_code = self._format_session(session)
+        self.ftp = FTPPool(self._FTP_ROOT, size=int(ftp_connections))
 
-        self.witnesses = []
-        witness_files = self._get_ftp_files(
-            "bills/{}/witlistbill/html".format(session_code)
+        state_path = os.path.join(
+            cache_dir("tx"), "billhistory-{}.json".format(session_code)
         )
-        for item in witness_files:
-            bill_id = self._get_bill_id_from_file_path(item)
-            self.witnesses.append((bill_id, item))
-
-        history_files = self._get_ftp_files("bills/{}/billhistory".format(session_code))
-        for bill_url in history_files:
-            if "house" in bill_url:
-                if "lower" in chambers:
-                    yield from self.scrape_bill(session, bill_url)
-            elif "senate" in bill_url:
-                if "upper" in chambers:
-                    yield from self.scrape_bill(session, bill_url)
-
-    def scrape_bill(self, session, history_url):
-        history_xml = self.get(history_url).text
+        seen = read_json(state_path, {})
+
+        try:
+            self.witnesses = []
+            witness_stamps = defaultdict(list)
+            witness_files = self._get_ftp_files(
+                "bills/{}/witlistbill/html".format(session_code)
+            )
+            for item in witness_files:
+                bill_id = self._get_bill_id_from_file_path(item.url)
+                self.witnesses.append((bill_id, item.url))
+                witness_stamps[bill_id].append([item.path, item.size, item.modified])
+
+            history_files = self._get_ftp_files(
+                "bills/{}/billhistory".format(session_code)
+            )
+            for item in history_files:
+                bill_url = item.url
+                if "house" in bill_url:
+                    if "lower" not in chambers:
+                        continue
+                elif "senate" in bill_url:
+                    if "upper" not in chambers:
+                        continue
+                else:
+                    continue
+
+                # a new or changed witness list changes the bill too
+                witness_stamp = sorted(
+                    witness_stamps.get(self._get_bill_id_from_file_path(item.url), [])
+                )
+                stamp = [item.size, item.modified, witness_stamp]
+                # without a size and a time for every file we can't tell,
+                # so the bill is scraped
+                known = all(
+                    size is not None and modified is not None
+                    for _, size, modified in [[item.path, item.size, item.modified]]
+                    + witness_stamp
+                )
+                if incremental and known and seen.get(item.path) == stamp:
+                    continue
+                yield from self.scrape_bill(session, bill_url, item.path)
+                seen[item.path] = stamp
+        finally:
+            write_json(state_path, seen)
+            self.ftp.close()
+
+    def scrape_bill(self, session, history_url, history_path):
+        history_xml = self.ftp.read(history_path)
         root = etree.fromstring(history_xml)
 
         bill_title = root.findtext("caption")
-        if bill_title is None or "Bill does not exist" in history_xml:
+        if bill_title is None or b"Bill does not exist" in history_xml:
             self.warning("Bill does not appear to exist")
             return
         bill_id = " ".join(root.attrib["bill"].split(" ")[1:])
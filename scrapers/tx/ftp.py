@@ -0,0 +1,135 @@
+"""
+Pooled access to the Texas Legislature's FTP server.
+
+Directory listings come from an IIS server in its DOS style, e.g.
+
+    01-09-23  03:05PM       <DIR>          house_bills
+    01-09-23  03:05PM                 2716 HB00001.xml
+"""
+import io
+import re
+import time
+import ftplib
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+
+FTPFile = namedtuple("FTPFile", "url path size modified")
+
+_list_line_re = re.compile(
+    r"""(?x)
+    ^(\d{2}-\d{2}-\d{2}\s+\d{2}:\d{2}[AP]M)\s+  # mm-dd-yy hh:mmAM/PM
+    (<DIR>)?\s+  # Directories will have an indicating flag
+    (\d+)?\s+  # Files will have their size in bytes
+    (.+?)\s*$  # Directory or file name is the remaining text
+    """
+)
+
+
+def parse_list_line(line):
+    """Returns (name, is_dir, size, modified) for a line of LIST output."""
+    modified, is_dir, size, name = _list_line_re.search(line).groups()
+    return name, bool(is_dir), int(size) if size else None, modified
+
+
+class FTPPool(object):
+    """A pool of logged-in FTP connections to one host, each used by one
+    thread at a time.
+    """
+
+    def __init__(self, host, size=4):
+        self.host = host
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        for i in range(3):
+            try:
+                ftp = ftplib.FTP(self.host)
+                break
+            except (EOFError, ftplib.error_temp):
+                time.sleep(2**i)
+        else:
+            raise Exception("couldn't connect to ftp://{}".format(self.host))
+        ftp.login()
+        return ftp
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                ftp = self._idle.get_nowait()
+            except queue.Empty:
+                ftp = self._connect()
+            try:
+                yield ftp
+            except (EOFError, OSError, ftplib.Error):
+                # don't hand a connection in an unknown state to anyone else
+                ftp.close()
+                raise
+            self._idle.put(ftp)
+
+    def close(self):
+        while True:
+            try:
+                ftp = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                ftp.quit()
+            except (EOFError, OSError, ftplib.Error):
+                ftp.close()
+
+    def list_dir(self, path):
+        """Returns the parsed LIST output of a directory."""
+        lines = []
+        for attempt in range(3):
+            try:
+                with self.connection() as ftp:
+                    ftp.cwd("/" + path)
+                    ftp.retrlines("LIST", lines.append)
+                break
+            except (EOFError, OSError, ftplib.error_temp):
+                if attempt == 2:
+                    raise
+                lines = []
+                time.sleep(2**attempt)
+        return [parse_list_line(line) for line in lines]
+
+    def walk(self, root):
+        """Recursively lists `root`, listing up to `size` directories at
+        once, and returns every file below it sorted by path.
+        """
+        files = []
+        with ThreadPoolExecutor(self.size) as pool:
+            pending = {pool.submit(self.list_dir, root): root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    for name, is_dir, size, modified in future.result():
+                        child = "/".join([path, name])
+                        if is_dir:
+                            pending[pool.submit(self.list_dir, child)] = child
+                        else:
+                            url = "/".join(["ftp://" + self.host, child])
+                            files.append(FTPFile(url, child, size, modified))
+        return sorted(files, key=lambda f: f.path)
+
+    def read(self, path):
+        """Returns the contents of a file as bytes."""
+        buf = io.BytesIO()
+        for attempt in range(3):
+            try:
+                with self.connection() as ftp:
+                    ftp.retrbinary("RETR /" + path, buf.write)
+                break
+            except (EOFError, OSError, ftplib.error_temp):
+                if attempt == 2:
+                    raise
+                buf = io.BytesIO()
+                time.sleep(2**attempt)
+        return buf.getvalue()
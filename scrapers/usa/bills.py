@@ -1,11 +1,17 @@
 import datetime
 import lxml
+import os
 import pytz
 import re
 import requests
 import xml.etree.ElementTree as ET
 
 from openstates.scrape import Bill, Scraper, VoteEvent, Event
+from utils.cache import cache_dir, read_json, write_json
+from utils.concurrency import prefetch
+from utils.ratelimit import Throttle
+
+from .billstatus import decode_billstatus
 
 
 # NOTE: This is a US federal bill scraper designed to output bills in the
@@ -91,16 +97,26 @@ class USBillScraper(Scraper):
     }
 
     # to scrape everything UPDATED after a given date/time, start="2020-01-01 22:01:01"
-    def scrape(self, chamber=None, session=None, start=None):
+    # without a start, each bill is scraped if its sitemap lastmod has changed
+    # since the last run (every bill, the first time)
+    # workers: BILLSTATUS documents downloaded ahead of the one being parsed
+    def scrape(self, chamber=None, session=None, start=None, workers=4):
         if start:
-            start = datetime.datetime.strptime(start, "%Y-%m-%d %H:%I:%S")
-        else:
-            start = datetime.datetime(1980, 1, 1, 0, 0, 1)
+            start = datetime.datetime.strptime(start, "%Y-%m-%d %H:%M:%S")
+
+        self.workers = int(workers)
+        self._throttle = Throttle(self.requests_per_minute)
+        # requests go through fetch and so _throttle from here on; scrapelib's
+        # own throttle would space them out a second time
+        self.requests_per_minute = 0
+
+        state_path = os.path.join(cache_dir("usa"), f"billstatus-{session}.json")
+        lastmods = read_json(state_path, {})
 
         sitemap_url = (
             "https://www.govinfo.gov/sitemap/bulkdata/BILLSTATUS/sitemapindex.xml"
         )
-        sitemaps = self.get(sitemap_url).content
+        sitemaps = self.fetch(sitemap_url).content
         root = ET.fromstring(sitemaps)
 
         # if you want to test a bill:
@@ -115,45 +131,81 @@ class USBillScraper(Scraper):
                     continue
 
             if session in link.text:
-                yield from self.parse_bill_list(link.text, start)
-
-    def parse_bill_list(self, url, start):
-        sitemap = self.get(url).content
+                try:
+                    yield from self.parse_bill_list(link.text, start, lastmods)
+                finally:
+                    write_json(state_path, lastmods)
+
+    def parse_bill_list(self, url, start, lastmods):
+        """Scrapes the changed bills in a sitemap, recording the lastmod of
+        each one in `lastmods` once all of its objects have been yielded.
+        """
+        sitemap = self.fetch(url).content
         root = ET.fromstring(sitemap)
-        for row in root.findall("us:url", self.ns):
-            date = datetime.datetime.fromisoformat(
-                self.get_xpath(row, "us:lastmod")[:-1]
-            )
-
-            if date > start:
-                bill_url = self.get_xpath(row, "us:loc")
-                self.debug(
-                    f"{datetime.datetime.strftime(date, '%c')} > {datetime.datetime.strftime(start, '%c')}, scraping {bill_url}"
-                )
-                yield from self.parse_bill(bill_url)
-
-    def parse_bill(self, url):
-        xml = self.get(url).content
-        xml = ET.fromstring(xml)
-
-        bill_num = self.get_xpath(xml, "bill/billNumber")
-        if not bill_num:
-            bill_num = self.get_xpath(xml, "bill/number")
-
-        bill_type = self.get_xpath(xml, "bill/billType")
-        if not bill_type:
-            bill_type = self.get_xpath(xml, "bill/type")
 
+        changed = []
+        for row in root.findall("us:url", self.ns):
+            lastmod = self.get_xpath(row, "us:lastmod")
+            bill_url = self.get_xpath(row, "us:loc")
+            date = datetime.datetime.fromisoformat(lastmod[:-1])
+
+            if start:
+                since = start
+            elif bill_url in lastmods:
+                since = datetime.datetime.fromisoformat(lastmods[bill_url][:-1])
+            else:
+                since = None
+
+            if since is None or date > since:
+                self.debug(f"{date:%c} > {since or 'never'}, scraping {bill_url}")
+                changed.append((bill_url, lastmod))
+
+        self.info(f"{len(changed)} changed bills in {url}")
+        for (bill_url, lastmod), content in self.prefetch_all(
+            changed, key=lambda item: item[0]
+        ):
+            yield from self.parse_bill(bill_url, content)
+            lastmods[bill_url] = lastmod
+
+    def fetch(self, url):
+        """GETs url once the next request slot allowed by
+        requests_per_minute comes up (scrapelib's throttle isn't thread
+        safe). Prefetching workers only overlap the latency of requests,
+        they don't raise that cap.
+        """
+        self._throttle.acquire()
+        return self.get(url)
+
+    def fetch_content(self, url):
+        return self.fetch(url).content
+
+    def prefetch_all(self, items, key):
+        """Yields (item, content) for each item, in order, downloading the
+        url key(item) of up to `self.workers` items ahead of the one being
+        processed.
+        """
+        for item, content in prefetch(
+            items, lambda item: self.fetch_content(key(item)), self.workers
+        ):
+            yield item, content.result()
+
+    def parse_bill(self, url, content=None):
+        if content is None:
+            content = self.fetch_content(url)
+        status = decode_billstatus(content)
+
+        bill_num = status.number
+        bill_type = status.type
         bill_id = f"{bill_type} {bill_num}"
 
-        chamber_name = self.get_xpath(xml, "bill/originChamber")
+        chamber_name = status.origin_chamber
         chamber = self.chambers[chamber_name]
 
-        title = self.get_xpath(xml, "bill/title")
+        title = status.title
 
         classification = self.classifications[bill_type]
 
-        session = self.get_xpath(xml, "bill/congress")
+        session = status.congress
 
         bill = Bill(
             bill_id,
@@ -163,20 +215,20 @@ class USBillScraper(Scraper):
             classification=classification,
         )
 
-        self.scrape_actions(bill, xml)
-        self.scrape_amendments(bill, xml, session, chamber, bill_id)
-        self.scrape_cbo(bill, xml)
-        self.scrape_committee_reports(bill, xml)
-        self.scrape_cosponsors(bill, xml)
-        self.scrape_laws(bill, xml)
-        self.scrape_related_bills(bill, xml)
-        self.scrape_sponsors(bill, xml)
-        self.scrape_subjects(bill, xml)
-        self.scrape_summaries(bill, xml)
-        self.scrape_titles(bill, xml)
-        self.scrape_versions(bill, xml)
-
-        for vote in self.scrape_votes(bill, xml):
+        self.scrape_actions(bill, status)
+        self.scrape_amendments(bill, status, session, chamber, bill_id)
+        self.scrape_cbo(bill, status)
+        self.scrape_committee_reports(bill, status)
+        self.scrape_cosponsors(bill, status)
+        self.scrape_laws(bill, status)
+        self.scrape_related_bills(bill, status)
+        self.scrape_sponsors(bill, status)
+        self.scrape_subjects(bill, status)
+        self.scrape_summaries(bill, status)
+        self.scrape_titles(bill, status)
+        self.scrape_versions(bill, status)
+
+        for vote in self.scrape_votes(bill, status):
             yield vote
 
         xml_url = f"https://www.govinfo.gov/bulkdata/BILLSTATUS/{session}/{bill_type.lower()}/BILLSTATUS-{session}{bill_type.lower()}{bill_num}.xml"
@@ -192,16 +244,15 @@ class USBillScraper(Scraper):
         # use cg_url to get additional version for public law
         # disabled 9/2021 - congress.gov was giving 503s
         # self.scrape_public_law_version(bill, cg_url)
-        for event in self.scrape_hearing_by(bill, xml, xml_url):
+        for event in self.scrape_hearing_by(bill, status, xml_url):
             yield event
 
         yield bill
 
-    def build_sponsor_name(self, row):
-        first_name = self.get_xpath(row, "firstName")
-        middle_name = self.get_xpath(row, "middleName")
-        last_name = self.get_xpath(row, "lastName")
-        return " ".join(filter(None, [first_name, middle_name, last_name]))
+    def build_sponsor_name(self, sponsor):
+        return " ".join(
+            filter(None, [sponsor.first_name, sponsor.middle_name, sponsor.last_name])
+        )
 
     # LOC actions don't make the chamber clear, but you can deduce it from the codes
     # https://github.com/usgpo/bill-status/blob/main/BILLSTATUS-XML_User_User-Guide.md
@@ -284,45 +335,42 @@ class USBillScraper(Scraper):
         return None
 
     def get_xpath(self, xml, xpath):
-        if not xml.findall(xpath, self.ns):
-            return
-        return xml.findall(xpath, self.ns)[0].text
+        found = xml.find(xpath, self.ns)
+        return None if found is None else found.text
+
+    def action_date(self, action):
+        # house actions give a time, senate just a date
+        if action.time is not None:
+            action_date = datetime.datetime.strptime(
+                f"{action.date} {action.time}", "%Y-%m-%d %H:%M:%S"
+            )
+        else:
+            action_date = datetime.datetime.strptime(action.date, "%Y-%m-%d")
+        return self._TZ.localize(action_date)
 
-    def scrape_actions(self, bill, xml):
+    def scrape_actions(self, bill, status):
         # TODO: Skip all LOC actions? just some LOC actions?
 
-        # list for deduping
-        actions = []
-        for row in xml.findall("bill/actions/item"):
-            action_text = self.get_xpath(row, "text")
+        # set for deduping
+        actions = set()
+        for row in status.actions:
+            action_text = row.text
             if action_text not in actions:
-                source = self.get_xpath(row, "sourceSystem/name")
+                source = row.source
 
                 if source is None:
                     self.warning(f"Skipping action with no source: {action_text}")
                     continue
 
-                # house actions give a time, senate just a date
-                if row.findall("actionTime"):
-                    action_date = f"{self.get_xpath(row, 'actionDate')} {self.get_xpath(row, 'actionTime')}"
-                    action_date = datetime.datetime.strptime(
-                        action_date, "%Y-%m-%d %H:%M:%S"
-                    )
-                else:
-                    action_date = datetime.datetime.strptime(
-                        self.get_xpath(row, "actionDate"), "%Y-%m-%d"
-                    )
-                action_date = self._TZ.localize(action_date)
-
-                classification = self.classify_action_by_code(
-                    self.get_xpath(row, "actionCode")
-                )
+                action_date = self.action_date(row)
+
+                classification = self.classify_action_by_code(row.code)
 
                 # senate actions dont have a code
                 if classification is None:
                     classification = self.classify_action_by_name(action_text)
 
-                action_type = self.get_xpath(row, "type")
+                action_type = row.type
                 actor = "lower"
                 if "Senate" in source:
                     actor = "upper"
@@ -335,9 +383,7 @@ class USBillScraper(Scraper):
                 # LOC doesn't make the actor clear, but you can back into it
                 # from the actions
                 if source == "Library of Congress":
-                    possible_actor = self.classify_actor_by_code(
-                        self.get_xpath(row, "actionCode")
-                    )
+                    possible_actor = self.classify_actor_by_code(row.code)
                     if possible_actor is not None:
                         actor = possible_actor
 
@@ -350,32 +396,20 @@ class USBillScraper(Scraper):
                     chamber=actor,
                     classification=classification,
                 )
-                actions.append(action_text)
+                actions.add(action_text)
 
     # Hearing By
-    def scrape_hearing_by(self, bill, xml, url):
-        actions = []
+    def scrape_hearing_by(self, bill, status, url):
+        actions = set()
 
-        for row in xml.findall("bill/actions/item"):
-            action_text = (
-                self.get_xpath(row, "text") if self.get_xpath(row, "text") else ""
-            )
+        for row in status.actions:
+            action_text = row.text or ""
             if "hearings held" not in action_text.lower():
                 continue
-            committee_name = self.get_xpath(row, "committees/item/name")
+            committee_name = row.committee
             if action_text in actions:
                 continue
-            # house actions give a time, senate just a date
-            if row.findall("actionTime"):
-                action_date = f"{self.get_xpath(row, 'actionDate')} {self.get_xpath(row, 'actionTime')}"
-                action_date = datetime.datetime.strptime(
-                    action_date, "%Y-%m-%d %H:%M:%S"
-                )
-            else:
-                action_date = datetime.datetime.strptime(
-                    self.get_xpath(row, "actionDate"), "%Y-%m-%d"
-                )
-            action_date = self._TZ.localize(action_date)
+            action_date = self.action_date(row)
             location = "Washington, DC 20004"
             if committee_name:
                 event_name = f"{action_text} - {bill.identifier} - {committee_name}"
@@ -390,20 +424,20 @@ class USBillScraper(Scraper):
                 event.add_committee(committee_name)
             event.add_bill(bill=bill.identifier)
 
-            actions.append(action_text)
+            actions.add(action_text)
             event.add_source(url)
 
             yield event
 
-    def scrape_amendments(self, bill, xml, session, chamber, bill_id):
+    def scrape_amendments(self, bill, status, session, chamber, bill_id):
         slugs = {
             "HAMDT": "house-amendment",
             "SAMDT": "senate-amendment",
         }
 
-        for row in xml.findall("bill/amendments/amendment"):
-            session = self.get_xpath(row, "congress")
-            num = self.get_xpath(row, "number")
+        for row in status.amendments:
+            session = row.congress
+            num = row.number
 
             # 201st not 200th. If congress.gov's url scheme survivess 10 years,
             # I apologize, future maintainer.
@@ -411,8 +445,8 @@ class USBillScraper(Scraper):
                 self.warning("Check amendment url ordinals")
 
             bill.add_document_link(
-                note=f"{self.get_xpath(row, 'type')} {num}",
-                url=f"https://www.congress.gov/amendment/{session}th-congress/{slugs[self.get_xpath(row, 'type')]}/{num}",
+                note=f"{row.type} {num}",
+                url=f"https://www.congress.gov/amendment/{session}th-congress/{slugs[row.type]}/{num}",
                 media_type="text/html",
             )
 
@@ -449,46 +483,45 @@ class USBillScraper(Scraper):
                 return
 
     # CBO cost estimates
-    def scrape_cbo(self, bill, xml):
-        for row in xml.findall("bill/cboCostEstimates/item"):
+    def scrape_cbo(self, bill, status):
+        for row in status.cbo_estimates:
             bill.add_document_link(
-                note=f"CBO: {self.get_xpath(row, 'title')}",
-                url=self.get_xpath(row, "url"),
+                note=f"CBO: {row.title}",
+                url=row.url,
                 media_type="text/html",
             )
 
     # ex: https://www.govinfo.gov/bulkdata/BILLSTATUS/116/hr/BILLSTATUS-116hr1218.xml
-    def scrape_committee_reports(self, bill, xml):
+    def scrape_committee_reports(self, bill, status):
         regex = r"(?P<chamber>[H|S|J])\.\s+Rept\.\s+(?P<session>\d+)-(?P<num>\d+)"
 
-        for row in xml.findall("bill/committeeReports/committeeReport"):
-            report = self.get_xpath(row, "citation")
+        for report in status.committee_reports:
             match = re.search(regex, report)
 
             url = f"https://www.congress.gov/{match.group('session')}/crpt/{match.group('chamber').lower()}rpt{match.group('num')}/CRPT-{match.group('session')}{match.group('chamber').lower()}rpt{match.group('num')}.pdf"
 
             bill.add_document_link(note=report, url=url, media_type="application/pdf")
 
-    def scrape_cosponsors(self, bill, xml):
+    def scrape_cosponsors(self, bill, status):
         all_sponsors = []
-        for row in xml.findall("bill/cosponsors/item"):
-            if not self.get_xpath(row, "sponsorshipWithdrawnDate"):
+        for row in status.cosponsors:
+            if not row.withdrawn:
                 bill.add_sponsorship(
                     self.build_sponsor_name(row),
                     classification="cosponsor",
                     primary=False,
                     entity_type="person",
                 )
-                all_sponsors.append(self.get_xpath(row, "bioguideId"))
+                all_sponsors.append(row.bioguide_id)
         bill.extras["cosponsor_bioguides"] = all_sponsors
 
-    def scrape_laws(self, bill, xml):
+    def scrape_laws(self, bill, status):
         # ex. public law, https://www.govinfo.gov/bulkdata/BILLSTATUS/117/s/BILLSTATUS-117s325.xml
         # ex. private law, https://www.govinfo.gov/bulkdata/BILLSTATUS/115/hr/BILLSTATUS-115hr4641.xml
 
-        for row in xml.findall("bill/laws/item"):
-            law_type = self.get_xpath(row, "type")
-            law_ref = self.get_xpath(row, "number")
+        for row in status.laws:
+            law_type = row.type
+            law_ref = row.number
 
             url_slug = "pvtl" if law_type == "Private Law" else "publ"
 
@@ -499,70 +532,67 @@ class USBillScraper(Scraper):
                 f"US {law_type}", law_ref, citation_type="final", url=law_url
             )
 
-    def scrape_related_bills(self, bill, xml):
-        for row in xml.findall("bill/relatedBills/item"):
-            identifier = (
-                f"{self.get_xpath(row, 'type')} {self.get_xpath(row, 'number')}"
-            )
+    def scrape_related_bills(self, bill, status):
+        for row in status.related_bills:
+            identifier = f"{row.type} {row.number}"
 
             bill.add_related_bill(
                 identifier=identifier,
-                legislative_session=self.get_xpath(row, "congress"),
+                legislative_session=row.congress,
                 relation_type="companion",
             )
 
-    def scrape_sponsors(self, bill, xml):
+    def scrape_sponsors(self, bill, status):
         all_sponsors = []
-        for row in xml.findall("bill/sponsors/item"):
-            if not row.findall("sponsorshipWithdrawnDate"):
+        for row in status.sponsors:
+            if not row.withdrawn:
                 bill.add_sponsorship(
                     self.build_sponsor_name(row),
                     classification="primary",
                     primary=True,
                     entity_type="person",
                 )
-                all_sponsors.append(self.get_xpath(row, "bioguideId"))
+                all_sponsors.append(row.bioguide_id)
         bill.extras["sponsor_bioguides"] = all_sponsors
 
-    def scrape_subjects(self, bill, xml):
-        for row in xml.findall("bill/subjects/billSubjects/legislativeSubjects/item"):
-            bill.add_subject(self.get_xpath(row, "name"))
+    def scrape_subjects(self, bill, status):
+        for subject in status.subjects:
+            bill.add_subject(subject)
 
-    def scrape_summaries(self, bill, xml):
+    def scrape_summaries(self, bill, status):
         seen_abstracts = set()
-        for row in xml.findall("bill/summaries/billSummaries/item"):
-            abstract = self.get_xpath(row, "text")
+        for row in status.summaries:
+            abstract = row.text
 
             if abstract not in seen_abstracts:
                 bill.add_abstract(
                     abstract=abstract,
-                    note=self.get_xpath(row, "name"),
+                    note=row.name,
                 )
                 seen_abstracts.add(abstract)
 
-    def scrape_titles(self, bill, xml):
+    def scrape_titles(self, bill, status):
         all_titles = set()
         # add current title to prevent dupes
         all_titles.add(bill.title)
 
-        for alt_title in xml.findall("bill/titles/item"):
-            all_titles.add(self.get_xpath(alt_title, "title"))
+        for alt_title in status.titles:
+            all_titles.add(alt_title)
 
         all_titles.remove(bill.title)
 
         for title in all_titles:
             bill.add_title(title)
 
-    def scrape_versions(self, bill, xml):
-        for row in xml.findall("bill/textVersions/item"):
-            version_title = self.get_xpath(row, "type")
+    def scrape_versions(self, bill, status):
+        for row in status.text_versions:
+            version_title = row.type
             try:
-                version_date = self.get_xpath(row, "date")[:10]
+                version_date = row.date[:10]
             except TypeError:
                 version_date = ""
 
-            for version in row.findall("formats/item"):
-                url = self.get_xpath(version, "url")
+            for url in row.urls:
                 bill.add_version_link(
                     note=version_title,
                     url=url,
@@ -585,7 +615,7 @@ class USBillScraper(Scraper):
         elif bill.title == "Advancing Education on Biosimilars Act of 2021":
             return
 
-        resp = self.get(url + "/text")
+        resp = self.fetch(url + "/text")
         doc = lxml.html.fromstring(resp.content)
         doc.make_links_absolute(url)
 
@@ -604,11 +634,9 @@ class USBillScraper(Scraper):
                 date=date,
             )
 
-    def scrape_votes(self, bill, xml):
+    def scrape_votes(self, bill, status):
         vote_urls = []
-        for row in xml.findall("bill/actions/item/recordedVotes/recordedVote"):
-            url = self.get_xpath(row, "url")
-            chamber = self.get_xpath(row, "chamber")
+        for url, chamber in status.recorded_votes:
             if url not in vote_urls:
                 vote_urls.append((url, chamber))
 
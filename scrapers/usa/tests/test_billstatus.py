@@ -0,0 +1,120 @@
+import os
+import unittest
+import xml.etree.ElementTree as ET
+
+from usa.billstatus import decode_billstatus
+
+here = os.path.dirname(__file__)
+
+# point this at a directory of saved BILLSTATUS documents to check against
+# real data
+FIXTURES = os.environ.get("BILLSTATUS_FIXTURES", os.path.join(here, "fixtures"))
+
+
+def load_fixtures():
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith(".xml"):
+            with open(os.path.join(FIXTURES, name), "rb") as f:
+                yield name, f.read()
+
+
+def first_text(element, path):
+    found = element.findall(path)
+    return found[0].text if found else None
+
+
+def tree_decode(data):
+    """The fields the scraper reads, looked up in a fully parsed tree."""
+    xml = ET.fromstring(data)
+    return {
+        "number": first_text(xml, "bill/billNumber") or first_text(xml, "bill/number"),
+        "type": first_text(xml, "bill/billType") or first_text(xml, "bill/type"),
+        "title": first_text(xml, "bill/title"),
+        "actions": [
+            first_text(row, "text") for row in xml.findall("bill/actions/item")
+        ],
+        "recorded_votes": [
+            first_text(row, "url")
+            for row in xml.findall("bill/actions/item/recordedVotes/recordedVote")
+        ],
+        "cosponsors": [
+            first_text(row, "bioguideId")
+            for row in xml.findall("bill/cosponsors/item")
+            if not first_text(row, "sponsorshipWithdrawnDate")
+        ],
+        "subjects": [
+            first_text(row, "name")
+            for row in xml.findall(
+                "bill/subjects/billSubjects/legislativeSubjects/item"
+            )
+        ],
+        "versions": [
+            [first_text(v, "url") for v in row.findall("formats/item")]
+            for row in xml.findall("bill/textVersions/item")
+        ],
+    }
+
+
+class TestBillStatus(unittest.TestCase):
+    def test_decode(self):
+        status = decode_billstatus(dict(load_fixtures())["BILLSTATUS-116hr8337.xml"])
+        self.assertEqual(
+            (status.type, status.number, status.congress, status.origin_chamber),
+            ("HR", "8337", "116", "House"),
+        )
+        self.assertEqual(
+            status.title,
+            "Continuing Appropriations Act, 2021 and Other Extensions Act",
+        )
+        self.assertEqual(len(status.actions), 8)
+        self.assertEqual(status.actions[3].time, "20:42:14")
+        self.assertEqual(status.actions[4].committee, "Defense Subcommittee")
+        self.assertIsNone(status.actions[-1].source)
+        # the amendment's own actions and votes aren't the bill's
+        self.assertEqual(
+            [url for url, chamber in status.recorded_votes],
+            [
+                "https://www.senate.gov/legislative/LIS/roll_call_votes/vote1162/vote_116_2_00208.xml",
+                "https://clerk.house.gov/evs/2020/roll194.xml",
+            ],
+        )
+        self.assertEqual(status.amendments, [("116", "2652", "SAMDT")])
+        self.assertEqual(status.related_bills, [("HRES", "1079", "116")])
+        self.assertEqual(status.laws, [("Public Law", "116-159")])
+        self.assertEqual(status.committee_reports, ["H. Rept. 116-512"])
+        self.assertEqual(
+            [(s.last_name, s.withdrawn) for s in status.cosponsors],
+            [("DELAURO", False), ("SCOTT", True)],
+        )
+        self.assertEqual(status.sponsors[0].middle_name, "M.")
+        self.assertEqual(status.text_versions[0].date, None)
+        self.assertEqual(len(status.titles), 3)
+        self.assertTrue(status.summaries[0].text.startswith("<p>"))
+
+    def test_matches_tree(self):
+        checked = 0
+        for name, data in load_fixtures():
+            expected = tree_decode(data)
+            status = decode_billstatus(data)
+
+            self.assertEqual(status.number, expected["number"], name)
+            self.assertEqual(status.type, expected["type"], name)
+            self.assertEqual(status.title, expected["title"], name)
+            self.assertEqual([a.text for a in status.actions], expected["actions"])
+            self.assertEqual(
+                [v.url for v in status.recorded_votes], expected["recorded_votes"]
+            )
+            self.assertEqual(
+                [c.bioguide_id for c in status.cosponsors if not c.withdrawn],
+                expected["cosponsors"],
+            )
+            self.assertEqual(status.subjects, expected["subjects"])
+            self.assertEqual(
+                [v.urls for v in status.text_versions], expected["versions"]
+            )
+            checked += 1
+        self.assertTrue(checked)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
 import re
-from collections import namedtuple, defaultdict, Iterable
-from six import string_types
+from collections import namedtuple, defaultdict, OrderedDict
+from collections.abc import Iterable
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # python < 3.11
+    import sre_parse
+
+string_types = (str,)
 
 
 class Rule(namedtuple("Rule", "regexes types stop attrs")):
@@ -59,29 +66,151 @@ class Rule(namedtuple("Rule", "regexes types stop attrs")):
             return None
 
 
+def required_literal(regex):
+    """Return the longest run of literal text that every match of the
+    compiled ``regex`` must contain, or None if there isn't one we can
+    be sure of. Used to skip regexes that can't match a given string
+    with a cheap substring test.
+    """
+    if not isinstance(regex, re.Pattern) or not isinstance(regex.pattern, str):
+        return None
+    parsed = sre_parse.parse(regex.pattern, regex.flags)
+
+    runs = [""]
+
+    def walk(items):
+        for op, arg in items:
+            if op == sre_parse.LITERAL:
+                runs[-1] += chr(arg)
+                continue
+            # anything else ends the current run of literal text
+            runs.append("")
+            if op == sre_parse.SUBPATTERN:
+                group, add_flags, del_flags, sub = arg
+                # scoped flags could change how the literals match
+                if not add_flags and not del_flags:
+                    walk(sub)
+                    runs.append("")
+
+    walk(parsed)
+    literal = max(runs, key=len)
+    if not literal:
+        return None
+    if regex.flags & re.IGNORECASE:
+        if not literal.isascii():
+            return None
+        literal = literal.lower()
+    return literal
+
+
+class IndexedRule(object):
+    """A Rule with each of its regexes paired with the literal text it
+    requires, so ``match`` can skip regexes that can't possibly match.
+    Returns the same thing Rule.match does.
+    """
+
+    __slots__ = ("rule", "checks")
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.checks = []
+        for regex in rule.regexes:
+            literal = required_literal(regex)
+            ignorecase = bool(getattr(regex, "flags", 0) & re.IGNORECASE)
+            self.checks.append((regex, literal, ignorecase))
+
+    def match(self, text, lowered):
+        attrs = {}
+        matched = False
+
+        for regex, literal, ignorecase in self.checks:
+            if literal is not None:
+                if not ignorecase:
+                    if literal not in text:
+                        continue
+                # lowercasing isn't the same as case-insensitive matching
+                # outside of ascii, so only trust it for ascii text
+                elif lowered is not None and literal not in lowered:
+                    continue
+            m = regex.search(text)
+            if m:
+                matched = True
+                attrs.update(m.groupdict())
+
+        if matched:
+            return attrs
+        else:
+            return None
+
+
 class BaseCategorizer(object):
     """A class that exposes a main categorizer function
     and before and after hooks, in case categorization requires specific
     steps that make use of action or category info. The return
     value is a 2-tuple of category types and a dictionary of
     attributes to overwrite on the target action object.
+
+    Rules are checked through an index of the literal text each regex
+    requires (see ``IndexedRule``), and results are memoized per action
+    text, since the same actions show up over and over again. Set
+    ``use_index = False`` or ``cache_size = 0`` to turn either off.
     """
 
     rules = []
+    use_index = True
+    cache_size = 10000
 
     def __init__(self):
         pass
 
     def categorize(self, text):
+        if not self.cache_size:
+            return self._categorize(text)
+
+        cache = self.__dict__.get("_cache")
+        if cache is None:
+            cache = self._cache = OrderedDict()
+
+        try:
+            result = cache[text]
+            cache.move_to_end(text)
+        except KeyError:
+            result = cache[text] = self._categorize(text)
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+        # callers are free to modify what they get back
+        return {k: list(v) if isinstance(v, list) else v for k, v in result.items()}
+
+    def indexed_rules(self):
+        """The categorizer's rules as IndexedRules, built once per class."""
+        cls = type(self)
+        indexed = cls.__dict__.get("_indexed_rules")
+        if indexed is None or indexed[0] is not self.rules:
+            indexed = (self.rules, [IndexedRule(rule) for rule in self.rules])
+            cls._indexed_rules = indexed
+        return indexed[1]
+
+    def _categorize(self, text):
         # run pre-categorization hook on text
         text = self.pre_categorize(text)
 
         types = set()
         return_val = defaultdict(set)
 
-        for rule in self.rules:
+        if self.use_index:
+            rules = self.indexed_rules()
+            lowered = text.lower() if text.isascii() else None
+        else:
+            rules = self.rules
+
+        for rule in rules:
 
-            attrs = rule.match(text)
+            if self.use_index:
+                attrs = rule.match(text, lowered)
+                rule = rule.rule
+            else:
+                attrs = rule.match(text)
 
             # matched if attrs is not None - empty attr dict means a match
             if attrs is not None:
@@ -0,0 +1,203 @@
+"""
+Base class for the clients of JSON REST APIs (NY's Open Legislation, IN's
+IGA API).
+
+A client subclass says how to build the url of a resource and which
+headers to send; the base class makes the request through the scraper and
+takes care of:
+
+- rate limiting: requests to one API share a token bucket, and a 429's
+  Retry-After holds only that bucket, so a rate limited API doesn't stall
+  unrelated work;
+- pagination: the next page of a paged result is fetched in the
+  background while the items of the current one are consumed;
+- caching: responses are kept on disk, keyed by their url without the API
+  key, and revalidated with ETag/Last-Modified (or, with a max_age, reused
+  without a request while they are younger than that);
+- counters: requests, latency, 429s and cache hits per endpoint, which
+  log_stats() writes to the scraper's log.
+"""
+import os
+import time
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import scrapelib
+
+from .cache import cache_dir, cache_key, conditional_get
+from .ratelimit import TokenBucket
+
+# seconds during which a cached response is used without asking the API
+API_CACHE_MAX_AGE = int(os.environ.get("API_CACHE_MAX_AGE", 0))
+
+
+class BadAPIResponse(Exception):
+    """
+    Raised if the service returns a service code of 400 or higher (after
+    giving up on a 429). Makes the response object available as exc.resp.
+    """
+
+    def __init__(self, resp, *args):
+        super(BadAPIResponse, self).__init__(self, *args)
+        self.resp = resp
+
+
+# one bucket per API, shared by every client (and scraper) using it
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+class APIClient(object):
+    # set by subclasses
+    root = None
+    resources = {}
+    # query parameters that carry credentials, left out of cache keys
+    secret_params = ()
+
+    requests_per_second = 10
+    burst = 10
+    max_429_retries = 5
+
+    def __init__(self, scraper, max_age=API_CACHE_MAX_AGE):
+        self.scraper = scraper
+        self.max_age = max_age
+        self.stats = defaultdict(Counter)
+        self._stats_lock = threading.Lock()
+
+    @property
+    def bucket(self):
+        with _buckets_lock:
+            if self.root not in _buckets:
+                _buckets[self.root] = TokenBucket(self.requests_per_second, self.burst)
+            return _buckets[self.root]
+
+    def make_url(self, resource_name, **url_format_args):
+        raise NotImplementedError
+
+    def request_headers(self, accept="application/json"):
+        return {"Accept": accept}
+
+    def next_page(self, link):
+        """Returns the page a result's nextLink points to."""
+        raise NotImplementedError
+
+    def public_url(self, url):
+        """The url without its secret parameters, for logs and cache keys."""
+        if not self.secret_params:
+            return url
+        parts = urlsplit(url)
+        query = [
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in self.secret_params
+        ]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    def count(self, endpoint, **counts):
+        with self._stats_lock:
+            self.stats[endpoint].update(counts)
+
+    def log_stats(self):
+        for endpoint, stats in sorted(self.stats.items()):
+            requests = stats["requests"]
+            self.scraper.info(
+                "API %s: %d requests, %.0fms average, %d 429s, %d from cache"
+                % (
+                    endpoint,
+                    requests,
+                    stats["seconds"] * 1000 / requests if requests else 0,
+                    stats["429s"],
+                    stats["cached"],
+                )
+            )
+
+    def get(
+        self, resource_name, requests_args=None, requests_kwargs=None, **url_format_args
+    ):
+        """Returns the JSON of a resource (a self.resources key)."""
+        url = self.make_url(resource_name, **url_format_args)
+        requests_kwargs = dict(requests_kwargs or {})
+        headers = self.request_headers()
+        headers.update(requests_kwargs.pop("headers", {}))
+        return self.get_json(
+            url,
+            *(requests_args or ()),
+            headers=headers,
+            endpoint=resource_name,
+            **requests_kwargs
+        )
+
+    def _request(self, url, endpoint, *args, **kwargs):
+        """Makes a request, waiting for the bucket and retrying after 429s."""
+        for _ in range(self.max_429_retries + 1):
+            self.bucket.acquire()
+            start = time.monotonic()
+            try:
+                response = self.scraper.get(url, *args, **kwargs)
+            except scrapelib.HTTPError as e:
+                if e.response is None or e.response.status_code != 429:
+                    raise
+                response = e.response
+            self.count(endpoint, requests=1, seconds=time.monotonic() - start)
+
+            if response.status_code != 429:
+                break
+            self.count(endpoint, **{"429s": 1})
+            # According to the docs of both APIs, the response will have a
+            # Retry-After header that tells you for how many seconds to
+            # sleep before retrying.
+            seconds = int(response.headers.get("retry-after", 1))
+            self.scraper.info(
+                "Got a 429: holding %s requests for %s seconds per retry-after header."
+                % (self.root, seconds)
+            )
+            self.bucket.hold(seconds)
+
+        if response.status_code >= 400:
+            msg_args = (response, response.text, response.headers)
+            msg = "Bad api response: %r %r %r" % msg_args
+            raise BadAPIResponse(response, msg)
+        return response
+
+    def get_json(self, url, *args, endpoint=None, headers=None, **kwargs):
+        """GETs `url` and returns its JSON, from the on-disk cache if it's
+        still current.
+        """
+        endpoint = endpoint or urlsplit(url).path
+        headers = dict(headers or {})
+        public_url = self.public_url(url)
+        path = os.path.join(
+            cache_dir("api_responses"),
+            cache_key(public_url, headers.get("Accept", "")) + ".json",
+        )
+
+        def get(url, headers):
+            self.scraper.info("API GET: %r" % public_url)
+            return self._request(url, endpoint, *args, headers=headers, **kwargs)
+
+        data, response = conditional_get(
+            get, url, path, lambda response: response.json(), headers, self.max_age
+        )
+        if response is None or response.status_code == 304:
+            self.count(endpoint, cached=1)
+        return data
+
+    def unpaginate(self, result):
+        """Yields the items of a paged result and of the pages after it,
+        fetching each next page while the current one is consumed.
+        """
+        with ThreadPoolExecutor(1) as pool:
+            items = result["items"]
+            while True:
+                next_page = None
+                if "nextLink" in result:
+                    next_page = pool.submit(self.next_page, result["nextLink"])
+                yield from items
+                if next_page is None:
+                    return
+                result = next_page.result()
+                items = result["items"]
+                if not items:
+                    return
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+from openstates import settings
+
+
+def cache_dir(*parts):
+    """Returns (creating it if needed) a directory for data that scrapers
+    keep between runs, under the openstates cache directory (``_cache``
+    by default, or whatever was passed as ``--cachedir``).
+    """
+    path = os.path.join(settings.CACHE_DIR, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_key(*parts):
+    """Returns a filename-safe key for the given strings."""
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def read_json(path, default=None):
+    """Reads a json file written by `write_json`, or returns `default` if
+    it doesn't exist or can't be read.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    """Writes `data` to `path` as json, atomically, so a scrape that dies
+    halfway through never leaves a truncated file behind.
+    """
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def conditional_get(get, url, path, parse, headers=None, max_age=0, **kwargs):
+    """GETs `url` with `get` (a scraper's or a requests session's `get`)
+    and returns ``(parse(response), response)``, storing the parsed value
+    at `path` along with the response's ETag/Last-Modified.
+
+    The next call for the same `path` makes the request conditional; when
+    the server answers 304 the stored value is returned with the 304
+    response. With a `max_age`, a value stored less than that many seconds
+    ago is returned without asking the server at all (and no response).
+
+    `parse` must return something json can store.
+    """
+    cached = read_json(path)
+    if cached and "value" not in cached:
+        # written by an older version of the scraper
+        cached = None
+
+    headers = dict(headers or {})
+    if cached:
+        if max_age and time.time() - cached["fetched"] < max_age:
+            return cached["value"], None
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = get(url, headers=headers, **kwargs)
+    if response.status_code == 304 and cached:
+        if max_age:
+            # good for another max_age
+            cached["fetched"] = time.time()
+            write_json(path, cached)
+        return cached["value"], response
+
+    value = parse(response)
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if response.status_code == 200 and (etag or last_modified or max_age):
+        write_json(
+            path,
+            {
+                "fetched": time.time(),
+                "etag": etag,
+                "last_modified": last_modified,
+                "value": value,
+            },
+        )
+    return value, response
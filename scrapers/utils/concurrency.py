@@ -0,0 +1,53 @@
+"""
+Overlapping a scrape's downloads (or the reading of what it downloaded)
+with the processing of what's already there.
+"""
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def submit(pool, fn, *args, **kwargs):
+    """`pool.submit(fn, ...)`; with no pool, calls fn now but still returns
+    a future, so callers don't need to care which it was.
+    """
+    if pool is None:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return pool.submit(fn, *args, **kwargs)
+
+
+def prefetch(items, fn, workers, pool=None):
+    """Yields (item, future of fn(item)) for each item, in order, with fn
+    started for up to `workers` items ahead of the one being processed.
+
+    fn runs on `pool` (a process pool, say, for fn that parse) or else on
+    threads of its own; with `workers` below 1 it's called for each item
+    in turn. A future raises fn's error when its result is read, so one
+    bad item needn't end the scrape. Whatever is still pending when the
+    caller stops is cancelled.
+    """
+    if workers < 1:
+        for item in items:
+            yield item, submit(None, fn, item)
+        return
+
+    own_pool = None
+    if pool is None:
+        pool = own_pool = ThreadPoolExecutor(workers)
+    pending = collections.deque()
+    try:
+        for item in items:
+            pending.append((item, pool.submit(fn, item)))
+            if len(pending) > workers:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if own_pool:
+            own_pool.shutdown()
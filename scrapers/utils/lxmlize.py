@@ -1,13 +1,65 @@
+import os
+import copy
 import requests
 import lxml.html
 import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import cache_dir, cache_key, conditional_get
+
+_session = None
+
+
+def http_session():
+    """Returns a requests session shared by the module-level helpers, which
+    keeps connections alive between calls and retries failed requests
+    with exponential backoff.
+    """
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=4)
+        _session = requests.Session()
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def cached_get_text(url, verify=True, user_agent=None):
+    """Fetches the text of `url`, revalidating a copy kept on disk from the
+    last run with ETag/Last-Modified instead of downloading it again when
+    the server supports it.
+
+    Returns a (response, text) tuple; when the cached copy is still
+    current the response is the 304.
+    """
+    path = os.path.join(cache_dir("url_xpath"), cache_key(url) + ".json")
+    headers = {"user-agent": user_agent} if user_agent else {}
+    text, res = conditional_get(
+        http_session().get,
+        url,
+        path,
+        lambda res: res.text,
+        headers=headers,
+        verify=verify,
+    )
+    return res, text
 
 
 def url_xpath(url, path, verify=True, user_agent=None):
-    headers = {"user-agent": user_agent} if user_agent else None
-    res = requests.get(url, verify=verify, headers=headers)
+    res, text = cached_get_text(url, verify=verify, user_agent=user_agent)
     try:
-        doc = lxml.html.fromstring(res.text)
+        doc = lxml.html.fromstring(text)
     except Exception as e:
         logging.error(
             f"Failed to retrieve xpath from {url} :: returned:\n"
@@ -18,17 +70,61 @@ def url_xpath(url, path, verify=True, user_agent=None):
     return doc.xpath(path)
 
 
+@lru_cache(maxsize=1024)
+def compiled_xpath(xpath_query):
+    """Returns a compiled (and reused) ``etree.XPath`` for a query string."""
+    return etree.XPath(xpath_query)
+
+
+@lru_cache(maxsize=None)
+def _html_parser(encoding):
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
+def parse_html(response):
+    """Parses a response's raw bytes into an HTML document.
+
+    If the server declared a charset that is used, otherwise lxml works out
+    the encoding from the document itself (e.g. its meta tags).
+    """
+    content_type = response.headers.get("content-type", "").lower()
+    encoding = response.encoding if "charset" in content_type else None
+    return lxml.html.fromstring(response.content, parser=_html_parser(encoding))
+
+
 class LXMLMixin(object):
     """Mixin for adding LXML helper functions to Open States code."""
 
-    def lxmlize(self, url, raise_exceptions=False, verify=True):
+    # number of parsed pages `lxmlize` keeps around per scraper. Off unless a
+    # scraper asks for it: every hit and every miss pays for a deep copy of
+    # the tree, which only beats fetching again for pages a scrape asks for
+    # more than once
+    lxmlize_cache_size = 0
+
+    def lxmlize(self, url, raise_exceptions=False, verify=True, cache=True):
         """Parses document into an LXML object and makes links absolute.
 
+        With `lxmlize_cache_size` set, recently parsed pages are cached by
+        URL, so asking for the same page again within a scrape doesn't
+        fetch and parse it twice. Only successful responses are cached.
+        Every call gets its own copy of the document, so it is safe to
+        modify.
+
         Args:
             url (str): URL of the document to parse.
+            cache (bool): Whether a cached copy of the page may be used.
         Returns:
             Element: Document node representing the page.
         """
+        pages = self.__dict__.get("_lxmlize_cache")
+        if pages is None:
+            pages = self._lxmlize_cache = OrderedDict()
+
+        key = (url, verify)
+        if cache and self.lxmlize_cache_size and key in pages:
+            pages.move_to_end(key)
+            return copy.deepcopy(pages[key])
+
         try:
             # This class is always mixed into subclasses of `Scraper`,
             # which have a `get` method defined.
@@ -43,9 +139,19 @@ class LXMLMixin(object):
         if raise_exceptions:
             response.raise_for_status()
 
-        page = lxml.html.fromstring(response.text)
+        page = parse_html(response)
         page.make_links_absolute(url)
 
+        # an error page isn't kept, so a later call that raises on one
+        # still does
+        if self.lxmlize_cache_size and response.ok:
+            # the caller gets the tree just parsed; the cache keeps a copy
+            # that it can't modify
+            pages[key] = copy.deepcopy(page)
+            pages.move_to_end(key)
+            while len(pages) > self.lxmlize_cache_size:
+                pages.popitem(last=False)
+
         return page
 
     def get_node(self, base_node, xpath_query):
@@ -61,7 +167,7 @@ class LXMLMixin(object):
             Element: First node found that matches the query.
         """
         try:
-            node = base_node.xpath(xpath_query)[0]
+            node = compiled_xpath(xpath_query)(base_node)[0]
         except IndexError:
             node = None
 
@@ -79,4 +185,4 @@ class LXMLMixin(object):
         Returns:
             List[Element]: All nodes found that match the query.
         """
-        return base_node.xpath(xpath_query)
+        return compiled_xpath(xpath_query)(base_node)
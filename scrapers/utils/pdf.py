@@ -0,0 +1,309 @@
+"""
+Text extraction from PDFs, cached on disk between runs.
+
+Extracted text is keyed by the hash of the PDF's contents, so a document
+that hasn't changed (most vote and journal PDFs never do once they're
+published) is only extracted once, no matter how many times or under
+which URL it is downloaded again.
+
+Plain text ("text" and "text-nolayout") comes from pdftotext unless the
+backend is "pymupdf", which extracts it in-process laid out like
+pdftotext's output. The layout isn't identical (single spaces between
+columns, letter-spaced headings spread out), so a scraper opts in by
+setting `pdf_text_backend = "pymupdf"` once its parsing has been checked
+against it (il, ms and sc have), and reads the text with
+`PDFMixin.fetch_pdf_lines`; PDF_TEXT_BACKEND changes the default for every
+scraper.
+"xml" and "html" always use pdftohtml.
+"""
+import os
+import gzip
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from openstates.utils import convert_pdf
+
+try:
+    import pymupdf
+except ImportError:  # PyMuPDF < 1.24
+    import fitz as pymupdf
+
+from .cache import cache_dir, cache_key, conditional_get, read_json
+
+# the cache's total size on disk is kept under this many bytes, dropping
+# the least recently used entries first
+PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+PDF_TEXT_BACKEND = os.environ.get("PDF_TEXT_BACKEND", "pdftotext")
+
+TEXT_TYPES = ("text", "text-nolayout")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _layout_page(page):
+    """Yields the lines of a page with words placed in the column matching
+    their position on the page, like ``pdftotext -layout``.
+    """
+    words = [w for w in page.get_text("words") if w[4].strip()]
+    if not words:
+        return
+
+    # the width of one column of output: the typical width of a character
+    pitch = _median((x1 - x0) / len(text) for x0, _, x1, _, text, *_ in words) or 1
+    left = min(w[0] for w in words)
+
+    # group words into rows by their vertical centre
+    rows = []
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        middle = (word[1] + word[3]) / 2
+        if rows and middle - rows[-1][0] <= (word[3] - word[1]) / 2:
+            rows[-1][1].append(word)
+        else:
+            rows.append((middle, [word]))
+
+    gaps = [b[0] - a[0] for a, b in zip(rows, rows[1:])]
+    spacing = _median(gaps) if gaps else 1
+
+    previous = None
+    for middle, row in rows:
+        # keep larger vertical gaps as blank lines
+        if previous is not None and spacing:
+            for _ in range(int(round((middle - previous) / spacing)) - 1):
+                yield ""
+        previous = middle
+
+        line = ""
+        for x0, _, _, _, text, *_ in sorted(row, key=lambda w: w[0]):
+            column = int(round((x0 - left) / pitch))
+            if line:
+                column = max(column, len(line) + 1)
+            line = line.ljust(column) + text
+        yield line
+
+
+def iter_pdf_lines(data, layout=True):
+    """Yields the lines of text of a PDF held in memory, one page at a time,
+    without writing it to disk or running pdftotext.
+
+    With `layout` words keep their horizontal position, as with
+    ``convert_pdf(filename, "text")``; otherwise each line is a run of text
+    in reading order, as with "text-nolayout". Page breaks aren't marked.
+    """
+    with pymupdf.open("pdf", data) as doc:
+        for page in doc:
+            if layout:
+                yield from _layout_page(page)
+            else:
+                yield from page.get_text("text", sort=True).splitlines()
+
+
+def pdf_to_text(data, type="text"):
+    """`convert_pdf` for the text types, using PyMuPDF: returns utf-8 bytes
+    with a form feed at the end of every page, as pdftotext does.
+    """
+    if type not in TEXT_TYPES:
+        raise ValueError("unsupported type {!r}".format(type))
+    pages = []
+    with pymupdf.open("pdf", data) as doc:
+        for page in doc:
+            if type == "text":
+                lines = _layout_page(page)
+            else:
+                lines = page.get_text("text", sort=True).splitlines()
+            pages.append("".join(line + "\n" for line in lines) + "\f")
+    return "".join(pages).encode("utf-8")
+
+
+def extract_pdf(data, type="text", backend=None):
+    """Runs `convert_pdf` on PDF contents held in memory."""
+    if type in TEXT_TYPES and (backend or PDF_TEXT_BACKEND) == "pymupdf":
+        return pdf_to_text(data, type)
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as f:
+        f.write(data)
+        f.flush()
+        return convert_pdf(f.name, type)
+
+
+class PDFTextCache(object):
+    """Gzipped `convert_pdf` output stored by content hash and type."""
+
+    def __init__(self, directory=None, max_bytes=PDF_CACHE_MAX_BYTES):
+        self.directory = directory or cache_dir("pdf_text")
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, digest, type, backend=None):
+        if type in TEXT_TYPES:
+            # the backends lay text out slightly differently
+            type = "{}-{}".format(type, backend or PDF_TEXT_BACKEND)
+        return os.path.join(self.directory, digest[:2], "{}.{}.gz".format(digest, type))
+
+    def _entries(self):
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat
+
+    def get(self, digest, type="text", backend=None):
+        """Returns the cached output for a document, or None."""
+        path = self._path(digest, type, backend)
+        try:
+            with gzip.open(path, "rb") as f:
+                data = f.read()
+        except (OSError, EOFError):
+            return None
+        # mark the entry as recently used, eviction goes by mtime
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, digest, type, data, backend=None):
+        path = self._path(digest, type, backend)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(data)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(stat.st_size for _, stat in self._entries())
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # drop the least recently used entries until we are 10% under the
+        # limit, so the directory isn't walked again on the very next put
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime)
+        self._size = sum(stat.st_size for _, stat in entries)
+        target = self.max_bytes * 0.9
+        for path, stat in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= stat.st_size
+
+    def convert(self, data, type="text", digest=None, backend=None):
+        """`convert_pdf` for PDF contents, using the cached output if this
+        exact document has been converted before.
+        """
+        digest = digest or content_hash(data)
+        text = self.get(digest, type, backend)
+        if text is None:
+            text = extract_pdf(data, type, backend)
+            self.put(digest, type, text, backend)
+        return text
+
+    def convert_many(self, documents, type="text", workers=4, backend=None):
+        """Converts several PDFs (as bytes) at once, running up to `workers`
+        extractions in parallel, and returns their outputs in order.
+        """
+        with ThreadPoolExecutor(workers) as pool:
+            return list(
+                pool.map(
+                    lambda data: self.convert(data, type, backend=backend), documents
+                )
+            )
+
+
+_cache = None
+
+
+def pdf_cache():
+    """Returns the cache shared by every scraper in this process."""
+    global _cache
+    if _cache is None:
+        _cache = PDFTextCache()
+    return _cache
+
+
+def convert_pdf_data(data, type="text", backend=None):
+    """Cached `convert_pdf` for PDF contents held in memory."""
+    return pdf_cache().convert(data, type, backend=backend)
+
+
+class PDFMixin(object):
+    """Mixin for scrapers that extract text from PDFs."""
+
+    # "pymupdf" to extract text in-process; None for PDF_TEXT_BACKEND
+    pdf_text_backend = None
+
+    def fetch_pdf_text(self, url, type="text", **kwargs):
+        """Downloads a PDF and returns its `convert_pdf` output.
+
+        If the server said how to revalidate it last time (ETag or
+        Last-Modified) and its text is still cached, the request is made
+        conditional, and an unchanged PDF isn't downloaded again.
+        """
+        cache = pdf_cache()
+        backend = self.pdf_text_backend
+        index_path = os.path.join(
+            cache_dir("pdf_text", "urls"), cache_key(url) + ".json"
+        )
+        known = read_json(index_path)
+        if known and not os.path.exists(
+            cache._path(known.get("value", ""), type, backend)
+        ):
+            # we'd have nothing to show for a 304
+            os.remove(index_path)
+
+        texts = {}
+
+        def extract(response):
+            digest = content_hash(response.content)
+            texts[digest] = cache.convert(response.content, type, digest, backend)
+            return digest
+
+        # This class is always mixed into subclasses of `Scraper`,
+        # which have a `get` method defined.
+        digest, _ = conditional_get(self.get, url, index_path, extract, **kwargs)
+        text = texts.get(digest) or cache.get(digest, type, backend)
+        if text is None:
+            # evicted since we checked
+            response = self.get(url, **kwargs)
+            text = cache.convert(response.content, type, backend=backend)
+        return text
+
+    def fetch_pdf_lines(self, url, type="text", **kwargs):
+        """Downloads a PDF and returns an iterator of the lines (as str) of
+        its "text" or "text-nolayout" output.
+
+        With the "pymupdf" backend the lines are extracted in-process from
+        the downloaded contents as they're read, without running pdftotext
+        or writing anything to disk; otherwise they come from
+        `fetch_pdf_text`.
+        """
+        backend = self.pdf_text_backend or PDF_TEXT_BACKEND
+        if backend == "pymupdf":
+            response = self.get(url, **kwargs)
+            return iter_pdf_lines(response.content, layout=type == "text")
+        return iter(self.fetch_pdf_text(url, type, **kwargs).decode().splitlines())
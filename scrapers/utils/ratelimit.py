@@ -0,0 +1,129 @@
+"""
+Rate limiting shared between scrapers (and the threads of one scraper).
+"""
+import time
+import threading
+
+
+class TokenBucket(object):
+    """Allows `rate` requests a second on average, and bursts of up to
+    `capacity` requests after a quiet spell.
+
+    Unlike sleeping a fixed time before every request, the time a request
+    itself takes counts towards the wait for the next one.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._not_before = 0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Waits until `tokens` are available and takes them; returns the
+        number of seconds spent waiting.
+        """
+        with self._lock:
+            self._refill()
+            # take the tokens now, going into debt if need be, so threads
+            # waiting at the same time are spaced out rather than woken
+            # together
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+            wait = max(wait, self._not_before - self._updated)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def hold(self, seconds):
+        """Lets no request through for `seconds`, e.g. as a server's
+        Retry-After asks. Only callers of this bucket wait; anything else
+        the scraper is doing carries on.
+        """
+        with self._lock:
+            self._not_before = max(self._not_before, self._clock() + seconds)
+
+
+class RequestBudget(object):
+    """For sites that cut a scraper off after a stretch of activity: allows
+    `requests` requests, then no more until `cooldown` seconds after the
+    last of them.
+
+    The cooldown runs from the last request rather than from when the
+    caller starts waiting, so a scraper can spend it on local work
+    (parsing what it has fetched, say) once it has too few requests
+    `remaining` to go on, and `wait()` then sleeps only for what is left
+    of it.
+    """
+
+    def __init__(self, requests, cooldown, clock=time.monotonic, sleep=time.sleep):
+        self.requests = requests
+        self.cooldown = cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._spent = 0
+        self._last_request = None
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        return self.requests - self._spent
+
+    @property
+    def exhausted(self):
+        return self._spent >= self.requests
+
+    def remaining_cooldown(self):
+        if not self._spent:
+            return 0
+        return max(0, self._last_request + self.cooldown - self._clock())
+
+    def wait(self):
+        """Ends the current budget: sleeps out what is left of the cooldown
+        after its last request and starts a new one. Returns the number of
+        seconds slept.
+        """
+        with self._lock:
+            wait = self.remaining_cooldown()
+            if wait > 0:
+                self._sleep(wait)
+            self._spent = 0
+        return wait
+
+    def spend(self, requests=1):
+        """Call before each request: waits if the budget is used up, then
+        counts the request against it.
+        """
+        if self.exhausted:
+            self.wait()
+        with self._lock:
+            self._spent += requests
+            self._last_request = self._clock()
+
+
+class Throttle(TokenBucket):
+    """scrapelib's requests_per_minute for the threads of one scraper
+    (scrapelib's own throttle isn't thread safe): threads take turns
+    waiting for the next request slot, 60 / requests_per_minute seconds
+    after the last. With no requests_per_minute, no one waits.
+    """
+
+    def __init__(self, requests_per_minute, **kwargs):
+        self.requests_per_minute = requests_per_minute
+        super().__init__((requests_per_minute or 60) / 60.0, **kwargs)
+
+    def acquire(self, tokens=1):
+        if not self.requests_per_minute:
+            return 0
+        return super().acquire(tokens)
@@ -0,0 +1,74 @@
+"""
+Stand-ins for scrapelib's responses and scrapers, for tests that mustn't
+touch the network.
+"""
+import scrapelib
+
+
+class FakeResponse(object):
+    def __init__(
+        self,
+        status_code=200,
+        content=b"",
+        text=None,
+        data=None,
+        headers=None,
+        encoding="utf-8",
+    ):
+        self.status_code = status_code
+        self.encoding = encoding
+        self.content = content if text is None else text.encode(encoding)
+        self.data = data
+        self.headers = headers or {}
+        self.url = None
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise scrapelib.HTTPError(self)
+
+
+class FakeScraper(object):
+    """Answers each GET with the next of `responses`, or, if that's a dict,
+    with the response for the url. The url and headers of every request
+    are kept in `requests`.
+    """
+
+    # as in scrapelib: whether an error status raises HTTPError
+    raise_errors = True
+
+    def __init__(self, responses=()):
+        if not isinstance(responses, dict):
+            responses = list(responses)
+        self.responses = responses
+        self.requests = []
+
+    def info(self, msg):
+        pass
+
+    warning = debug = info
+
+    @property
+    def urls(self):
+        return [url for url, _ in self.requests]
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, headers))
+        if isinstance(self.responses, dict):
+            response = self.responses[url]
+        else:
+            response = self.responses.pop(0)
+        response.url = url
+        if self.raise_errors and response.status_code >= 400:
+            raise scrapelib.HTTPError(response)
+        return response
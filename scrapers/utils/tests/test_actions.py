@@ -0,0 +1,113 @@
+import os
+import importlib
+import unittest
+
+from utils.actions import BaseCategorizer, Rule, required_literal
+
+here = os.path.dirname(__file__)
+
+STATES = [
+    "al",
+    "ca",
+    "co",
+    "ct",
+    "de",
+    "hi",
+    "ia",
+    "id",
+    "in",
+    "la",
+    "ma",
+    "me",
+    "nd",
+    "nh",
+    "ok",
+    "ri",
+    "tx",
+    "ut",
+    "va",
+    "wa",
+    "wi",
+    "wv",
+    "wy",
+]
+
+
+def load_actions():
+    with open(os.path.join(here, "fixtures", "actions.txt")) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def state_categorizers():
+    for state in STATES:
+        try:
+            module = importlib.import_module(state + ".actions")
+        except Exception:
+            # the state's package needs something that isn't installed
+            continue
+        for name, value in vars(module).items():
+            if (
+                isinstance(value, type)
+                and issubclass(value, BaseCategorizer)
+                and value is not BaseCategorizer
+                and value.__module__ == module.__name__
+            ):
+                yield state, value
+
+
+class TestRequiredLiteral(unittest.TestCase):
+    def test_literals(self):
+        (regex,) = Rule(r"Read (first|second) time").regexes
+        self.assertEqual(required_literal(regex), "Read")
+        (regex,) = Rule(r"(?i)Referred to (?P<committees>.+)").regexes
+        self.assertEqual(required_literal(regex), "referred")
+        (regex,) = Rule(r"^(Passed|Failed)").regexes
+        self.assertIsNone(required_literal(regex))
+
+
+class TestCategorizers(unittest.TestCase):
+    def test_indexed_matches_sequential(self):
+        actions = load_actions()
+        checked = 0
+        for state, cls in state_categorizers():
+            reference = cls()
+            reference.use_index = False
+            reference.cache_size = 0
+
+            expected = [reference.categorize(action) for action in actions]
+
+            categorizer = cls()
+            categorizer.cache_size = 0
+            categorizer.indexed_rules()
+            got = [categorizer.categorize(action) for action in actions]
+
+            cached = cls()
+            cached.categorize(actions[0])
+            # the second pass is answered from the cache
+            for _ in range(2):
+                got_cached = [cached.categorize(action) for action in actions]
+
+            for action, want, have, have_cached in zip(
+                actions, expected, got, got_cached
+            ):
+                self.assertEqual(want, have, "%s: %r" % (state, action))
+                self.assertEqual(want, have_cached, "%s: %r" % (state, action))
+            checked += 1
+        self.assertTrue(checked)
+
+    def test_results_are_copies(self):
+        class Categorizer(BaseCategorizer):
+            rules = (Rule(r"Referred to (?P<committees>.+)", "referral-committee"),)
+
+        categorizer = Categorizer()
+        attrs = categorizer.categorize("Referred to Judiciary")
+        attrs["committees"].append("Rules")
+        attrs["classification"].append("passage")
+        self.assertEqual(
+            categorizer.categorize("Referred to Judiciary"),
+            {"committees": ["Judiciary"], "classification": ["referral-committee"]},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from openstates import settings
+
+from utils import apiclient
+from utils.ratelimit import TokenBucket
+from utils.tests.fakes import FakeResponse, FakeScraper
+
+
+class Client(apiclient.APIClient):
+    root = "https://api.example.com"
+    resources = dict(bill="/bills/{bill}")
+    secret_params = ("key",)
+    key = "secret"
+
+    def make_url(self, resource_name, **url_format_args):
+        url = self.root + self.resources[resource_name].format(**url_format_args)
+        return url + "?view=full&key=" + self.key
+
+    def next_page(self, link):
+        return self.get_json(self.root + link, endpoint="next page")
+
+
+class TestAPIClient(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.holds = []
+        bucket = TokenBucket(10, 10, sleep=lambda seconds: None)
+        bucket.hold = self.holds.append
+        for patcher in (
+            mock.patch.object(settings, "CACHE_DIR", self.dir),
+            mock.patch.object(apiclient, "_buckets", {Client.root: bucket}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_retry_after(self):
+        scraper = FakeScraper(
+            [
+                FakeResponse(429, headers={"retry-after": "30"}),
+                FakeResponse(data={"bill": 1}),
+            ]
+        )
+        client = Client(scraper)
+        self.assertEqual(client.get("bill", bill="S1"), {"bill": 1})
+        self.assertEqual(self.holds, [30])
+        self.assertEqual(client.stats["bill"]["requests"], 2)
+        self.assertEqual(client.stats["bill"]["429s"], 1)
+
+    def test_cache_revalidated_without_key(self):
+        client = Client(
+            FakeScraper([FakeResponse(data={"bill": 1}, headers={"etag": "abc"})])
+        )
+        self.assertEqual(
+            client.public_url(client.make_url("bill", bill="S1")),
+            "https://api.example.com/bills/S1?view=full",
+        )
+        client.get("bill", bill="S1")
+
+        # another run, another key
+        scraper = FakeScraper([FakeResponse(304)])
+        client = Client(scraper)
+        client.key = "other"
+        self.assertEqual(client.get("bill", bill="S1"), {"bill": 1})
+        self.assertEqual(scraper.requests[0][1]["If-None-Match"], "abc")
+        self.assertEqual(client.stats["bill"]["cached"], 1)
+
+        # within max_age, no request at all
+        scraper = FakeScraper([])
+        self.assertEqual(
+            Client(scraper, max_age=3600).get("bill", bill="S1"), {"bill": 1}
+        )
+        self.assertEqual(scraper.requests, [])
+
+    def test_unpaginate(self):
+        scraper = FakeScraper(
+            [
+                FakeResponse(data={"items": [3, 4], "nextLink": "/page/3"}),
+                FakeResponse(data={"items": []}),
+            ]
+        )
+        client = Client(scraper)
+        first = {"items": [1, 2], "nextLink": "/page/2"}
+        self.assertEqual(list(client.unpaginate(first)), [1, 2, 3, 4])
+        self.assertEqual(
+            scraper.urls,
+            ["https://api.example.com/page/2", "https://api.example.com/page/3"],
+        )
+        self.assertEqual(client.stats["next page"]["requests"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
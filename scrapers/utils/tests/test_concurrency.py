@@ -0,0 +1,46 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.concurrency import prefetch, submit
+
+
+def fail_on_two(n):
+    if n == 2:
+        raise ValueError(n)
+    return n * 10
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_order_and_errors(self):
+        for workers in (0, 2):
+            results = []
+            for item, future in prefetch(range(4), fail_on_two, workers):
+                try:
+                    results.append((item, future.result()))
+                except ValueError:
+                    results.append((item, None))
+            self.assertEqual(results, [(0, 0), (1, 10), (2, None), (3, 30)])
+
+    def test_window(self):
+        started = []
+
+        def items():
+            for n in range(10):
+                started.append(n)
+                yield n
+
+        with ThreadPoolExecutor(1) as pool:
+            fetched = prefetch(items(), fail_on_two, 3, pool)
+            item, future = next(fetched)
+            self.assertEqual((item, future.result()), (0, 0))
+            # the first item and the three after it
+            self.assertEqual(started, [0, 1, 2, 3])
+            fetched.close()
+
+    def test_submit_without_pool(self):
+        self.assertEqual(submit(None, fail_on_two, 1).result(), 10)
+        self.assertIsInstance(submit(None, fail_on_two, 2).exception(), ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from collections import defaultdict
+
+import scrapelib
+
+from utils.lxmlize import LXMLMixin
+from utils.tests import fakes
+
+PAGE = (
+    '<html><head><meta charset="utf-8"></head>'
+    '<body><a href="detail">Café</a></body></html>'
+).encode("utf-8")
+
+
+class FakeScraper(LXMLMixin, fakes.FakeScraper):
+    lxmlize_cache_size = 1
+
+    def __init__(self):
+        # the charset is only used if the server declared it
+        response = fakes.FakeResponse(
+            content=PAGE, headers={"content-type": "text/html"}, encoding="ISO-8859-1"
+        )
+        super().__init__(defaultdict(lambda: response))
+
+
+class TestLXMLize(unittest.TestCase):
+    def test_parses_bytes(self):
+        page = FakeScraper().lxmlize("https://example.com/list/")
+        link = FakeScraper().get_node(page, "//a")
+        self.assertEqual(link.text, "Café")
+        self.assertEqual(link.get("href"), "https://example.com/list/detail")
+
+    def test_cache(self):
+        scraper = FakeScraper()
+        first = scraper.lxmlize("https://example.com/a")
+        first.xpath("//a")[0].drop_tree()
+        second = scraper.lxmlize("https://example.com/a")
+        # served from the cache, unaffected by changes to the first copy
+        self.assertEqual(scraper.urls, ["https://example.com/a"])
+        self.assertEqual(len(scraper.get_nodes(second, "//a")), 1)
+
+        scraper.lxmlize("https://example.com/b")
+        scraper.lxmlize("https://example.com/a")
+        self.assertEqual(
+            scraper.urls,
+            ["https://example.com/a", "https://example.com/b", "https://example.com/a"],
+        )
+
+    def test_error_pages_not_cached(self):
+        scraper = FakeScraper()
+        scraper.raise_errors = False
+        url = "https://example.com/missing"
+        scraper.responses[url] = fakes.FakeResponse(404, content=PAGE)
+        scraper.lxmlize(url)
+        with self.assertRaises(scrapelib.HTTPError):
+            scraper.lxmlize(url, raise_exceptions=True)
+        self.assertEqual(scraper.urls, [url, url])
+
+    def test_cache_off_by_default(self):
+        scraper = FakeScraper()
+        scraper.lxmlize_cache_size = LXMLMixin.lxmlize_cache_size
+        scraper.lxmlize("https://example.com/a")
+        scraper.lxmlize("https://example.com/a")
+        self.assertEqual(len(scraper.urls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
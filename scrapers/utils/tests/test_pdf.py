@@ -0,0 +1,176 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from collections import Counter, defaultdict
+from unittest import mock
+
+from openstates import settings
+
+from utils import pdf
+from utils.pdf import PDFMixin, PDFTextCache, iter_pdf_lines, pdf_to_text
+from utils.tests import fakes
+
+FIXTURES = os.path.join(
+    os.path.dirname(__file__), "..", "..", "nm", "tests", "testData"
+)
+
+
+def fixture_pdfs():
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith(".pdf"):
+            with open(os.path.join(FIXTURES, name), "rb") as f:
+                yield name, f.read()
+
+
+def has_mark(line):
+    return re.search(r"(?<!\S)X(?!\S)", line)
+
+
+def vote_marks(text):
+    """(the word before it, header words above it) for each vote mark in
+    a roll call's table, to check that marks line up with their columns.
+    """
+    lines = text.splitlines()
+    start = next(i for i, line in enumerate(lines) if re.search(r"\b(YES|YEA)\b", line))
+    header = [
+        (m.start(), m.end(), m.group()) for m in re.finditer(r"\S+", lines[start])
+    ]
+    marks = []
+    for line in lines[start + 1 :]:
+        for m in re.finditer(r"(?<!\S)X(?!\S)", line):
+            before = line[: m.start()].split()
+            above = [word for s, e, word in header if s - 1 <= m.start() < e + 1]
+            marks.append((before[-1] if before else "", above))
+    return marks
+
+
+def fake_extract(data, type="text", backend=None):
+    return b"text of " + data
+
+
+class FakeScraper(PDFMixin, fakes.FakeScraper):
+    pass
+
+
+class TestPDFTextCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        patcher = mock.patch.object(pdf, "extract_pdf", side_effect=fake_extract)
+        self.extract = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_convert_once_per_document(self):
+        cache = PDFTextCache(self.dir)
+        self.assertEqual(cache.convert(b"a"), b"text of a")
+        self.assertEqual(cache.convert(b"a"), b"text of a")
+        self.assertEqual(cache.convert(b"a", "xml"), b"text of a")
+        self.assertEqual(self.extract.call_count, 2)
+
+        # a new instance (i.e. the next run) reads the same files
+        self.assertEqual(PDFTextCache(self.dir).convert(b"a"), b"text of a")
+        self.assertEqual(self.extract.call_count, 2)
+
+    def test_convert_many(self):
+        cache = PDFTextCache(self.dir)
+        docs = [b"%d" % i for i in range(10)]
+        self.assertEqual(
+            cache.convert_many(docs, workers=3), [b"text of " + d for d in docs]
+        )
+
+    def test_eviction(self):
+        cache = PDFTextCache(self.dir, max_bytes=200)
+        for i in range(20):
+            cache.convert(b"document %d" % i)
+        self.assertLessEqual(cache._size, 200)
+        self.assertIsNotNone(cache.get(pdf.content_hash(b"document 19")))
+        self.assertIsNone(cache.get(pdf.content_hash(b"document 0")))
+
+    def test_fetch_revalidates(self):
+        with mock.patch.object(settings, "CACHE_DIR", self.dir), mock.patch.object(
+            pdf, "_cache", None
+        ):
+            scraper = FakeScraper(
+                [
+                    fakes.FakeResponse(content=b"pdf v1", headers={"etag": '"v1"'}),
+                    fakes.FakeResponse(304),
+                ]
+            )
+            self.assertEqual(
+                scraper.fetch_pdf_text("https://a/1.pdf"), b"text of pdf v1"
+            )
+            self.assertEqual(
+                scraper.fetch_pdf_text("https://a/1.pdf"), b"text of pdf v1"
+            )
+        self.assertEqual(
+            [headers for _, headers in scraper.requests],
+            [{}, {"If-None-Match": '"v1"'}],
+        )
+        self.assertEqual(self.extract.call_count, 1)
+
+    def test_fetch_lines(self):
+        data = dict(fixture_pdfs())["2017_vote_senate.pdf"]
+        scraper = FakeScraper(defaultdict(lambda: fakes.FakeResponse(content=data)))
+        scraper.pdf_text_backend = "pymupdf"
+        lines = scraper.fetch_pdf_lines("https://a/1.pdf")
+        self.assertEqual(list(lines), list(iter_pdf_lines(data)))
+        # extracted in-process, without the text cache
+        self.assertEqual(self.extract.call_count, 0)
+
+
+class TestPyMuPDFText(unittest.TestCase):
+    def test_layout(self):
+        lines = list(iter_pdf_lines(dict(fixture_pdfs())["2017_vote_senate.pdf"]))
+        header = next(line for line in lines if "YES" in line)
+        row = next(line for line in lines if line.startswith("BACA"))
+        # names and votes keep their columns
+        self.assertEqual(row.split(), ["BACA", "X", "ORTIZ", "y", "PINO", "X"])
+        self.assertEqual(row.index("X"), header.index("YES") + 1)
+        self.assertIn("PASSED: 39-2", lines)
+
+        text = "\n".join(lines)
+        self.assertEqual(
+            Counter(tuple(above) for _, above in vote_marks(text)),
+            {("YES",): 39, ("NO",): 2, ("ABS",): 1},
+        )
+
+    def test_matches_iter_pdf_lines(self):
+        for name, data in fixture_pdfs():
+            text = pdf_to_text(data).decode("utf-8")
+            self.assertTrue(text.endswith("\f"))
+            self.assertEqual(text[:-1].splitlines(), list(iter_pdf_lines(data)))
+            nolayout = pdf_to_text(data, "text-nolayout").decode("utf-8")
+            self.assertEqual(
+                nolayout[:-1].splitlines(), list(iter_pdf_lines(data, layout=False))
+            )
+
+    @unittest.skipUnless(shutil.which("pdftotext"), "pdftotext isn't installed")
+    def test_parity_with_pdftotext(self):
+        def squeezed(lines):
+            # letter-spaced headings come out spaced differently
+            return ["".join(line.split()) for line in lines if line.strip()]
+
+        for name, data in fixture_pdfs():
+            ours = pdf.extract_pdf(data, backend="pymupdf").decode()
+            theirs = pdf.extract_pdf(data, backend="pdftotext").decode()
+
+            # the same text on the same lines
+            self.assertEqual(
+                squeezed(ours.splitlines()), squeezed(theirs.splitlines()), name
+            )
+            # and, in the vote tables, the same words on each line, with
+            # each vote mark under the same column
+            self.assertEqual(vote_marks(ours), vote_marks(theirs), name)
+            table = [line.split() for line in ours.splitlines() if has_mark(line)]
+            self.assertTrue(table, name)
+            self.assertEqual(
+                table,
+                [line.split() for line in theirs.splitlines() if has_mark(line)],
+                name,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
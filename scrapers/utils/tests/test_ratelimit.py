@@ -0,0 +1,103 @@
+import unittest
+
+from utils.ratelimit import RequestBudget, Throttle, TokenBucket
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=3, clock=clock, sleep=clock.sleep)
+        waits = [bucket.acquire() for _ in range(5)]
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertEqual(waits[3:], [0.5, 0.5])
+        self.assertEqual(clock.now, 1.0)
+
+    def test_time_spent_counts(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        # a request that took 0.75s leaves only 0.25s to wait
+        clock.now += 0.75
+        self.assertAlmostEqual(bucket.acquire(), 0.25)
+
+    def test_capacity_caps_idle_tokens(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1, capacity=2, clock=clock, sleep=clock.sleep)
+        clock.now += 100
+        waits = [bucket.acquire() for _ in range(3)]
+        self.assertEqual(waits, [0, 0, 1.0])
+
+    def test_hold(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1, capacity=5, clock=clock, sleep=clock.sleep)
+        bucket.hold(30)
+        self.assertEqual(bucket.acquire(), 30)
+        # tokens saved up while held are still there afterwards
+        self.assertEqual(bucket.acquire(), 0)
+
+
+class TestThrottle(unittest.TestCase):
+    def test_requests_per_minute(self):
+        clock = FakeClock()
+        throttle = Throttle(30, clock=clock, sleep=clock.sleep)
+        self.assertEqual([throttle.acquire() for _ in range(3)], [0, 2.0, 2.0])
+
+    def test_unthrottled(self):
+        clock = FakeClock()
+        throttle = Throttle(0, clock=clock, sleep=clock.sleep)
+        self.assertEqual([throttle.acquire() for _ in range(3)], [0, 0, 0])
+
+
+class TestRequestBudget(unittest.TestCase):
+    def test_cooldown_after_budget(self):
+        clock = FakeClock()
+        budget = RequestBudget(3, 60, clock=clock, sleep=clock.sleep)
+        for _ in range(3):
+            budget.spend()
+            clock.now += 1
+        self.assertTrue(budget.exhausted)
+        # the next request waits out the cooldown from the last request
+        budget.spend()
+        self.assertEqual(clock.now, 62)
+        self.assertFalse(budget.exhausted)
+
+    def test_local_work_counts_towards_cooldown(self):
+        clock = FakeClock()
+        budget = RequestBudget(2, 60, clock=clock, sleep=clock.sleep)
+        budget.spend()
+        budget.spend()
+        clock.now += 45
+        self.assertEqual(budget.remaining_cooldown(), 15)
+        self.assertEqual(budget.wait(), 15)
+        self.assertEqual(budget.wait(), 0)
+
+    def test_end_budget_early(self):
+        clock = FakeClock()
+        budget = RequestBudget(10, 60, clock=clock, sleep=clock.sleep)
+        budget.spend()
+        self.assertEqual(budget.remaining, 9)
+        self.assertEqual(budget.wait(), 60)
+        self.assertEqual(budget.remaining, 10)
+
+    def test_slow_requests_dont_end_the_budget(self):
+        clock = FakeClock()
+        budget = RequestBudget(2, 60, clock=clock, sleep=clock.sleep)
+        budget.spend()
+        clock.now += 1000
+        budget.spend()
+        self.assertEqual(clock.now, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
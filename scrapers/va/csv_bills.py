@@ -1,8 +1,9 @@
+import io
 import csv
 import re
 import pytz
 from openstates.scrape import Scraper, Bill, VoteEvent
-from collections import defaultdict
+from collections import Counter, defaultdict
 import dateutil
 
 from .common import SESSION_SITE_IDS
@@ -12,131 +13,120 @@ from scrapelib import HTTPError
 tz = pytz.timezone("America/New_York")
 
 
-class VaCSVBillScraper(Scraper):
+VOTE_RESULTS = {"Y": "yes", "N": "no", "X": "not voting", "A": "abstain"}
+
+
+def group_rows(rows, key, value):
+    """Groups rows into a dict of key(row) -> [value(row), ...], keeping
+    the rows for each key in file order.
+    """
+    groups = defaultdict(list)
+    for row in rows:
+        groups[key(row)].append(value(row))
+    return dict(groups)
 
-    _members = defaultdict(list)
-    _sponsors = defaultdict(list)
-    _amendments = defaultdict(list)
-    _fiscal_notes = defaultdict(list)
-    _history = defaultdict(list)
-    _votes = defaultdict(list)
-    _bills = defaultdict(list)
-    _summaries = defaultdict(list)
+
+class VaCSVBillScraper(Scraper):
 
     _session_id: int
     categorizer = Categorizer()
 
     def get_file(self, filename):
+        """Returns the lines of one of the session's data files."""
         # see https://lis.virginia.gov/data-files
         # note: the url pattern given in the notes on that page is wrong,
         # use the links at the bottom
+        url = (
+            f"https://lis.blob.core.windows.net/lisfiles/{self._session_id}/{filename}"
+        )
         try:
-            url = f"https://lis.blob.core.windows.net/lisfiles/{self._session_id}/{filename}"
-            return self.get(url).text
+            resp = self.get(url)
         except HTTPError:
             self.info(f"HTTP error on {url}, skipping")
-            return ""
+            return []
+        if resp.encoding is None:
+            # rather than have requests guess at megabytes of text
+            resp.encoding = "utf-8"
+        # keep each row's own line ending, so csv sees quoted newlines and
+        # CRLFs whole
+        return io.StringIO(resp.text, newline="")
+
+    def read_csv(self, filename):
+        return csv.reader(self.get_file(filename), delimiter=",")
 
     # Load members of legislative
     def load_members(self):
-        resp = self.get_file("Members.csv")
-
-        reader = csv.reader(resp.splitlines(), delimiter=",")
         # ['MBR_HOU', 'MBR_MBRNO', 'MBR_NAME']
-        for row in reader:
-            self._members[row[1]].append(
-                {"chamber": row[0], "member_id": row[1], "name": row[2].strip()}
-            )
+        self._members = {}
+        for row in self.read_csv("Members.csv"):
+            self._members.setdefault(row[1], row[2].strip())
         self.info("Total Members Loaded: " + str(len(self._members)))
         return True
 
     def load_sponsors(self):
-        resp = self.get_file("Sponsors.csv")
-
-        reader = csv.reader(resp.splitlines(), delimiter=",")
         # ['MEMBER_NAME', 'MEMBER_ID', 'BILL_NUMBER', 'PATRON_TYPE']
-        for row in reader:
-            self._sponsors[row[2]].append(
-                {
-                    "member_name": row[0].strip(),
-                    "member_id": row[1],
-                    "bill_number": row[2],
-                    "patron_type": row[3],
-                }
-            )
+        self._sponsors = group_rows(
+            self.read_csv("Sponsors.csv"),
+            key=lambda row: row[2],
+            value=lambda row: (row[0].strip(), row[3]),
+        )
         self.info("Total Sponsors Loaded: " + str(len(self._sponsors)))
 
     def load_amendments(self):
-        resp = self.get_file("Amendments.csv")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
-
         # ['BILL_NUMBER', 'TXT_DOCID']
-        for row in reader:
-            self._amendments[row[0].strip()].append(
-                {"bill_number": row[0].strip(), "txt_docid": row[1].strip()}
-            )
+        self._amendments = group_rows(
+            self.read_csv("Amendments.csv"),
+            key=lambda row: row[0].strip(),
+            value=lambda row: row[1].strip(),
+        )
         self.info("Total Amendments Loaded: " + str(len(self._amendments)))
 
     def load_fiscal_notes(self):
-        resp = self.get_file("FiscalImpactStatements.csv")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
-
         # ['BILL_NUMBER', 'HST_REFID']
-        for row in reader:
-            self._fiscal_notes[row[0].strip()].append({"refid": row[1].strip()})
+        self._fiscal_notes = group_rows(
+            self.read_csv("FiscalImpactStatements.csv"),
+            key=lambda row: row[0].strip(),
+            value=lambda row: row[1].strip(),
+        )
         self.info("Total Fiscal Notes Loaded: " + str(len(self._fiscal_notes)))
 
     def load_history(self):
-        resp = self.get_file("HISTORY.CSV")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
         # ['Bill_id', 'History_date', 'History_description', 'History_refid']
-        for row in reader:
-            self._history[row[0]].append(
-                {
-                    "bill_id": row[0],
-                    "history_date": row[1],
-                    "history_description": row[2],
-                    "history_refid": row[3],
-                }
-            )
+        self._history = group_rows(
+            self.read_csv("HISTORY.CSV"),
+            key=lambda row: row[0],
+            value=lambda row: (row[1], row[2], row[3]),
+        )
         self.info("Total Actions Loaded: " + str(len(self._history)))
 
     def load_votes(self):
-        resp = self.get_file("VOTE.CSV")
-        for line in resp.splitlines():
-            line = line.split(",")
-            # First part of the line is always the history_refid number.
-            #   It has extra quotes around it
-            # Next number is the member_id number found in _members
-            # Y and X represent yes or no
-            history_refid = line[0].replace('"', "")
-            # Checks if votes are present
-            if len(line) > 1:
-                # Not every line has the same number of votes.
-                for v in range(1, len(line), 2):
-                    if (
-                        line[v] != '"H0000"'
-                        and len(self._members[line[v].replace('"', "")]) > 0
-                    ):
-                        member = self._members[line[v].replace('"', "")][0]["name"]
-                        vote_result = line[v + 1].replace('"', "")
-                        if vote_result == "Y":
-                            vote_result = "yes"
-                        elif vote_result == "N":
-                            vote_result = "no"
-                        elif vote_result == "X":
-                            vote_result = "not voting"
-                        elif vote_result == "A":
-                            vote_result = "abstain"
-                        self._votes[history_refid].append(
-                            {"member_id": member, "vote_result": vote_result}
+        # Each row is the history_refid of the vote, followed by pairs of
+        # a member_id (found in _members) and that member's vote:
+        # Y, N, X (not voting) or A (abstain).
+        # Not every line has the same number of votes.
+        self._votes = {}
+        for row in self.read_csv("VOTE.CSV"):
+            if not row:
+                continue
+            votes = []
+            for member_id, vote_result in zip(row[1::2], row[2::2]):
+                if member_id != "H0000" and member_id in self._members:
+                    votes.append(
+                        (
+                            self._members[member_id],
+                            VOTE_RESULTS.get(vote_result, vote_result),
                         )
+                    )
+            if votes:
+                self._votes.setdefault(row[0], []).extend(votes)
         self.info("Total Votes Loaded: " + str(len(self._votes)))
 
     def load_bills(self):
-        resp = self.get_file("BILLS.CSV")
-        reader = csv.DictReader(resp.splitlines(), delimiter=",")
+        self._bills = {}
+        reader = csv.DictReader(self.get_file("BILLS.CSV"), delimiter=",")
         for row in reader:
+            if row["Bill_id"] in self._bills:
+                continue
             text_doc_data = [
                 {"doc_abbr": row["Full_text_doc1"], "doc_date": row["Full_text_date1"]},
                 {"doc_abbr": row["Full_text_doc2"], "doc_date": row["Full_text_date2"]},
@@ -145,44 +135,38 @@ class VaCSVBillScraper(Scraper):
                 {"doc_abbr": row["Full_text_doc5"], "doc_date": row["Full_text_date5"]},
                 {"doc_abbr": row["Full_text_doc6"], "doc_date": row["Full_text_date6"]},
             ]
-            self._bills[row["Bill_id"]].append(
-                {
-                    "bill_id": row["Bill_id"],
-                    "patron_name": row["Patron_name"],
-                    "bill_description": row["Bill_description"],
-                    "passed": row["Passed"],
-                    "failed": row["Failed"],
-                    "carried_over": row["Carried_over"],
-                    "approved": row["Approved"],
-                    "vetoed": row["Vetoed"],
-                    "introduction_date": row["Introduction_date"],
-                    "text_docs": text_doc_data,
-                }
-            )
+            self._bills[row["Bill_id"]] = {
+                "bill_id": row["Bill_id"],
+                "patron_name": row["Patron_name"],
+                "bill_description": row["Bill_description"],
+                "text_docs": [doc for doc in text_doc_data if doc["doc_abbr"]],
+            }
         self.info("Total Bills Loaded: " + str(len(self._bills)))
 
     # Used to clean summary texts
+    _html_tags = re.compile("<.*?>")
+
     def remove_html_tags(self, text):
-        clean = re.compile("<.*?>")
-        return re.sub(clean, "", text)
+        return self._html_tags.sub("", text)
 
     def load_summaries(self):
-        resp = self.get_file("Summaries.csv")
-        reader = csv.reader(resp.splitlines(), delimiter=",")
         # ["SUM_BILNO", "SUMMARY_DOCID", "SUMMARY_TYPE", "SUMMARY_TEXT"]
-        for row in reader:
-            if row[0] == "SUM_BILNO":
-                continue
-
-            self._summaries[row[0]].append(
-                {
-                    "bill_id": row[0],
-                    "summary_doc_id": row[1],
-                    "summary_type": row[2],
-                    "summary_text": self.remove_html_tags(row[3]),
-                }
-            )
-        self.info("Total Sponsors Loaded: " + str(len(self._summaries)))
+        self._summaries = group_rows(
+            (row for row in self.read_csv("Summaries.csv") if row[0] != "SUM_BILNO"),
+            key=lambda row: row[0],
+            value=lambda row: (row[2], self.remove_html_tags(row[3])),
+        )
+        self.info("Total Summaries Loaded: " + str(len(self._summaries)))
+
+    def clear_data(self):
+        self._members = {}
+        self._sponsors = {}
+        self._amendments = {}
+        self._fiscal_notes = {}
+        self._history = {}
+        self._votes = {}
+        self._bills = {}
+        self._summaries = {}
 
     def scrape(self, session=None):
         if not session:
@@ -209,178 +193,172 @@ class VaCSVBillScraper(Scraper):
         session_id = SESSION_SITE_IDS[session]
         self._session_id = "20251"
         # self._init_sftp(session_id)
-        bill_url_base = "https://lis.virginia.gov/cgi-bin/"
 
-        if not is_special:
-            self.load_members()
-            self.load_sponsors()
-            self.load_fiscal_notes()
-            self.load_summaries()
-        self.load_history()
-        self.load_votes()
-        self.load_bills()
-
-        if not is_special:
-            self.load_amendments()
-
-        for bill in self._bills:
-            bill = self._bills[bill][0]
-
-            bill_id = bill["bill_id"]
-            chamber = chamber_types[bill_id[0]]
-            bill_type = {"B": "bill", "J": "joint resolution", "R": "resolution"}[
-                bill_id[1]
-            ]
-            b = Bill(
-                bill_id,
-                session,
-                bill["bill_description"],
-                chamber=chamber,
-                classification=bill_type,
-            )
-            bill_url = (
-                f"https://lis.virginia.gov/bill-details/{self._session_id}/{bill_id}"
-            )
-            b.add_source(bill_url)
-
-            # Long Bill ID needs to have 6 characters to work with vote urls, sponsors, and summaries.
-            # Fill in blanks with 0s
-            long_bill_id = bill_id
-            if len(bill_id) == 3:
-                long_bill_id = bill_id[0:2] + "000" + bill_id[-1]
-            elif len(bill_id) == 4:
-                long_bill_id = bill_id[0:2] + "00" + bill_id[-2:]
-            elif len(bill_id) == 5:
-                long_bill_id = bill_id[0:2] + "0" + bill_id[-3:]
-
-            # Sponsors
-            if long_bill_id not in self._sponsors:
-                if "patron_name" in bill and bill["patron_name"].strip() != "":
-                    b.add_sponsorship(
-                        bill["patron_name"],
-                        classification="primary",
-                        entity_type="person",
-                        primary=True,
-                    )
-            for spon in self._sponsors[long_bill_id]:
-                if spon["member_name"].strip() == "":
-                    continue
-
-                sponsor_type = spon["patron_type"]
-                if sponsor_type.endswith("Chief Patron"):
-                    sponsor_type = "primary"
-                else:
-                    sponsor_type = "cosponsor"
+        # the data files are loaded into indexes for this scrape only
+        self.clear_data()
+        try:
+            if not is_special:
+                self.load_members()
+                self.load_sponsors()
+                self.load_fiscal_notes()
+                self.load_summaries()
+            self.load_history()
+            self.load_votes()
+            self.load_bills()
+
+            if not is_special:
+                self.load_amendments()
+
+            for bill_id in sorted(self._bills):
+                yield from self.scrape_bill(
+                    self._bills[bill_id], session, session_id, chamber_types
+                )
+        finally:
+            self.clear_data()
+
+    def scrape_bill(self, bill, session, session_id, chamber_types):
+        bill_url_base = "https://lis.virginia.gov/cgi-bin/"
+        bill_id = bill["bill_id"]
+        chamber = chamber_types[bill_id[0]]
+        bill_type = {"B": "bill", "J": "joint resolution", "R": "resolution"}[
+            bill_id[1]
+        ]
+        b = Bill(
+            bill_id,
+            session,
+            bill["bill_description"],
+            chamber=chamber,
+            classification=bill_type,
+        )
+        bill_url = f"https://lis.virginia.gov/bill-details/{self._session_id}/{bill_id}"
+        b.add_source(bill_url)
+
+        # Long Bill ID needs to have 6 characters to work with vote urls, sponsors, and summaries.
+        # Fill in blanks with 0s
+        long_bill_id = bill_id
+        if len(bill_id) == 3:
+            long_bill_id = bill_id[0:2] + "000" + bill_id[-1]
+        elif len(bill_id) == 4:
+            long_bill_id = bill_id[0:2] + "00" + bill_id[-2:]
+        elif len(bill_id) == 5:
+            long_bill_id = bill_id[0:2] + "0" + bill_id[-3:]
+
+        # Sponsors
+        if long_bill_id not in self._sponsors:
+            if "patron_name" in bill and bill["patron_name"].strip() != "":
                 b.add_sponsorship(
-                    spon["member_name"],
-                    classification=sponsor_type,
+                    bill["patron_name"],
+                    classification="primary",
                     entity_type="person",
-                    primary=sponsor_type == "primary",
+                    primary=True,
                 )
+        for member_name, patron_type in self._sponsors.get(long_bill_id, ()):
+            if member_name.strip() == "":
+                continue
 
-            # Summary
-            summary_texts = self._summaries[long_bill_id]
-            for sum_text in summary_texts:
-                b.add_abstract(sum_text["summary_text"], sum_text["summary_type"])
+            sponsor_type = patron_type
+            if sponsor_type.endswith("Chief Patron"):
+                sponsor_type = "primary"
+            else:
+                sponsor_type = "cosponsor"
+            b.add_sponsorship(
+                member_name,
+                classification=sponsor_type,
+                entity_type="person",
+                primary=sponsor_type == "primary",
+            )
 
-            # Amendment docs
-            amendments = self._amendments[bill_id]
-            for amend in amendments:
-                version_url = f"https://lis.virginia.gov/bill-details/{self._session_id}/{bill_id}/text/{amend['txt_docid'].strip()}"
+        # Summary
+        for summary_type, summary_text in self._summaries.get(long_bill_id, ()):
+            b.add_abstract(summary_text, summary_type)
 
-                b.add_document_link(
-                    "Amendment: " + amend["txt_docid"],
-                    version_url,
-                    media_type="text/html",
-                )
+        # Amendment docs
+        for txt_docid in self._amendments.get(bill_id, ()):
+            version_url = f"https://lis.virginia.gov/bill-details/{self._session_id}/{bill_id}/text/{txt_docid}"
 
-            # fiscal notes
-            for fn in self._fiscal_notes[long_bill_id]:
-                doc_link = bill_url_base + f"legp604.exe?{session_id}+oth+{fn['refid']}"
-                b.add_document_link(
-                    "Fiscal Impact Statement: " + fn["refid"],
-                    doc_link.replace(".PDF", "+PDF"),
-                    media_type="application/pdf",
-                )
+            b.add_document_link(
+                "Amendment: " + txt_docid,
+                version_url,
+                media_type="text/html",
+            )
 
-            # actions with 8-digit number followed by D are version titles too
-            doc_actions = defaultdict(list)
-            # History and then votes
-            for hist in self._history[bill_id]:
-                action = hist["history_description"]
-                action_date = hist["history_date"]
-                date = dateutil.parser.parse(action_date).date()
-                chamber = chamber_types[action[0]]
-                vote_id = hist["history_refid"]
-                cleaned_action = action[2:]
-
-                if re.findall(r"\d{8}D", cleaned_action):
-                    doc_actions[action_date].append(cleaned_action)
-
-                # categorize actions
-                attrs = self.categorizer.categorize(cleaned_action)
-                atype = attrs["classification"]
-
-                if cleaned_action.strip() != "":
-                    b.add_action(
-                        cleaned_action, date, chamber=chamber, classification=atype
-                    )
+        # fiscal notes
+        for refid in self._fiscal_notes.get(long_bill_id, ()):
+            doc_link = bill_url_base + f"legp604.exe?{session_id}+oth+{refid}"
+            b.add_document_link(
+                "Fiscal Impact Statement: " + refid,
+                doc_link.replace(".PDF", "+PDF"),
+                media_type="application/pdf",
+            )
 
-                if len(vote_id) > 0:
-                    total_yes = 0
-                    total_no = 0
-                    total_not_voting = 0
-                    total_abstain = 0
-                    for v in self._votes[vote_id]:
-                        if v["vote_result"] == "yes":
-                            total_yes += 1
-                        elif v["vote_result"] == "no":
-                            total_no += 1
-                        elif v["vote_result"] == "not voting":
-                            total_not_voting += 1
-                        elif v["vote_result"] == "abstain":
-                            total_abstain += 1
-                    vote = VoteEvent(
-                        identifier=vote_id,
-                        start_date=date,
-                        chamber=chamber,
-                        motion_text=cleaned_action,
-                        result="pass" if total_yes > total_no else "fail",
-                        classification="passage",
-                        bill=b,
-                    )
-                    vote.set_count("yes", total_yes)
-                    vote.set_count("no", total_no)
-                    vote.set_count("not voting", total_not_voting)
-                    vote.set_count("abstain", total_abstain)
-
-                    vote_url = (
-                        bill_url_base
-                        + f"legp604.exe?{session_id}+vot+{vote_id}+{long_bill_id}"
-                    )
-                    vote.add_source(vote_url)
-                    for v in self._votes[vote_id]:
-                        vote.vote(v["vote_result"], v["member_id"])
-                    yield vote
-
-            # Versions
-            for version in bill["text_docs"]:
-                # Checks if abbr is blank as not every bill has multiple versions
-                if version["doc_abbr"]:
-                    version_url = f"https://lis.virginia.gov/bill-details/{self._session_id}/{bill_id}/text/{version['doc_abbr'].strip()}"
-                    version_date = dateutil.parser.parse(version["doc_date"]).date()
-                    # version text will default to abbreviation provided in CSV
-                    # but if there is an unambiguous action from that date with
-                    # a version, we'll use that as the document title
-                    version_text = version["doc_abbr"]
-                    if len(doc_actions[version["doc_date"]]) == 1:
-                        version_text = doc_actions[version["doc_date"]][0]
-                    b.add_version_link(
-                        version_text,
-                        version_url,
-                        date=version_date,
-                        media_type="text/html",
-                        on_duplicate="ignore",
-                    )
+        # actions with 8-digit number followed by D are version titles too
+        doc_actions = defaultdict(list)
+        # History and then votes
+        for action_date, action, vote_id in self._history.get(bill_id, ()):
+            date = dateutil.parser.parse(action_date).date()
+            chamber = chamber_types[action[0]]
+            cleaned_action = action[2:]
+
+            if re.findall(r"\d{8}D", cleaned_action):
+                doc_actions[action_date].append(cleaned_action)
+
+            # categorize actions
+            attrs = self.categorizer.categorize(cleaned_action)
+            atype = attrs["classification"]
+
+            if cleaned_action.strip() != "":
+                b.add_action(
+                    cleaned_action, date, chamber=chamber, classification=atype
+                )
+
+            if len(vote_id) > 0:
+                votes = self._votes.get(vote_id, ())
+                counts = Counter(vote_result for _, vote_result in votes)
+                total_yes = counts["yes"]
+                total_no = counts["no"]
+                total_not_voting = counts["not voting"]
+                total_abstain = counts["abstain"]
+                vote = VoteEvent(
+                    identifier=vote_id,
+                    start_date=date,
+                    chamber=chamber,
+                    motion_text=cleaned_action,
+                    result="pass" if total_yes > total_no else "fail",
+                    classification="passage",
+                    bill=b,
+                )
+                vote.set_count("yes", total_yes)
+                vote.set_count("no", total_no)
+                vote.set_count("not voting", total_not_voting)
+                vote.set_count("abstain", total_abstain)
+
+                vote_url = (
+                    bill_url_base
+                    + f"legp604.exe?{session_id}+vot+{vote_id}+{long_bill_id}"
+                )
+                vote.add_source(vote_url)
+                for member, vote_result in votes:
+                    vote.vote(vote_result, member)
+                yield vote
+
+        # Versions
+        for version in bill["text_docs"]:
+            # Checks if abbr is blank as not every bill has multiple versions
+            if version["doc_abbr"]:
+                version_url = f"https://lis.virginia.gov/bill-details/{self._session_id}/{bill_id}/text/{version['doc_abbr'].strip()}"
+                version_date = dateutil.parser.parse(version["doc_date"]).date()
+                # version text will default to abbreviation provided in CSV
+                # but if there is an unambiguous action from that date with
+                # a version, we'll use that as the document title
+                version_text = version["doc_abbr"]
+                if len(doc_actions[version["doc_date"]]) == 1:
+                    version_text = doc_actions[version["doc_date"]][0]
+                b.add_version_link(
+                    version_text,
+                    version_url,
+                    date=version_date,
+                    media_type="text/html",
+                    on_duplicate="ignore",
+                )
 
-            yield b
+        yield b
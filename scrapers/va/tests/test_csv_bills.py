@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from openstates import settings
+
+from va.csv_bills import VaCSVBillScraper
+
+ROWS = 20000
+BODY = "".join(
+    '"S","M{0}","Member, number\r\n{0}"\r\n'.format(i) for i in range(ROWS)
+).encode("utf-8")
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        # in pieces, so CRLFs are split across reads
+        for start in range(0, len(BODY), 8191):
+            self.wfile.write(BODY[start : start + 8191])
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalScraper(VaCSVBillScraper):
+    def get(self, url, **kwargs):
+        filename = url.rsplit("/", 1)[1]
+        return super().get(self.server_url + filename, **kwargs)
+
+
+class TestGetFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server_url = "http://127.0.0.1:{}/".format(server.server_address[1])
+
+    def test_rows_whole(self):
+        # with a cache dir, as in production: scrapelib writes each
+        # response to its FileCache before handing it back
+        with mock.patch.object(settings, "CACHE_DIR", self.dir):
+            scraper = LocalScraper(None, self.dir)
+        scraper.requests_per_minute = 0
+        scraper.server_url = self.server_url
+        scraper._session_id = 251
+
+        rows = list(scraper.read_csv("Members.csv"))
+        self.assertEqual(len(rows), ROWS)
+        self.assertEqual(rows[-1], ["S", "M19999", "Member, number\r\n19999"])
+
+
+if __name__ == "__main__":
+    unittest.main()
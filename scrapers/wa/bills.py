@@ -1,3 +1,4 @@
+import os
 import re
 import datetime
 import scrapelib
@@ -7,8 +8,10 @@ from collections import defaultdict
 
 from .actions import Categorizer
 from .utils import xpath
+from .wsl import WSLClient
 from openstates.scrape import Scraper, Bill, VoteEvent as Vote
 from utils import LXMLMixin
+from utils.cache import cache_dir, read_json, write_json
 
 import lxml.etree
 import lxml.html
@@ -24,13 +27,9 @@ class WABillScraper(Scraper, LXMLMixin):
 
     _base_url = "http://wslwebservices.leg.wa.gov/legislationservice.asmx"
     categorizer = Categorizer()
-    _subjects = defaultdict(list)
 
     _chamber_map = {"House": "lower", "Senate": "upper", "Joint": "joint"}
 
-    _bill_id_list = []
-    versions = {}
-
     _TZ = pytz.timezone("US/Eastern")
 
     vers_groups_re = re.compile(
@@ -71,6 +70,15 @@ class WABillScraper(Scraper, LXMLMixin):
         if len(self._subjects) > 0:
             return
 
+        # the topics of a past year don't change, so they are kept on disk
+        path = os.path.join(cache_dir("wa"), "subjects-{}.json".format(year))
+        past = year < datetime.date.today().year
+        if past:
+            cached = read_json(path)
+            if cached:
+                self._subjects.update(cached)
+                return
+
         url = "http://apps.leg.wa.gov/billsbytopic/Results.aspx?year=%s" % year
         html = self.get(url).text
         doc = lxml.html.fromstring(html)
@@ -91,6 +99,9 @@ class WABillScraper(Scraper, LXMLMixin):
                 if subjects_match:
                     self._subjects[subjects_match.group()].append(subject)
 
+        if past:
+            write_json(path, self._subjects)
+
     def _load_versions(self, chamber):
         base_url = "http://lawfilesext.leg.wa.gov/Biennium/" "{}/Htm/Bills/".format(
             self.biennium
@@ -107,13 +118,10 @@ class WABillScraper(Scraper, LXMLMixin):
 
         for bill_type in bill_types:
             try:
-                doc = self.lxmlize(base_url + chamber + " " + bill_type)
+                documents = self.wsl.listing(base_url + chamber + " " + bill_type)
             except scrapelib.HTTPError:
                 return
-            documents = doc.xpath("//a")[1:]
-            for document in documents:
-                (link,) = document.xpath("@href")
-                (text,) = document.xpath("text()")
+            for link, text in documents:
                 (
                     bill_num,
                     is_substitute,
@@ -138,9 +146,6 @@ class WABillScraper(Scraper, LXMLMixin):
                     if engrossed_num:
                         name = " ".join([self.ORDINALS[engrossed_num], name])
 
-                if not self.versions.get(bill_id):
-                    self.versions[bill_id] = []
-
                 self.versions[bill_id].append(
                     {"note": name, "url": link, "media_type": "text/html"}
                 )
@@ -151,7 +156,6 @@ class WABillScraper(Scraper, LXMLMixin):
 
     def _load_documents(self, chamber):
         chamber = {"lower": "House", "upper": "Senate"}[chamber]
-        self.documents = {}
 
         document_types = ["Amendments", "Bill Reports", "Digests"]
         for doctype in document_types:
@@ -162,16 +166,11 @@ class WABillScraper(Scraper, LXMLMixin):
             )
 
             try:
-                doc = self.lxmlize(url)
+                documents = self.wsl.listing(url)
             except scrapelib.HTTPError:
                 return
 
-            documents = doc.xpath("//a")[1:]
-            for document in documents:
-
-                (link,) = document.xpath("@href")
-                (text,) = document.xpath("text()")
-
+            for link, text in documents:
                 (
                     bill_number,
                     is_substitute,
@@ -209,8 +208,6 @@ class WABillScraper(Scraper, LXMLMixin):
                                 self.ORDINALS[substitute_num]
                             )
 
-                if not self.documents.get(bill_number):
-                    self.documents[bill_number] = []
                 self.documents[bill_number].append(
                     {"note": name, "url": link, "media_type": "text/html"}
                 )
@@ -232,8 +229,15 @@ class WABillScraper(Scraper, LXMLMixin):
 
         year = int(session[0:4])
 
+        # per-biennium indexes, filled in by scrape_chamber
+        self._bill_id_list = []
+        self._subjects = defaultdict(list)
+        self.versions = defaultdict(list)
+        self.documents = defaultdict(list)
+
         self._bill_id_list = self.get_prefiles(chamber, session, year)
         self.biennium = "%s-%s" % (session[0:4], session[7:9])
+        self.wsl = WSLClient(self, self.biennium)
 
         for chamber in chambers:
             self.scrape_chamber(chamber, session)
@@ -338,31 +342,27 @@ class WABillScraper(Scraper, LXMLMixin):
 
         bill.add_source(fake_source)
 
-        try:
-            for version in self.versions[bill_id]:
-                bill.add_version_link(
-                    note=version["note"],
-                    url=version["url"],
-                    media_type=version["media_type"],
-                )
-        except KeyError:
+        if bill_id not in self.versions:
             self.warning("No versions were found for {}".format(bill_id))
+        for version in self.versions.get(bill_id, ()):
+            bill.add_version_link(
+                note=version["note"],
+                url=version["url"],
+                media_type=version["media_type"],
+            )
 
-        try:
-            for document in self.documents[bill_num]:
-                bill.add_document_link(
-                    note=document["note"],
-                    url=document["url"],
-                    media_type=document["media_type"],
-                )
-        except KeyError:
-            pass
+        for document in self.documents.get(bill_num, ()):
+            bill.add_document_link(
+                note=document["note"],
+                url=document["url"],
+                media_type=document["media_type"],
+            )
 
         self.scrape_sponsors(bill)
         self.scrape_actions(bill, chamber, fake_source, prefile_year, second_year)
         self.scrape_hearings(bill, bill_num)
         yield from self.scrape_votes(bill)
-        bill.subject = list(set(self._subjects[bill_id]))
+        bill.subject = list(set(self._subjects.get(bill_id, ())))
         yield bill
 
     def scrape_sponsors(self, bill):
@@ -520,35 +520,11 @@ class WABillScraper(Scraper, LXMLMixin):
         self.scrape_cites(bill, became_law)
 
     def scrape_api_actions(self, bill, prefile_year, second_year):
-        api_actions = {}
         bill_num = bill.identifier.split()[1]
-
-        api_url = (
-            "http://wslwebservices.leg.wa.gov/legislationservice.asmx/"
-            f"GetLegislativeStatusChangesByBillNumber?billNumber={bill_num}"
-            f"&biennium={self.biennium}"
-            f"&beginDate={prefile_year}-11-01"
-            f"&endDate={second_year}-12-31"
+        return self.wsl.status_changes(
+            bill_num, f"{prefile_year}-11-01", f"{second_year}-12-31"
         )
 
-        # api drops 500 errors if there are no actions,
-        try:
-            page = self.get(api_url)
-        except requests.exceptions.HTTPError:
-            return {}
-
-        page = lxml.etree.fromstring(page.content)
-
-        for row in xpath(page, "//wa:LegislativeStatus"):
-            action_text = xpath(row, "string(wa:HistoryLine)")
-            action_date = xpath(row, "string(wa:ActionDate)")
-            action_date = datetime.datetime.strptime(
-                action_date, "%Y-%m-%dT%H:%M:%S"
-            ).date()
-            api_actions[action_text] = action_date
-
-        return api_actions
-
     def scrape_votes(self, bill):
         bill_num = bill.identifier.split()[1]
 
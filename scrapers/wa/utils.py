@@ -1,9 +1,18 @@
+from functools import lru_cache
+
+import lxml.etree
+
 NS = {"wa": "http://WSLWebServices.leg.wa.gov/"}
 
 
+@lru_cache(maxsize=None)
+def compiled_xpath(path):
+    return lxml.etree.XPath(path, namespaces=NS)
+
+
 def xpath(elem, path):
     """
     A helper to run xpath with the proper namespaces for the Washington
-    Legislative API.
+    Legislative API. Each expression is compiled once and reused.
     """
-    return elem.xpath(path, namespaces=NS)
+    return compiled_xpath(path)(elem)
@@ -0,0 +1,124 @@
+"""
+Client for the Washington State Legislature's web services (WSL) and the
+lawfilesext document listings, shared by the WA scrapers.
+
+API Docs: http://wslwebservices.leg.wa.gov/
+"""
+import os
+import datetime
+from collections import defaultdict
+
+import lxml.etree
+import lxml.html
+import requests
+
+from utils.cache import cache_dir, cache_key, conditional_get
+from .utils import xpath
+
+WSL_BASE_URL = "http://wslwebservices.leg.wa.gov"
+
+
+def parse_listing(response, url):
+    doc = lxml.html.fromstring(response.content)
+    doc.make_links_absolute(url)
+    entries = []
+    # the first link goes to the parent directory
+    for link in doc.xpath("//a")[1:]:
+        (href,) = link.xpath("@href")
+        (text,) = link.xpath("text()")
+        entries.append((href, text))
+    return entries
+
+
+def parse_status_change(row):
+    """Returns the (history line, action date) of a LegislativeStatus."""
+    action_date = datetime.datetime.strptime(
+        xpath(row, "string(wa:ActionDate)"), "%Y-%m-%dT%H:%M:%S"
+    ).date()
+    return xpath(row, "string(wa:HistoryLine)"), action_date
+
+
+class WSLClient(object):
+    """Fetches and parses WSL responses for one biennium on behalf of a
+    scraper, reusing the results of bulk requests and, between runs, of
+    document listings that haven't changed.
+    """
+
+    def __init__(self, scraper, biennium):
+        self.scraper = scraper
+        self.biennium = biennium
+        self._status_changes = None
+        self._bulk_failed = False
+
+    def url(self, service, method, **params):
+        query = "&".join("{}={}".format(k, v) for k, v in params.items())
+        return "{}/{}.asmx/{}?{}".format(WSL_BASE_URL, service, method, query)
+
+    def get_xml(self, service, method, **params):
+        response = self.scraper.get(self.url(service, method, **params))
+        return lxml.etree.fromstring(response.content)
+
+    def status_changes(self, bill_num, begin_date, end_date):
+        """Returns {history line: action date} for a bill's status changes
+        between two dates.
+
+        The status changes of the whole biennium are fetched with a single
+        request the first time and reused for the rest of the scrape. If
+        that request fails, each bill's are asked for on its own instead.
+        """
+        if self._status_changes is None and not self._bulk_failed:
+            try:
+                page = self.get_xml(
+                    "LegislationService",
+                    "GetLegislativeStatusChangesByDateRange",
+                    biennium=self.biennium,
+                    beginDate=begin_date,
+                    endDate=end_date,
+                )
+            except requests.exceptions.HTTPError as e:
+                self.scraper.warning(
+                    "couldn't get the biennium's status changes ({}), "
+                    "asking for each bill's".format(e)
+                )
+                self._bulk_failed = True
+            else:
+                changes = defaultdict(dict)
+                for row in xpath(page, "//wa:LegislativeStatus"):
+                    # e.g. "ESHB 1000"; substitutes share the bill's number
+                    bill = xpath(row, "string(wa:BillId)").split()[-1]
+                    action_text, action_date = parse_status_change(row)
+                    changes[bill][action_text] = action_date
+                self._status_changes = dict(changes)
+
+        if self._status_changes is not None:
+            return self._status_changes.get(bill_num, {})
+
+        try:
+            page = self.get_xml(
+                "LegislationService",
+                "GetLegislativeStatusChangesByBillNumber",
+                billNumber=bill_num,
+                biennium=self.biennium,
+                beginDate=begin_date,
+                endDate=end_date,
+            )
+        except requests.exceptions.HTTPError:
+            # api drops 500 errors if there are no actions
+            return {}
+        return dict(
+            parse_status_change(row) for row in xpath(page, "//wa:LegislativeStatus")
+        )
+
+    def listing(self, url):
+        """Returns the (url, text) of the entries of a lawfilesext
+        directory listing.
+
+        The parsed listing is kept on disk along with the response's
+        ETag/Last-Modified, so a listing that hasn't changed since the
+        last run (e.g. any from a past biennium) isn't parsed again.
+        """
+        path = os.path.join(cache_dir("wa", "listings"), cache_key(url) + ".json")
+        entries, _ = conditional_get(
+            self.scraper.get, url, path, lambda response: parse_listing(response, url)
+        )
+        return [tuple(entry) for entry in entries]
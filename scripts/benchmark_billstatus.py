@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Per-document time of decode_billstatus over a directory of saved
+BILLSTATUS documents, next to the time of parsing them alone.
+
+    PYTHONPATH=scrapers python scripts/benchmark_billstatus.py [DIRECTORY]
+
+Without a directory it runs on the fixtures in scrapers/usa/tests/fixtures.
+"""
+import argparse
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from usa.billstatus import decode_billstatus
+
+FIXTURES = os.path.join(
+    os.path.dirname(__file__), "..", "scrapers", "usa", "tests", "fixtures"
+)
+
+
+def per_document(fn, data, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(data)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default=FIXTURES)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    total = {"parse": 0, "decode": 0}
+    for name in sorted(os.listdir(args.directory)):
+        if not name.endswith(".xml"):
+            continue
+        with open(os.path.join(args.directory, name), "rb") as f:
+            data = f.read()
+        parse = per_document(ET.fromstring, data, args.repeat)
+        decode = per_document(decode_billstatus, data, args.repeat)
+        total["parse"] += parse
+        total["decode"] += decode
+        print(
+            "{} ({}kB): parse {:.2f}ms, decode_billstatus {:.2f}ms".format(
+                name, len(data) // 1024, parse, decode
+            )
+        )
+    print(
+        "total: parse {parse:.2f}ms, decode_billstatus {decode:.2f}ms".format(**total)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Time parsing a batch of New Mexico roll call PDFs with read_vote_columns,
+serially against a process pool.
+
+    PYTHONPATH=scrapers python scripts/benchmark_nm_votes.py [PDF ...]
+
+Without arguments it runs on the fixture PDFs in scrapers/nm/tests/testData.
+"""
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from nm.votes import read_vote_columns
+
+FIXTURES = os.path.join(
+    os.path.dirname(__file__), "..", "scrapers", "nm", "tests", "testData", "*.pdf"
+)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdfs", nargs="*")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    batch = []
+    for path in args.pdfs or sorted(glob.glob(FIXTURES)):
+        with open(path, "rb") as f:
+            batch.append(f.read())
+    batch *= args.repeat
+
+    serial, serial_ms = timed(lambda: [read_vote_columns(data) for data in batch])
+    with ProcessPoolExecutor(args.processes) as pool:
+        pooled, pool_ms = timed(
+            lambda: list(pool.map(read_vote_columns, batch, chunksize=10))
+        )
+    assert pooled == serial
+
+    print(
+        "{} PDFs: serial {:.2f}ms, {} processes {:.2f}ms".format(
+            len(batch), serial_ms, args.processes, pool_ms
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
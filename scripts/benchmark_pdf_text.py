@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Per-document latency of PDF text extraction: PyMuPDF in-process against a
+pdftotext subprocess (when it's installed).
+
+    PYTHONPATH=scrapers python scripts/benchmark_pdf_text.py [PDF ...]
+
+Without arguments it runs on the fixture PDFs in scrapers/nm/tests/testData.
+"""
+import argparse
+import glob
+import os
+import shutil
+import time
+
+from utils.pdf import extract_pdf, iter_pdf_lines
+
+FIXTURES = os.path.join(
+    os.path.dirname(__file__), "..", "scrapers", "nm", "tests", "testData", "*.pdf"
+)
+
+
+def per_document(fn, data, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(data)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdfs", nargs="*")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    backends = {
+        "pymupdf": lambda data: extract_pdf(data, backend="pymupdf"),
+        # the lazy API, up to the first line
+        "pymupdf first line": lambda data: next(iter_pdf_lines(data), None),
+    }
+    if shutil.which("pdftotext"):
+        backends["pdftotext"] = lambda data: extract_pdf(data, backend="pdftotext")
+    else:
+        print("pdftotext isn't installed, only timing PyMuPDF")
+
+    for path in args.pdfs or sorted(glob.glob(FIXTURES)):
+        with open(path, "rb") as f:
+            data = f.read()
+        timings = ", ".join(
+            "{} {:.2f}ms".format(name, per_document(fn, data, args.repeat))
+            for name, fn in backends.items()
+        )
+        print("{}: {}".format(os.path.basename(path), timings))
+
+
+if __name__ == "__main__":
+    main()